@@ -11,7 +11,7 @@ from pathlib import Path
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
@@ -24,6 +24,10 @@ from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import traceback
 
+from browser_pool import browser_pool
+from job_scheduler import scheduler
+from task_store import TaskCollection
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,15 +51,11 @@ CONFIG = {
     'currency': 'USD',
     'max_workers': 10,
     'batch_size': 10,
-    'headless_mode': True,
     'verbose_logging': False,
     'implicit_wait': 1,
     'explicit_wait': 1
 }
 
-# In-memory storage for background tasks
-tasks: Dict[str, Dict[str, Any]] = {}
-
 # Pydantic models
 class SellerInfo(BaseModel):
     """Seller information model"""
@@ -108,8 +108,12 @@ class SearchStatus(BaseModel):
     success_count: int = 0
     failure_count: int = 0
     last_updated: str
+    queue_position: Optional[int] = None
     results: Optional[List[ProductData]] = None
 
+# Shared storage for background tasks (Redis or SQLite, see task_store)
+tasks = TaskCollection("amazon", SearchStatus)
+
 
 class AmazonScraper:
     def __init__(self, search_term, base_url=None, currency=None, max_products=10):
@@ -121,39 +125,21 @@ class AmazonScraper:
         self.wait = None
         
     def _init_webdriver(self):
-        """Initialize WebDriver only when needed - using same config as other APIs"""
+        """Lease a warm WebDriver from the shared browser pool only when needed"""
         if self.driver is not None:
             return
             
-        # Setup webdriver using same configuration as gmaps_api and chrome_webstore_api
-        options = webdriver.ChromeOptions()
-        
-        # Use exact same Chrome arguments as other APIs
-        chrome_args = [
-            "disable-cookies",
-            "disable-extensions", 
-            "disable-gpu",
-            "disable-infobars",
-            "disable-notifications",
-            "disable-popup-blocking",
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-web-security",
-            "--disable-features=VizDisplayCompositor",
-            "--disable-ipc-flooding-protection",
-            "user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "--remote-debugging-pipe"
-        ]
-        
-        for arg in chrome_args:
-            options.add_argument(arg)
-        
-        # Add headless mode if configured
-        if CONFIG['headless_mode']:
-            options.add_argument("--headless")
-        
-        self.driver = webdriver.Chrome(options=options)
+        # Same Chrome configuration as gmaps_api and chrome_webstore_api (see browser_pool)
+        self.driver = browser_pool.acquire()
         self.wait = WebDriverWait(self.driver, CONFIG['explicit_wait'])
+    
+    def close_driver(self, discard=False):
+        """Hand the driver back to the pool (``discard`` closes it instead of reusing it)"""
+        if self.driver is None:
+            return
+        browser_pool.release(self.driver, discard=discard)
+        self.driver = None
+        self.wait = None
         
     def log(self, message, level="info"):
         """Conditional logging based on VERBOSE_LOGGING setting"""
@@ -200,7 +186,7 @@ class AmazonScraper:
         else:
             self.process_products_sequential(asins)
         
-        self.driver.quit()
+        self.close_driver()
     
     def process_products_sequential(self, asins):
         """Process products one by one (original method)"""
@@ -1220,7 +1206,7 @@ def process_single_product(asin, search_term, base_url, currency):
     Worker function for processing a single product in parallel.
     Creates its own WebDriver instance to avoid conflicts.
     """
-    driver = None
+    scraper = None
     try:
         # Create a new scraper instance for this worker
         scraper = AmazonScraper(search_term, base_url, currency)
@@ -1228,7 +1214,6 @@ def process_single_product(asin, search_term, base_url, currency):
         
         # Process the single product
         product_info = scraper.get_single_product_info(asin)
-        driver = scraper.driver  # Get driver reference for cleanup
         
         return {
             'asin': asin,
@@ -1247,18 +1232,14 @@ def process_single_product(asin, search_term, base_url, currency):
             'worker_id': multiprocessing.current_process().name
         }
     finally:
-        # Clean up the driver
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+        # Pool worker processes are torn down after each batch, so close rather than keep warm
+        if scraper:
+            scraper.close_driver(discard=True)
 
 
 # API Endpoints
 @router.get("/product", summary="Search Amazon Products (Async)")
 async def search_amazon_products_async(
-    background_tasks: BackgroundTasks,
     search_term: str = Query(..., description="Search term for Amazon products"),
     max_products: int = Query(default=10, description="Maximum number of products to scrape", ge=1, le=None)
 ):
@@ -1292,8 +1273,12 @@ async def search_amazon_products_async(
             last_updated=datetime.now().isoformat()
         )
         
-        # Add background task
-        background_tasks.add_task(search_amazon_products_task, task_id, search_term, max_products)
+        # Hand the task to the bounded amazon queue (429 when full)
+        try:
+            queue_info = scheduler.submit("amazon", task_id, search_amazon_products_task, task_id, search_term, max_products)
+        except HTTPException:
+            tasks.delete(task_id)
+            raise
         
         # Return immediately
         return {
@@ -1302,10 +1287,13 @@ async def search_amazon_products_async(
             "message": "Search task queued successfully",
             "search_term": search_term,
             "max_products": max_products,
+            "queue_position": queue_info["queue_position"],
             "status_url": f"/amazon/status/{task_id}",
             "results_url": f"/amazon/results/{task_id}"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1327,6 +1315,7 @@ async def get_task_status(task_id: str):
             )
         
         task_status = tasks[task_id]
+        task_status.queue_position = scheduler.get_queue_position(task_id)
         logger.info(f"✅ Task {task_id} status retrieved: {task_status.status}")
         
         return task_status
@@ -1473,12 +1462,13 @@ async def search_amazon_products_task(task_id: str, search_term: str, max_produc
         logger.info(f"🚀 Starting background task {task_id} for search: {search_term}")
         
         # Update task status
-        tasks[task_id].status = "running"
-        tasks[task_id].progress = 10
-        tasks[task_id].message = "Initializing scraper..."
-        tasks[task_id].current_stage = "initializing"
-        tasks[task_id].current_operation = "Setting up webdriver"
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     status="running",
+                     progress=10,
+                     message="Initializing scraper...",
+                     current_stage="initializing",
+                     current_operation="Setting up webdriver",
+                     last_updated=datetime.now().isoformat())
         
         # Retry logic
         result = None
@@ -1487,9 +1477,10 @@ async def search_amazon_products_task(task_id: str, search_term: str, max_produc
             
             # Update status for retry
             if retry_count > 1:
-                tasks[task_id].message = f"Retry attempt {retry_count}/{max_retries} for search: {search_term}"
-                tasks[task_id].current_operation = f"Retry {retry_count}/{max_retries}"
-                tasks[task_id].last_updated = datetime.now().isoformat()
+                tasks.update(task_id,
+                             message=f"Retry attempt {retry_count}/{max_retries} for search: {search_term}",
+                             current_operation=f"Retry {retry_count}/{max_retries}",
+                             last_updated=datetime.now().isoformat())
                 logger.info(f"🔄 Retry attempt {retry_count}/{max_retries} for task {task_id}")
             
             # Run the synchronous scraping in a thread pool to avoid blocking
@@ -1529,44 +1520,50 @@ async def search_amazon_products_task(task_id: str, search_term: str, max_produc
         
         # Update final status
         elapsed_time = time.time() - start_time
-        tasks[task_id].elapsed_time_seconds = elapsed_time
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     elapsed_time_seconds=elapsed_time,
+                     last_updated=datetime.now().isoformat())
         
         if result and result['success'] and result['successful_count'] > 0:
-            tasks[task_id].status = "completed"
-            tasks[task_id].progress = 100
-            tasks[task_id].message = f"Completed: {result['successful_count']}/{result['total_products']} products successful (attempt {retry_count})"
-            tasks[task_id].current_stage = "completed"
-            tasks[task_id].current_operation = "Task completed"
-            tasks[task_id].results = result['products']
+            tasks.update(task_id,
+                         status="completed",
+                         progress=100,
+                         message=f"Completed: {result['successful_count']}/{result['total_products']} products successful (attempt {retry_count})",
+                         current_stage="completed",
+                         current_operation="Task completed",
+                         results=result['products'])
             logger.info(f"✅ Task {task_id} completed successfully: {result['successful_count']}/{result['total_products']} products after {retry_count} attempts")
         elif result and result['success'] and result['successful_count'] == 0:
-            tasks[task_id].status = "completed"
-            tasks[task_id].progress = 100
-            tasks[task_id].message = f"No products found after {retry_count} attempts"
-            tasks[task_id].current_stage = "completed"
-            tasks[task_id].current_operation = "No results found"
-            tasks[task_id].results = []
+            tasks.update(task_id,
+                         status="completed",
+                         progress=100,
+                         message=f"No products found after {retry_count} attempts",
+                         current_stage="completed",
+                         current_operation="No results found",
+                         results=[])
             logger.warning(f"⚠️ Task {task_id} completed with zero results after {retry_count} attempts")
         else:
-            tasks[task_id].status = "failed"
-            tasks[task_id].progress = 0
-            tasks[task_id].message = f"Task failed after {retry_count} attempts: {result.get('error', 'Unknown error') if result else 'No result'}"
-            tasks[task_id].current_stage = "failed"
-            tasks[task_id].current_operation = "Error occurred"
+            tasks.update(task_id,
+                         status="failed",
+                         progress=0,
+                         message=f"Task failed after {retry_count} attempts: {result.get('error', 'Unknown error') if result else 'No result'}",
+                         current_stage="failed",
+                         current_operation="Error occurred")
             logger.error(f"❌ Task {task_id} failed after {retry_count} attempts")
         
     except Exception as e:
         logger.error(f"❌ Error in background task {task_id}: {e}")
-        tasks[task_id].status = "failed"
-        tasks[task_id].progress = 0
-        tasks[task_id].message = f"Task failed after {retry_count} attempts: {str(e)}"
-        tasks[task_id].current_stage = "failed"
-        tasks[task_id].current_operation = "Error occurred"
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     status="failed",
+                     progress=0,
+                     message=f"Task failed after {retry_count} attempts: {str(e)}",
+                     current_stage="failed",
+                     current_operation="Error occurred",
+                     last_updated=datetime.now().isoformat())
 
 def run_scraping_sync(task_id: str, search_term: str, max_products: int):
     """Synchronous scraping function to run in thread pool"""
+    scraper = None
     try:
         # Create scraper
         scraper = AmazonScraper(
@@ -1575,11 +1572,12 @@ def run_scraping_sync(task_id: str, search_term: str, max_products: int):
         )
         
         # Update status
-        tasks[task_id].progress = 20
-        tasks[task_id].message = "Searching for products..."
-        tasks[task_id].current_stage = "searching"
-        tasks[task_id].current_operation = "Getting product links"
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     progress=20,
+                     message="Searching for products...",
+                     current_stage="searching",
+                     current_operation="Getting product links",
+                     last_updated=datetime.now().isoformat())
         
         # Get product links
         links = scraper.get_products_links()
@@ -1599,26 +1597,29 @@ def run_scraping_sync(task_id: str, search_term: str, max_products: int):
             if asin:
                 asins.append(asin)
         
-        tasks[task_id].total_products_found = len(asins)
-        tasks[task_id].progress = 40
-        tasks[task_id].message = f"Processing {len(asins)} products..."
-        tasks[task_id].current_stage = "processing"
-        tasks[task_id].current_operation = "Scraping product details"
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     total_products_found=len(asins),
+                     progress=40,
+                     message=f"Processing {len(asins)} products...",
+                     current_stage="processing",
+                     current_operation="Scraping product details",
+                     last_updated=datetime.now().isoformat())
         
         # Process products
         products = []
         successful_count = 0
+        failed_count = tasks.get_field(task_id, 'failure_count', 0)  # accumulates across retries
         
         for i, asin in enumerate(asins):
             try:
                 # Update progress
                 progress = 40 + (i / len(asins)) * 50
-                tasks[task_id].progress = int(progress)
-                tasks[task_id].message = f"Processing product {i+1}/{len(asins)}"
-                tasks[task_id].current_product_title = f"ASIN: {asin}"
-                tasks[task_id].products_processed = i + 1
-                tasks[task_id].last_updated = datetime.now().isoformat()
+                tasks.update(task_id,
+                             progress=int(progress),
+                             message=f"Processing product {i+1}/{len(asins)}",
+                             current_product_title=f"ASIN: {asin}",
+                             products_processed=i + 1,
+                             last_updated=datetime.now().isoformat())
                 
                 product = scraper.get_single_product_info(asin)
                 if product:
@@ -1638,18 +1639,17 @@ def run_scraping_sync(task_id: str, search_term: str, max_products: int):
                     )
                     products.append(product_data)
                     successful_count += 1
-                    tasks[task_id].success_count = successful_count
+                    tasks.update(task_id, success_count=successful_count)
                 else:
-                    tasks[task_id].failure_count += 1
+                    failed_count += 1
+                    tasks.update(task_id, failure_count=failed_count)
                     
             except Exception as e:
                 logger.error(f"Error processing product {asin}: {e}")
-                tasks[task_id].failure_count += 1
+                failed_count += 1
+                tasks.update(task_id, failure_count=failed_count)
                 continue
         
-        # Clean up
-        scraper.driver.quit()
-        
         return {
             'success': True,
             'products': products,
@@ -1667,6 +1667,10 @@ def run_scraping_sync(task_id: str, search_term: str, max_products: int):
             'total_products': 0,
             'error': str(e)
         }
+    finally:
+        # Return the browser to the pool, even when scraping failed part-way
+        if scraper:
+            scraper.close_driver()
 
 
 if __name__ == '__main__':
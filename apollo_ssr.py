@@ -0,0 +1,219 @@
+"""
+Apollo SSR Extraction
+
+ProductHunt pages ship their GraphQL results inline, as script pushes:
+
+    (window[Symbol.for("ApolloSSRDataTransport")] ??= []).push({"rehydrate":...,"events":[...]})
+
+Scrapers used to parse the whole page with BeautifulSoup, ``get_text()`` every
+``<script>`` and replace ``undefined`` everywhere before ``json.loads``. That
+replacement also rewrote any product text containing the word. Here each push
+is found with a plain substring scan: no DOM, no per-script text copies. Pushes
+are parsed lazily, one at a time, so callers that only need the first one don't
+decode the rest.
+
+- JSON goes through orjson when it is installed (it is in requirements),
+  otherwise through the stdlib ``json`` module
+- a push is parsed as-is first. Only if that fails are bare ``undefined`` values
+  (after ``:``, ``,`` or ``[``) turned into ``null``, by a pattern that steps over
+  quoted strings, so text inside strings is never rewritten
+- pages can be passed as ``response.content`` (bytes, no decode needed) or text
+
+``python apollo_ssr.py --save fixtures/producthunt`` saves the homepage and a
+category page; ``python apollo_ssr.py fixtures/producthunt/*.html`` then compares
+the scan with the old BeautifulSoup path on them. ``python apollo_ssr.py --synthetic``
+runs the same comparison on a generated homepage-shaped page (``synthetic_homepage``).
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import string
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+PUSH_PREFIX = '(window[Symbol.for("ApolloSSRDataTransport")] ??= []).push('
+SCRIPT_END = '</script>'
+
+# A JS ``undefined`` standing in for a value. Quoted strings are matched (and kept)
+# first, so the scan never lands inside one and "a,undefined]" in text survives.
+_UNDEFINED = r'"(?:\\.|[^"\\])*"|(?<=[:,\[])(\s*)undefined(?=\s*[,}\]])'
+UNDEFINED_TEXT = re.compile(_UNDEFINED)
+UNDEFINED_BYTES = re.compile(_UNDEFINED.encode())
+
+Page = Union[str, bytes]
+
+# Pages saved by ``--save`` for the benchmark
+FIXTURE_PAGES = {
+    "homepage.html": "https://www.producthunt.com/",
+    "category.html": "https://www.producthunt.com/categories/ai-notetakers?order=highest_rated",
+}
+
+
+def _parse(payload: Page) -> Any:
+    return orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+
+
+def _undefined_to_null(match):
+    if match.group(1) is None:
+        return match.group(0)
+    return match.group(1) + (b'null' if isinstance(match.group(0), bytes) else 'null')
+
+
+def _loads(payload: Page) -> Any:
+    try:
+        return _parse(payload)
+    except ValueError:
+        # Usually bare ``undefined`` values; anything else fails again below
+        if isinstance(payload, bytes):
+            if b'undefined' not in payload:
+                raise
+            return _parse(UNDEFINED_BYTES.sub(_undefined_to_null, payload))
+        if 'undefined' not in payload:
+            raise
+        return _parse(UNDEFINED_TEXT.sub(_undefined_to_null, payload))
+
+
+def iter_apollo_pushes(page: Page) -> Iterator[Dict[str, Any]]:
+    """Yield the payload of each ApolloSSRDataTransport push, in page order; malformed pushes are skipped"""
+    is_bytes = isinstance(page, (bytes, bytearray))
+    prefix = PUSH_PREFIX.encode() if is_bytes else PUSH_PREFIX
+    script_end = SCRIPT_END.encode() if is_bytes else SCRIPT_END
+    position = 0
+    while True:
+        start = page.find(prefix, position)
+        if start < 0:
+            return
+        start += len(prefix)
+        end = page.find(script_end, start)
+        if end < 0:
+            return
+        position = end + len(script_end)
+        # The script ends with the call's closing parenthesis (and maybe a semicolon)
+        payload = page[start:end].rstrip().rstrip(b';' if is_bytes else ';').rstrip()
+        try:
+            if payload[-1:] != (b')' if is_bytes else ')'):
+                raise ValueError("push call is not closed")
+            yield _loads(payload[:-1])
+        except ValueError as e:
+            logger.warning(f"⚠️ Skipping malformed Apollo SSR push at offset {start}: {str(e)}")
+
+
+def extract_apollo_data(page: Page) -> Optional[Dict[str, Any]]:
+    """The first ApolloSSRDataTransport push on the page (the one the scrapers read events from)"""
+    return next(iter_apollo_pushes(page), None)
+
+
+def _legacy_extract(text: str) -> Optional[Dict[str, Any]]:
+    """The BeautifulSoup path this module replaced, kept for the benchmark"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(text, 'html.parser')
+    for script in soup.find_all('script'):
+        content = script.get_text()
+        if content and content.strip().startswith('(window[Symbol.for("ApolloSSRDataTransport")]'):
+            content = (content.replace(PUSH_PREFIX, '').replace('undefined', 'null'))[:-1]
+            return json.loads(content)
+    return None
+
+
+def compare_extractors(html: bytes, rounds: int = 20) -> Dict[str, Dict[str, float]]:
+    """Average time per page of the old BeautifulSoup path and of ``extract_apollo_data`` (bytes and text)"""
+    text = html.decode()
+    results = {}
+    for name, extract, page in [
+        ("beautifulsoup (old)", _legacy_extract, text),
+        ("scan + orjson, text", extract_apollo_data, text),
+        ("scan + orjson, bytes", extract_apollo_data, html),
+    ]:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            data = extract(page)
+        results[name] = {
+            "ms": (time.perf_counter() - started) * 1000 / rounds,
+            "events": len(data.get("events", [])) if data else 0,
+        }
+    return results
+
+
+def synthetic_homepage(products: int = 60, seed: int = 1) -> bytes:
+    """A deterministic homepage-shaped page: Next.js chunks, ~1,500 cards and one Apollo push with bare undefineds"""
+    rng = random.Random(seed)
+
+    def word(length: int) -> str:
+        return ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+    def product(index: int) -> Dict[str, Any]:
+        return {
+            "__typename": "Post", "id": str(1000 + index), "name": word(8).title(), "slug": word(10),
+            "tagline": " ".join(word(6) for _ in range(8)),
+            # Some descriptions contain the word, including right after a comma
+            "description": " ".join(word(7) for _ in range(40)) + (" undefined behaviour, a,undefined] b" if index % 7 == 0 else ""),
+            "thumbnailImageUuid": f"{word(8)}-{word(4)}.png", "shortenedUrl": f"/r/{word(6)}",
+            "votesCount": rng.randint(1, 900), "commentsCount": rng.randint(0, 90),
+            "topics": {"edges": [{"node": {"name": word(6).title(), "slug": word(6)}} for _ in range(3)]},
+            "latestScore": "UNDEFINED_VALUE",
+        }
+
+    events: List[Dict[str, Any]] = [{"type": "started", "options": {"query": "x"}, "id": str(k)} for k in range(3)]
+    events.append({"type": "data", "id": "3", "value": {"data": {"homefeed": {
+        "pageInfo": {"hasNextPage": True, "endCursor": "MjA"},
+        "edges": [{"node": {"items": [product(index) for index in range(products)]}}],
+    }}}})
+    events.append({"type": "complete", "id": "3"})
+    push = json.dumps({"rehydrate": {":R1:": {"data": None, "networkStatus": 1}}, "events": events},
+                      separators=(",", ":")).replace('"UNDEFINED_VALUE"', "undefined")
+    cards = "".join(
+        f'<div class="flex flex-col gap-3 text-16 {word(5)}"><a href="/posts/{word(8)}">'
+        f'<img src="https://ph-files.imgix.net/{word(10)}.png" class="rounded-xl"/></a><span>{word(30)}</span></div>'
+        for _ in range(1500)
+    )
+    scripts = "".join(
+        f'<script src="/_next/static/chunks/{word(12)}.js" async></script><script>self.__next_f.push([1,"{word(400)}"])</script>'
+        for _ in range(40)
+    )
+    return (f'<!DOCTYPE html><html><head><title>Product Hunt</title>{scripts}</head><body>'
+            f'<div id="root-container">{cards}</div><script>{PUSH_PREFIX}{push})</script>'
+            f'<script>{PUSH_PREFIX}{{"events":[]}})</script></body></html>').encode()
+
+
+def save_fixture_pages(directory: str):
+    """Fetch the pages in FIXTURE_PAGES with the browser-impersonating client and save them as-is"""
+    from http_clients import http_clients
+    os.makedirs(directory, exist_ok=True)
+    for filename, url in FIXTURE_PAGES.items():
+        response = http_clients.curl("chrome").get(url, timeout=30)
+        response.raise_for_status()
+        pushes = sum(1 for _ in iter_apollo_pushes(response.content))
+        with open(os.path.join(directory, filename), "wb") as page_file:
+            page_file.write(response.content)
+        print(f"{url} -> {filename} ({len(response.content):,} bytes, {pushes} Apollo pushes)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--save"]:
+        save_fixture_pages(sys.argv[2] if len(sys.argv) > 2 else "fixtures/producthunt")
+        sys.exit(0)
+    pages = []
+    for path in sys.argv[1:]:
+        if path == "--synthetic":
+            pages.append(("synthetic homepage", synthetic_homepage()))
+            continue
+        with open(path, "rb") as page_file:
+            pages.append((path, page_file.read()))
+    for path, html in pages:
+        print(f"{path} ({len(html):,} bytes)")
+        baseline = None
+        for name, result in compare_extractors(html).items():
+            baseline = baseline or result["ms"]
+            print(f"  {name:<22} {result['ms']:8.2f} ms  ({baseline / result['ms']:5.1f}x)  events={result['events']}")
@@ -4,10 +4,12 @@ Data APIs Main Application
 FastAPI application serving various data scraping and processing APIs.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
 
@@ -23,6 +25,13 @@ from zillow_api import router as zillow_router
 from crunchbase_api import router as crunchbase_router
 from similarweb_api import router as similarweb_router
 from realtor_api import router as realtor_router
+from cache_warmer import cache_warmer
+from domain_resolver import domain_resolver
+from http_clients import http_clients
+from job_scheduler import scheduler
+from rate_limiter import rate_limits
+from redis_cache import response_cache
+from single_flight import single_flight
 
 # Configure logging
 logging.basicConfig(
@@ -31,13 +40,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared upstream HTTP clients - every router reuses these keep-alive pools
+http_clients.configure()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keeps the predictable ProductHunt keys warm (jobs are registered by the routers)
+    cache_warmer.start()
+    yield
+    await cache_warmer.stop()
+    await domain_resolver.aclose()
+    await http_clients.aclose()
+    http_clients.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Data APIs",
     description="Collection of data scraping and processing APIs",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -83,7 +108,12 @@ async def root():
             "/crunchbase - Crunchbase Company Information",
             "/similarweb - SimilarWeb Website Analytics",
             "/docs - API Documentation",
-            "/health - Health Check"
+            "/health - Health Check",
+            "/scheduler/queues - Background Job Queue Stats",
+            "/http/pools - Upstream HTTP Connection Pool Stats",
+            "/cache/stats - Response Cache Stats",
+            "/cache/keys - Cached Keys with TTL and Memory (paginated)",
+            "/cache/warmer - Cache Warm-up Jobs and Run History"
         ]
     }
 
@@ -96,6 +126,44 @@ async def health_check():
         "service": "Data APIs"
     }
 
+@app.get("/scheduler/queues")
+async def scheduler_queues():
+    """Queue depth, running jobs and limits per scraping source"""
+    return {**scheduler.get_stats(), "single_flight": single_flight.get_stats()}
+
+@app.get("/http/pools")
+async def http_pools():
+    """Upstream HTTP connection pools, request counts per host, rate-limit buckets and the domain resolver"""
+    return {**http_clients.get_stats(), "rate_limits": rate_limits.get_stats(), "domain_resolver": domain_resolver.get_stats()}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Cached endpoints and hit/miss counters per cache tier"""
+    return response_cache.get_stats()
+
+@app.get("/cache/keys")
+async def cache_keys(
+    pattern: str = Query("*", description="Glob pattern, e.g. 'similarweb:*'"),
+    cursor: int = Query(0, ge=0, description="next_cursor from the previous page (0 to start)"),
+    count: int = Query(500, ge=1, le=5000, description="Approximate number of keys to examine per page")
+):
+    """One SCAN page of cached keys with TTL and memory use"""
+    if not response_cache.redis_client:
+        raise HTTPException(status_code=503, detail="Redis not available")
+    return await asyncio.to_thread(response_cache.scan_entries, pattern, cursor, count)
+
+@app.get("/cache/warmer")
+async def cache_warmer_stats():
+    """Scheduled cache warm-up jobs, next run times and recent run history"""
+    return cache_warmer.get_stats()
+
+@app.post("/cache/warmer/{job_name}/run")
+async def run_cache_warmer_job(job_name: str):
+    """Run one warm-up job now, outside its schedule"""
+    if job_name not in cache_warmer.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown warm-up job '{job_name}'")
+    return await cache_warmer.run_now(job_name)
+
 if __name__ == "__main__":
     # Run the server
     uvicorn.run(
@@ -0,0 +1,326 @@
+"""
+Browser Pool
+
+Keeps pre-launched Chrome sessions (headless by default) warm so Selenium scrapers don't pay
+Chrome start-up on every task.
+
+Scrapers lease a driver, use it, and hand it back. Between leases the pool
+resets browser state (cookies, storage, extra tabs) and checks the session is
+still alive. Drivers are recycled after ``max_uses`` leases and closed once
+they have sat idle for ``idle_timeout`` seconds.
+
+Configuration (environment):
+    BROWSER_POOL_SIZE          Max Chrome sessions per process (default 4)
+    BROWSER_POOL_MAX_USES      Leases before a driver is recycled (default 25)
+    BROWSER_POOL_IDLE_TIMEOUT  Seconds an idle driver is kept alive (default 300)
+    BROWSER_POOL_LEASE_TIMEOUT Seconds to wait for a free driver (default 120)
+    BROWSER_POOL_PREWARM       Drivers to launch up front by ``prewarm()`` (default 0)
+    BROWSER_POOL_HEADLESS      Launch Chrome headless (default true; false needs a display)
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'size': int(os.getenv("BROWSER_POOL_SIZE", 4)),
+    'max_uses': int(os.getenv("BROWSER_POOL_MAX_USES", 25)),
+    'idle_timeout': float(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", 300)),
+    'lease_timeout': float(os.getenv("BROWSER_POOL_LEASE_TIMEOUT", 120)),
+    'prewarm': int(os.getenv("BROWSER_POOL_PREWARM", 0)),
+    'headless': os.getenv("BROWSER_POOL_HEADLESS", "true").lower() in ("1", "true", "yes"),
+    'create_attempts': 3,
+    'create_retry_delay': 0.5,
+}
+
+# Same Chrome arguments the scrapers used when launching their own drivers
+CHROME_ARGS = [
+    "disable-cookies",
+    "disable-extensions",
+    "disable-gpu",
+    "disable-infobars",
+    "disable-notifications",
+    "disable-popup-blocking",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-ipc-flooding-protection",
+    "user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "--remote-debugging-pipe",
+]
+
+
+def create_chrome_driver(headless: bool = True):
+    """Launch a new Chrome driver with the shared options"""
+    options = webdriver.ChromeOptions()
+    for arg in CHROME_ARGS:
+        options.add_argument(arg)
+    if headless:
+        options.add_argument("--headless")
+    # Network events in the performance log let scrapers read XHR payloads (gmaps RPC mode)
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    driver = webdriver.Chrome(options=options)
+    logger.info(f"🚗 Chrome started (browser {driver.capabilities.get('browserVersion', 'Unknown')})")
+    return driver
+
+
+class PooledBrowser:
+    """A Chrome driver plus the bookkeeping the pool needs"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class BrowserPool:
+    """Thread-safe pool of warm Chrome drivers"""
+
+    def __init__(self, size: int = CONFIG['size'], max_uses: int = CONFIG['max_uses'],
+                 idle_timeout: float = CONFIG['idle_timeout'], headless: bool = CONFIG['headless']):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.idle_timeout = idle_timeout
+        self.headless = headless
+        self._init_state()
+
+    def _init_state(self):
+        self._pid = os.getpid()
+        self._lock = threading.Condition()
+        self._idle: List[PooledBrowser] = []
+        self._leased: Dict[int, PooledBrowser] = {}
+        self._creating = 0
+        self._closed = False
+        self._reaper: Optional[threading.Thread] = None
+        self.stats_counters = {"created": 0, "reused": 0, "recycled": 0, "unhealthy": 0, "idle_closed": 0}
+
+    def _check_process(self):
+        # Drivers inherited through fork belong to the parent; start with an empty pool
+        if os.getpid() != self._pid:
+            self._init_state()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Lease a healthy driver, launching one if the pool has room"""
+        self._check_process()
+        self._start_reaper()
+        deadline = time.time() + (CONFIG['lease_timeout'] if timeout is None else timeout)
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Browser pool is shut down")
+
+                browser = self._idle.pop() if self._idle else None
+                if browser is None:
+                    if len(self._leased) + len(self._idle) + self._creating < self.size:
+                        self._creating += 1
+                    else:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No browser free in pool after waiting (size={self.size})")
+                        self._lock.wait(timeout=min(remaining, 1.0))
+                        continue
+
+            if browser is not None:
+                if self._is_healthy(browser.driver):
+                    self.stats_counters["reused"] += 1
+                    return self._lease(browser)
+                logger.warning("⚠️ Pooled browser failed health check - replacing it")
+                self.stats_counters["unhealthy"] += 1
+                self._quit(browser.driver)
+                with self._lock:
+                    self._lock.notify()
+                continue
+
+            try:
+                browser = PooledBrowser(self._create_driver())
+            finally:
+                with self._lock:
+                    self._creating -= 1
+            return self._lease(browser)
+
+    def release(self, driver, discard: bool = False):
+        """Return a driver to the pool, resetting its state first"""
+        with self._lock:
+            browser = self._leased.pop(id(driver), None)
+
+        if browser is None:
+            # Not one of ours (or leased before a fork) - just close it
+            self._quit(driver)
+            return
+
+        browser.last_used = time.time()
+        if discard or self._closed:
+            self._quit(driver)
+        elif browser.uses >= self.max_uses:
+            logger.info(f"♻️ Recycling browser after {browser.uses} uses")
+            self.stats_counters["recycled"] += 1
+            self._quit(driver)
+        elif not self._reset(driver):
+            self.stats_counters["unhealthy"] += 1
+            self._quit(driver)
+        else:
+            with self._lock:
+                self._idle.append(browser)
+
+        with self._lock:
+            self._lock.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """``with browser_pool.lease() as driver:`` - released even on errors"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            # A driver left wedged by an error fails its reset and is closed instead of reused
+            self.release(driver)
+
+    def prewarm(self, count: Optional[int] = None):
+        """Launch drivers up front so the first tasks don't wait on Chrome"""
+        self._check_process()
+        self._start_reaper()
+        count = CONFIG['prewarm'] if count is None else count
+        started = 0
+        for _ in range(count):
+            with self._lock:
+                if self._closed or len(self._leased) + len(self._idle) + self._creating >= self.size:
+                    break
+                self._creating += 1
+            try:
+                browser = PooledBrowser(self._create_driver())
+            except Exception as e:
+                logger.warning(f"⚠️ Browser prewarm stopped early: {str(e)}")
+                break
+            finally:
+                with self._lock:
+                    self._creating -= 1
+            with self._lock:
+                self._idle.append(browser)
+                self._lock.notify()
+            started += 1
+        if started:
+            logger.info(f"🔥 Prewarmed {started} browser(s)")
+
+    def shutdown(self):
+        """Close every idle driver; leased ones are closed as they come back"""
+        self._check_process()
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+        for browser in idle:
+            self._quit(browser.driver)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "max_uses": self.max_uses,
+                "idle_timeout": self.idle_timeout,
+                "headless": self.headless,
+                **self.stats_counters,
+            }
+
+    def _lease(self, browser: PooledBrowser):
+        browser.uses += 1
+        browser.last_used = time.time()
+        with self._lock:
+            self._leased[id(browser.driver)] = browser
+        return browser.driver
+
+    def _create_driver(self):
+        for attempt in range(CONFIG['create_attempts']):
+            try:
+                driver = create_chrome_driver(self.headless)
+                self.stats_counters["created"] += 1
+                return driver
+            except Exception as e:
+                logger.warning(f"❌ Chrome launch attempt {attempt + 1} failed: {str(e)}")
+                if attempt == CONFIG['create_attempts'] - 1:
+                    raise
+                time.sleep(CONFIG['create_retry_delay'])
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _reset(self, driver) -> bool:
+        """Clear cookies, storage and extra tabs so the next lease starts clean"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            except Exception:
+                pass
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "local_storage,indexeddb,service_workers,cache_storage"})
+            except Exception:
+                driver.delete_all_cookies()
+
+            driver.implicitly_wait(0)
+            driver.get("about:blank")
+            try:
+                # Drop buffered network events so the next lease only sees its own traffic
+                driver.get_log("performance")
+            except Exception:
+                pass
+            return self._is_healthy(driver)
+        except Exception as e:
+            logger.warning(f"⚠️ Browser reset failed - closing it: {str(e)}")
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error closing browser: {str(e)}")
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None or self.idle_timeout <= 0:
+                return
+            self._reaper = threading.Thread(target=self._reap_idle, name="browser-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_idle(self):
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while not self._closed:
+            time.sleep(interval)
+            cutoff = time.time() - self.idle_timeout
+            with self._lock:
+                expired = [b for b in self._idle if b.last_used < cutoff]
+                self._idle = [b for b in self._idle if b.last_used >= cutoff]
+            for browser in expired:
+                self.stats_counters["idle_closed"] += 1
+                self._quit(browser.driver)
+            if expired:
+                logger.info(f"🧹 Closed {len(expired)} idle browser(s)")
+
+
+# Global pool instance (one per process)
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
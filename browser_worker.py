@@ -0,0 +1,257 @@
+"""
+Browser Worker
+
+Runs Selenium-heavy scraping jobs outside the API process.
+
+The API process only enqueues jobs (see ``SCHEDULER_REMOTE_SOURCES`` in
+job_scheduler.py). This worker pulls task ids from the per-source Redis lists,
+loads the job payload, and calls the same task function the API would have run.
+Progress and results are written through the shared task store, so
+``/status`` and ``/results`` polls on any API node see them as they happen.
+
+Usage:
+    python browser_worker.py --sources gmaps,amazon,chrome_webstore --concurrency 2
+
+Run several workers (or one per node) to scale browser capacity independently
+of the API servers.
+
+Jobs are never only in a worker's memory. A task id is moved (``LMOVE``) from
+its source queue into the worker's own processing list and removed once the
+job ends. Each worker refreshes a heartbeat key while it runs. Every worker
+also reaps the processing lists of workers whose heartbeat has expired
+(crash, OOM, SIGKILL): their jobs go back to the front of their queue, or are
+marked failed once they have been handed out ``BROWSER_WORKER_MAX_ATTEMPTS``
+times, so single-flight never keeps attaching requests to a dead task.
+
+Configuration (environment):
+    BROWSER_WORKER_HEARTBEAT     Seconds between heartbeats (default 10)
+    BROWSER_WORKER_LEASE         Seconds without a heartbeat before a worker counts as dead (default 60)
+    BROWSER_WORKER_MAX_ATTEMPTS  Times a job is handed out before it is marked failed (default 2)
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from pydantic import BaseModel
+
+from browser_pool import browser_pool
+from job_scheduler import (REMOTE_ATTEMPTS_KEY, REMOTE_HEARTBEAT_PREFIX, REMOTE_PAYLOAD_PREFIX,
+                           REMOTE_PROCESSING_PREFIX, REMOTE_QUEUE_PREFIX, REMOTE_WORKERS_KEY)
+from task_store import TaskCollection, create_redis_client
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCES = "gmaps,amazon,chrome_webstore"
+
+CONFIG = {
+    'heartbeat': float(os.getenv("BROWSER_WORKER_HEARTBEAT", 10)),
+    'lease': int(os.getenv("BROWSER_WORKER_LEASE", 60)),
+    'max_attempts': int(os.getenv("BROWSER_WORKER_MAX_ATTEMPTS", 2)),
+}
+
+
+def load_job_function(path: str) -> Callable:
+    """Resolve ``"module:qualname"`` to the task function"""
+    module_name, qualname = path.split(":", 1)
+    target = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+    return target
+
+
+def build_arguments(func: Callable, args: List[Any], kwargs: Dict[str, Any]):
+    """Turn JSON-decoded dicts back into the pydantic models the function expects"""
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {}
+    params = list(inspect.signature(func).parameters.values())
+
+    def coerce(name: str, value: Any) -> Any:
+        annotation = hints.get(name)
+        if isinstance(value, dict) and inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+            return annotation(**value)
+        return value
+
+    built_args = [coerce(params[i].name, value) if i < len(params) else value for i, value in enumerate(args)]
+    built_kwargs = {name: coerce(name, value) for name, value in kwargs.items()}
+    return built_args, built_kwargs
+
+
+class BrowserWorker:
+    """Pulls jobs from Redis and runs up to ``concurrency`` of them at once"""
+
+    def __init__(self, sources: List[str], concurrency: int):
+        self.sources = sources
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.redis = create_redis_client()
+        if self.redis is None:
+            raise RuntimeError("Browser worker needs Redis (REDIS_HOST_I / REDIS_HOST_P) to pull jobs")
+
+        self.processing_key = f"{REMOTE_PROCESSING_PREFIX}{self.worker_id}"
+        self.jobs = TaskCollection("scheduler")
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="browser-job")
+        self.stopping = threading.Event()
+
+    def stop(self, *_):
+        logger.info("🛑 Stop requested - finishing running jobs")
+        self.stopping.set()
+
+    def run(self):
+        queue_keys = [f"{REMOTE_QUEUE_PREFIX}{source}" for source in self.sources]
+        logger.info(f"🚀 Browser worker {self.worker_id} started: sources={self.sources}, concurrency={self.concurrency}")
+        self._heartbeat()
+        self.redis.sadd(REMOTE_WORKERS_KEY, self.worker_id)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="browser-worker-heartbeat", daemon=True)
+        heartbeat.start()
+        browser_pool.prewarm()
+
+        turn = 0
+        while not self.stopping.is_set():
+            # Only take a job when a slot is free, so queued jobs stay visible to other workers
+            if not self.slots.acquire(timeout=1):
+                continue
+
+            task_id = self._take(queue_keys, turn)
+            turn += 1
+            if task_id is None:
+                self.slots.release()
+                continue
+
+            payload = self.redis.get(f"{REMOTE_PAYLOAD_PREFIX}{task_id}")
+            if payload is None:
+                logger.warning(f"⚠️ No payload for task {task_id} - skipping")
+                self.redis.lrem(self.processing_key, 1, task_id)
+                self.slots.release()
+                continue
+
+            self.redis.hincrby(REMOTE_ATTEMPTS_KEY, task_id, 1)
+            self.executor.submit(self._run_job, json.loads(payload))
+
+        self.executor.shutdown(wait=True)
+        browser_pool.shutdown()
+        # Everything taken has finished, so nothing is left for a reaper
+        pipe = self.redis.pipeline()
+        pipe.delete(f"{REMOTE_HEARTBEAT_PREFIX}{self.worker_id}")
+        pipe.srem(REMOTE_WORKERS_KEY, self.worker_id)
+        pipe.execute()
+        logger.info(f"👋 Browser worker {self.worker_id} stopped")
+
+    def _take(self, queue_keys: List[str], turn: int):
+        """Move the next task id from a source queue into this worker's processing list"""
+        # Any queue with work first, then block briefly on one of them (rotating, as BLMOVE watches a single key)
+        for queue_key in queue_keys:
+            task_id = self.redis.lmove(queue_key, self.processing_key, "LEFT", "RIGHT")
+            if task_id is not None:
+                return task_id
+        return self.redis.blmove(queue_keys[turn % len(queue_keys)], self.processing_key, 1, "LEFT", "RIGHT")
+
+    def _heartbeat(self):
+        self.redis.set(f"{REMOTE_HEARTBEAT_PREFIX}{self.worker_id}", int(time.time()), ex=CONFIG['lease'])
+
+    def _heartbeat_loop(self):
+        while not self.stopping.wait(CONFIG['heartbeat']):
+            try:
+                self._heartbeat()
+                self.reap_dead_workers()
+            except Exception as e:
+                logger.warning(f"⚠️ Heartbeat failed for worker {self.worker_id}: {str(e)}")
+
+    def reap_dead_workers(self):
+        """Re-queue (or fail) the jobs held by workers whose heartbeat has expired"""
+        for worker_id in self.redis.smembers(REMOTE_WORKERS_KEY):
+            if worker_id == self.worker_id or self.redis.exists(f"{REMOTE_HEARTBEAT_PREFIX}{worker_id}"):
+                continue
+            # One reaper per dead worker at a time
+            if not self.redis.set(f"jobs:reaping:{worker_id}", self.worker_id, nx=True, ex=CONFIG['lease']):
+                continue
+            processing_key = f"{REMOTE_PROCESSING_PREFIX}{worker_id}"
+            for task_id in self.redis.lrange(processing_key, 0, -1):
+                self._recover(worker_id, task_id)
+                self.redis.lrem(processing_key, 1, task_id)
+            self.redis.srem(REMOTE_WORKERS_KEY, worker_id)
+            logger.info(f"🧹 Reaped jobs of dead worker {worker_id}")
+
+    def _recover(self, worker_id: str, task_id: str):
+        payload = self.redis.get(f"{REMOTE_PAYLOAD_PREFIX}{task_id}")
+        attempts = int(self.redis.hget(REMOTE_ATTEMPTS_KEY, task_id) or 0)
+        if payload is not None and attempts < CONFIG['max_attempts']:
+            source = json.loads(payload)["source"]
+            self.redis.lpush(f"{REMOTE_QUEUE_PREFIX}{source}", task_id)
+            self.jobs.update(task_id, state="queued", worker=None)
+            logger.warning(f"♻️ Re-queued task {task_id} from dead worker {worker_id} (attempt {attempts})")
+        else:
+            self.jobs.update(task_id, state="failed", failed_reason=f"worker {worker_id} died")
+            pipe = self.redis.pipeline()
+            pipe.delete(f"{REMOTE_PAYLOAD_PREFIX}{task_id}")
+            pipe.hdel(REMOTE_ATTEMPTS_KEY, task_id)
+            pipe.execute()
+            logger.error(f"❌ Task {task_id} failed: worker {worker_id} died ({attempts} attempt(s))")
+
+    def _run_job(self, payload: Dict[str, Any]):
+        task_id = payload["task_id"]
+        started_at = time.time()
+        wait_seconds = started_at - payload.get("queued_at", started_at)
+        logger.info(f"▶️ Worker {self.worker_id} starting {payload['source']} task {task_id} after {wait_seconds:.1f}s in queue")
+        self.jobs.update(task_id, state="running", worker=self.worker_id, started_at=datetime.now().isoformat())
+
+        try:
+            func = load_job_function(payload["func"])
+            args, kwargs = build_arguments(func, payload.get("args", []), payload.get("kwargs", {}))
+            if asyncio.iscoroutinefunction(func):
+                asyncio.run(func(*args, **kwargs))
+            else:
+                func(*args, **kwargs)
+            self.jobs.update(task_id, state="finished")
+            logger.info(f"✅ Task {task_id} finished in {time.time() - started_at:.1f}s")
+        except Exception as e:
+            self.jobs.update(task_id, state="failed")
+            logger.error(f"❌ Task {task_id} raised: {str(e)}")
+            logger.error(traceback.format_exc())
+        finally:
+            pipe = self.redis.pipeline()
+            pipe.delete(f"{REMOTE_PAYLOAD_PREFIX}{task_id}")
+            pipe.hdel(REMOTE_ATTEMPTS_KEY, task_id)
+            pipe.lrem(self.processing_key, 1, task_id)
+            pipe.execute()
+            self.slots.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run browser scraping jobs outside the API process")
+    parser.add_argument("--sources", default=os.getenv("BROWSER_WORKER_SOURCES", DEFAULT_SOURCES),
+                        help="Comma-separated scheduler sources to consume (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BROWSER_WORKER_CONCURRENCY", 2)),
+                        help="Jobs (browsers) to run at once (default: %(default)s)")
+    args = parser.parse_args()
+
+    # Keep at least one warm browser per job slot
+    browser_pool.size = max(browser_pool.size, args.concurrency)
+    worker = BrowserWorker([source.strip() for source in args.sources.split(",") if source.strip()], max(1, args.concurrency))
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
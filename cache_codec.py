@@ -0,0 +1,219 @@
+"""
+Cache Codec
+
+Binary encoding for the values stored in the response cache.
+
+Entries used to be ``json.dumps`` text. Each one is now a header byte followed
+by the serialized payload, which may be compressed:
+
+    header  serializer  compression
+    0x01    json        none
+    0x02    json        lz4
+    0x03    json        zstd
+    0x04    msgpack     none
+    0x05    msgpack     lz4
+    0x06    msgpack     zstd
+
+Header bytes are control characters that never start JSON text. Entries written
+before the codec existed (plain JSON) are still decoded as JSON.
+
+JSON goes through orjson when it is installed, otherwise through the stdlib
+``json`` module; both produce interchangeable bytes. lz4 is in requirements.
+zstandard and msgpack are optional and only used when installed. Payloads
+smaller than ``CACHE_COMPRESS_MIN_BYTES`` are stored uncompressed.
+
+Configuration (environment):
+    CACHE_SERIALIZER          json or msgpack (default json)
+    CACHE_COMPRESSION         lz4, zstd or none (default lz4)
+    CACHE_COMPRESS_MIN_BYTES  Smallest payload worth compressing (default 1024)
+    CACHE_ZSTD_LEVEL          zstd compression level (default 3)
+
+``python cache_codec.py payload.json`` compares the codecs on a saved payload.
+``python cache_codec.py --daily 2026/10/16`` reads that day's cached ProductHunt
+daily rankings from Redis (metadata plus every chunk) and compares on those.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+CONFIG = {
+    'serializer': os.getenv('CACHE_SERIALIZER', 'json').lower(),
+    'compression': os.getenv('CACHE_COMPRESSION', 'lz4').lower(),
+    'compress_min_bytes': int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024)),
+    'zstd_level': int(os.getenv('CACHE_ZSTD_LEVEL', 3)),
+}
+
+HEADERS = {
+    ("json", "none"): 0x01,
+    ("json", "lz4"): 0x02,
+    ("json", "zstd"): 0x03,
+    ("msgpack", "none"): 0x04,
+    ("msgpack", "lz4"): 0x05,
+    ("msgpack", "zstd"): 0x06,
+}
+FORMATS = {header: fmt for fmt, header in HEADERS.items()}
+
+
+def _json_dumps(data: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=str, separators=(",", ":")).encode()
+
+
+def _json_loads(payload: bytes) -> Any:
+    return orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+
+
+SERIALIZERS = {
+    "json": (_json_dumps, _json_loads),
+}
+if MSGPACK_AVAILABLE:
+    SERIALIZERS["msgpack"] = (
+        lambda data: msgpack.packb(data, default=str, use_bin_type=True),
+        lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False),
+    )
+
+COMPRESSORS = {
+    "none": (lambda payload: payload, lambda payload: payload),
+}
+if LZ4_AVAILABLE:
+    COMPRESSORS["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+if ZSTD_AVAILABLE:
+    COMPRESSORS["zstd"] = (
+        lambda payload: zstandard.ZstdCompressor(level=CONFIG['zstd_level']).compress(payload),
+        lambda payload: zstandard.ZstdDecompressor().decompress(payload),
+    )
+
+
+class CacheCodec:
+    """Encodes cache values as ``header byte + payload`` and decodes every known format"""
+
+    def __init__(self, serializer: str = CONFIG['serializer'], compression: str = CONFIG['compression'],
+                 compress_min_bytes: int = CONFIG['compress_min_bytes']):
+        if serializer not in SERIALIZERS:
+            logger.warning(f"⚠️ Cache serializer '{serializer}' is not available - using json")
+            serializer = "json"
+        if compression not in COMPRESSORS:
+            logger.warning(f"⚠️ Cache compression '{compression}' is not available - storing uncompressed")
+            compression = "none"
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+
+    def encode(self, data: Any) -> Tuple[bytes, int]:
+        """Return ``(blob, serialized_size)``; the size is before compression"""
+        payload = SERIALIZERS[self.serializer][0](data)
+        compression = self.compression if len(payload) >= self.compress_min_bytes else "none"
+        blob = COMPRESSORS[compression][0](payload)
+        return bytes([HEADERS[(self.serializer, compression)]]) + blob, len(payload)
+
+    @staticmethod
+    def decode(blob: bytes) -> Tuple[Any, int]:
+        """Return ``(data, serialized_size)`` for a blob in any format, legacy JSON text included"""
+        if not blob or blob[0] not in FORMATS:
+            # Written before the codec existed
+            return _json_loads(blob), len(blob)
+        serializer, compression = FORMATS[blob[0]]
+        if serializer not in SERIALIZERS or compression not in COMPRESSORS:
+            raise ValueError(f"Cache entry uses {serializer}+{compression}, which is not installed")
+        payload = COMPRESSORS[compression][1](blob[1:])
+        return SERIALIZERS[serializer][1](payload), len(payload)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer,
+            "json_library": "orjson" if ORJSON_AVAILABLE else "json",
+            "compression": self.compression,
+            "compress_min_bytes": self.compress_min_bytes,
+        }
+
+
+def compare_codecs(data: Any, rounds: int = 50) -> Dict[str, Dict[str, float]]:
+    """Stored size and average encode/decode time of every installed format (plus legacy JSON text)"""
+    results = {}
+    started = time.perf_counter()
+    for _ in range(rounds):
+        legacy = json.dumps(data, default=str).encode()
+    encode_ms = (time.perf_counter() - started) * 1000 / rounds
+    started = time.perf_counter()
+    for _ in range(rounds):
+        json.loads(legacy)
+    decode_ms = (time.perf_counter() - started) * 1000 / rounds
+    results["legacy json text"] = {"bytes": len(legacy), "encode_ms": encode_ms, "decode_ms": decode_ms}
+
+    for serializer, compression in HEADERS:
+        if serializer not in SERIALIZERS or compression not in COMPRESSORS:
+            continue
+        codec = CacheCodec(serializer, compression, compress_min_bytes=0)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            blob, _ = codec.encode(data)
+        encode_ms = (time.perf_counter() - started) * 1000 / rounds
+        started = time.perf_counter()
+        for _ in range(rounds):
+            codec.decode(blob)
+        decode_ms = (time.perf_counter() - started) * 1000 / rounds
+        results[f"{serializer}+{compression}"] = {"bytes": len(blob), "encode_ms": encode_ms, "decode_ms": decode_ms}
+    return results
+
+
+# Global codec instance
+cache_codec = CacheCodec()
+
+
+def load_cached_daily_rankings(date: str) -> Dict[str, Any]:
+    """The whole daily-rankings payload for ``date`` (YYYY/MM/DD or YYYY-MM-DD) as cached in Redis, chunks reassembled"""
+    from redis_cache import cache
+    # The daily route caches under YYYY/MM/DD
+    date = datetime.strptime(date.replace("-", "/"), "%Y/%m/%d").strftime("%Y/%m/%d")
+    meta, products, _ = cache.get_page("daily_rankings", 0, sys.maxsize, date=date)
+    if meta is None:
+        raise SystemExit(f"No cached daily rankings for {date}")
+    sample = {name: value for name, value in meta.items() if name != "_paged"}
+    sample["products"] = products
+    return sample
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "--daily":
+        sample = load_cached_daily_rankings(sys.argv[2])
+        print(f"daily_rankings {sys.argv[2]}: {len(sample['products'])} products")
+    else:
+        with open(sys.argv[1], "rb") as payload_file:
+            sample = json.load(payload_file)
+    baseline = None
+    for name, result in compare_codecs(sample).items():
+        baseline = baseline or result["bytes"]
+        print(f"{name:<20} {result['bytes']:>10,} bytes ({result['bytes'] / baseline:6.1%})"
+              f"  encode {result['encode_ms']:7.3f} ms  decode {result['decode_ms']:7.3f} ms")
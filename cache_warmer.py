@@ -0,0 +1,202 @@
+"""
+Cache Warmer
+
+Refreshes predictable cache keys on a schedule, so clients don't hit a cold
+cache on the busiest routes (yesterday's and today's ProductHunt rankings,
+today's launches, categories).
+
+Routers register warm jobs:
+
+    cache_warmer.register("producthunt:todays_launches", warm_todays_launches,
+                          every=3600, offset=60, jitter=30)
+
+A job runs every ``every`` seconds, aligned to the clock at ``offset`` seconds
+past each multiple of ``every``. The example above behaves like the cron entry
+``1 * * * *``. Up to ``jitter`` random seconds are added on top, so jobs don't
+all hit upstream at the same moment. A job is a sync or async callable, and
+whatever it returns is recorded in the job's run history.
+
+At most ``CACHE_WARMER_CONCURRENCY`` jobs run at once. Every API worker runs
+the scheduler, but each run first takes a short Redis lock, so only one worker
+does the work.
+
+Configuration (environment):
+    CACHE_WARMER_ENABLED       Start the warmer with the app (default true)
+    CACHE_WARMER_CONCURRENCY   Jobs running at the same time (default 2)
+    CACHE_WARMER_HISTORY       Runs kept per job for the admin endpoint (default 20)
+    CACHE_WARMER_RUN_ON_START  Run every job once shortly after start-up (default true)
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set
+
+from redis_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'enabled': os.getenv('CACHE_WARMER_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'concurrency': int(os.getenv('CACHE_WARMER_CONCURRENCY', 2)),
+    'history': int(os.getenv('CACHE_WARMER_HISTORY', 20)),
+    'run_on_start': os.getenv('CACHE_WARMER_RUN_ON_START', 'true').lower() in ('1', 'true', 'yes'),
+    'max_sleep': 30,
+}
+
+
+class WarmJob:
+    """One scheduled warm-up and its recent runs"""
+
+    def __init__(self, name: str, fn: Callable[[], Any], every: int, offset: int = 0, jitter: float = 0):
+        self.name = name
+        self.fn = fn
+        self.every = max(1, every)
+        self.offset = offset % self.every
+        self.jitter = max(0.0, jitter)
+        self.next_run = 0.0
+        self.running = False
+        self.history: deque = deque(maxlen=CONFIG['history'])
+        self.stats_counters = {"runs": 0, "failures": 0, "skipped": 0}
+
+    def schedule_next(self, now: float):
+        """Next clock-aligned slot after ``now``, plus jitter"""
+        slot = ((now - self.offset) // self.every + 1) * self.every + self.offset
+        self.next_run = slot + random.uniform(0, self.jitter)
+
+    def record(self, started: float, status: str, detail: Any = None):
+        self.history.appendleft({
+            "started_at": datetime.fromtimestamp(started).isoformat(),
+            "duration_seconds": round(time.time() - started, 3),
+            "status": status,
+            "detail": detail,
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "every_seconds": self.every,
+            "offset_seconds": self.offset,
+            "jitter_seconds": self.jitter,
+            "next_run": datetime.fromtimestamp(self.next_run).isoformat() if self.next_run else None,
+            "running": self.running,
+            **self.stats_counters,
+            "history": list(self.history),
+        }
+
+
+class CacheWarmer:
+    """Runs registered warm jobs on their schedule inside the app's event loop"""
+
+    def __init__(self, concurrency: int = CONFIG['concurrency']):
+        self.jobs: Dict[str, WarmJob] = {}
+        self.concurrency = max(1, concurrency)
+        self._task: Optional[asyncio.Task] = None
+        # The loop only keeps weak references to tasks, so scheduled runs are held here until they finish
+        self._runs: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._origin = uuid.uuid4().hex
+
+    def register(self, name: str, fn: Callable[[], Any], every: int, offset: int = 0, jitter: float = 0) -> WarmJob:
+        """Register (or replace) a warm job; see the module docstring for the schedule fields"""
+        job = WarmJob(name, fn, every, offset, jitter)
+        self.jobs[name] = job
+        return job
+
+    def start(self):
+        """Start the schedule loop on the running event loop (called from the app lifespan)"""
+        if not CONFIG['enabled'] or self._task is not None:
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        now = time.time()
+        for job in self.jobs.values():
+            if CONFIG['run_on_start']:
+                job.next_run = now + random.uniform(0, job.jitter)
+            else:
+                job.schedule_next(now)
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"🔥 Cache warmer started with {len(self.jobs)} job(s)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        runs = list(self._runs)
+        for run in runs:
+            run.cancel()
+        await asyncio.gather(self._task, *runs, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            now = time.time()
+            for job in self.jobs.values():
+                if job.next_run <= now and not job.running:
+                    job.schedule_next(now)
+                    job.running = True
+                    run = asyncio.create_task(self._run(job))
+                    self._runs.add(run)
+                    run.add_done_callback(self._runs.discard)
+            next_run = min((job.next_run for job in self.jobs.values()), default=now + CONFIG['max_sleep'])
+            await asyncio.sleep(min(max(next_run - time.time(), 0.05), CONFIG['max_sleep']))
+
+    async def run_now(self, name: str) -> Dict[str, Any]:
+        """Run a job immediately (admin endpoint); returns its history entry"""
+        job = self.jobs[name]
+        if job.running:
+            return {"status": "already running"}
+        job.running = True
+        await self._run(job, lock=False)
+        return job.history[0]
+
+    async def _run(self, job: WarmJob, lock: bool = True):
+        try:
+            async with self._semaphore or asyncio.Semaphore(1):
+                started = time.time()
+                if lock and not await asyncio.to_thread(self._claim, job):
+                    job.stats_counters["skipped"] += 1
+                    job.record(started, "skipped", "another worker has this run")
+                    return
+                try:
+                    if inspect.iscoroutinefunction(job.fn):
+                        detail = await job.fn()
+                    else:
+                        detail = await asyncio.to_thread(job.fn)
+                    job.stats_counters["runs"] += 1
+                    job.record(started, "ok", detail)
+                    logger.info(f"🔥 Warm job {job.name}: {detail}")
+                except Exception as e:
+                    job.stats_counters["failures"] += 1
+                    job.record(started, "failed", str(e))
+                    logger.warning(f"⚠️ Warm job {job.name} failed: {str(e)}")
+        finally:
+            job.running = False
+
+    def _claim(self, job: WarmJob) -> bool:
+        """One worker per scheduled run; without Redis every worker runs its own"""
+        client = response_cache.redis_client
+        if not client:
+            return True
+        try:
+            ttl = int(max(min(job.every / 2, 3600), 1))
+            return bool(client.set(f"cache_warmer:lock:{job.name}", self._origin, nx=True, ex=ttl))
+        except Exception as e:
+            logger.warning(f"⚠️ Warm job lock failed for {job.name} - running anyway: {str(e)}")
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": CONFIG['enabled'],
+            "running": self._task is not None and not self._task.done(),
+            "concurrency": self.concurrency,
+            "jobs": {name: job.get_stats() for name, job in self.jobs.items()},
+        }
+
+
+# Global warmer instance
+cache_warmer = CacheWarmer()
@@ -16,12 +16,11 @@ from typing import Dict, List, Optional, Any
 import asyncio
 from enum import Enum
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 import csv
 import io
-import requests
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -29,6 +28,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from browser_pool import browser_pool
+from http_clients import http_clients
+from job_scheduler import scheduler
+from task_store import TaskCollection
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -154,11 +158,10 @@ class ScrapeStatus(BaseModel):
     current_category: Optional[str] = None
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
-    result: Optional[Any] = None
-    all_extensions_data: Optional[List[Dict[str, Any]]] = None  # Store full data for pagination
+    result: Optional[ChromeWebStoreScrapeResponse] = None
 
-# In-memory task storage
-tasks: Dict[str, ScrapeStatus] = {}
+# Shared task storage (Redis or SQLite); full extensions data is stored as result chunks
+tasks = TaskCollection("chrome_webstore", ScrapeStatus)
 
 def convert_extensions_to_csv(extensions: List[ExtensionData]) -> str:
     """Convert extension data to CSV format"""
@@ -246,7 +249,7 @@ def scrape_url(url: str) -> Optional[Dict[str, Any]]:
     try:
         name = website = description = category = users = ratings = review = owner = email = None
 
-        html = requests.get(url)
+        html = http_clients.session().get(url)
         soup = BeautifulSoup(html.text, "html.parser")
 
         try:
@@ -323,8 +326,9 @@ def run_concurrently(urls: List[str], max_workers: int = 50, task_id: Optional[s
     completed_count = 0
     
     if task_id:
-        tasks[task_id].total_extensions = len(urls)
-        tasks[task_id].extensions_scraped = 0
+        tasks.update(task_id,
+                     total_extensions=len(urls),
+                     extensions_scraped=0)
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {executor.submit(scrape_url, url): url for url in urls}
@@ -341,16 +345,18 @@ def run_concurrently(urls: List[str], max_workers: int = 50, task_id: Optional[s
                     logger.warning(f"No data returned for {url}")
                     
                 if task_id:
-                    tasks[task_id].extensions_scraped = completed_count
-                    tasks[task_id].progress = f"{completed_count}/{len(urls)} extensions processed"
+                    tasks.update(task_id,
+                                 extensions_scraped=completed_count,
+                                 progress=f"{completed_count}/{len(urls)} extensions processed")
                     
             except Exception as e:
                 logger.error(f"Error processing {url}: {e}")
                 completed_count += 1
                 
                 if task_id:
-                    tasks[task_id].extensions_scraped = completed_count
-                    tasks[task_id].progress = f"{completed_count}/{len(urls)} extensions processed"
+                    tasks.update(task_id,
+                                 extensions_scraped=completed_count,
+                                 progress=f"{completed_count}/{len(urls)} extensions processed")
 
     return results
 
@@ -364,25 +370,10 @@ def collect_urls_and_scrape(max_workers: int = 50, task_id: Optional[str] = None
     5. Run concurrent scraping
     """
     
-    # Step 1: Create Chrome driver with EXACT same options as original
-    opt = webdriver.ChromeOptions()
-    opt.add_argument("disable-cookies")
-    opt.add_argument("disable-extensions")
-    opt.add_argument("disable-gpu")
-    opt.add_argument("disable-infobars")
-    opt.add_argument("disable-notifications")
-    opt.add_argument("disable-popup-blocking")
-    opt.add_argument("--no-sandbox")
-    opt.add_argument("--disable-dev-shm-usage")
-    opt.add_argument(
-        "user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
-    opt.add_argument("--remote-debugging-pipe")
-    opt.add_argument("--headless")
-
+    # Step 1: Lease a warm Chrome driver (same options as original, see browser_pool)
     try:
-        driver = webdriver.Chrome(options=opt)
-        logger.info(f"Chrome driver created successfully with version: {driver.capabilities['browserVersion']}")
+        driver = browser_pool.acquire()
+        logger.info(f"Chrome driver leased successfully with version: {driver.capabilities['browserVersion']}")
     except Exception as e:
         logger.error(f"Failed to create Chrome driver: {e}")
         raise ValueError(f"Chrome driver initialization failed: {str(e)}")
@@ -399,9 +390,10 @@ def collect_urls_and_scrape(max_workers: int = 50, task_id: Optional[str] = None
             logger.info("No categories specified, using all available categories")
         
         if task_id:
-            tasks[task_id].status = "collecting_urls"
-            tasks[task_id].stage = "Starting URL collection"
-            tasks[task_id].progress = f"0/{len(links)} categories processed"
+            tasks.update(task_id,
+                         status="collecting_urls",
+                         stage="Starting URL collection",
+                         progress=f"0/{len(links)} categories processed")
         
         # Create temporary file for this task with absolute path
         import os
@@ -413,9 +405,10 @@ def collect_urls_and_scrape(max_workers: int = 50, task_id: Optional[str] = None
         
         for i, link in enumerate(links, 1):
             if task_id:
-                tasks[task_id].current_category = link
-                tasks[task_id].stage = f"Collecting URLs from category {i}/{len(links)}"
-                tasks[task_id].progress = f"{i-1}/{len(links)} categories completed"
+                tasks.update(task_id,
+                             current_category=link,
+                             stage=f"Collecting URLs from category {i}/{len(links)}",
+                             progress=f"{i-1}/{len(links)} categories completed")
             
             logger.info(f"Scraping category: {link}")
             allcaturls = []
@@ -478,14 +471,14 @@ def collect_urls_and_scrape(max_workers: int = 50, task_id: Optional[str] = None
                     # Count current URLs in file
                     with open(temp_file, "r") as f:
                         current_urls = [line.strip() for line in f if line.strip()]
-                    tasks[task_id].urls_collected = len(current_urls)
+                    tasks.update(task_id, urls_collected=len(current_urls))
                     logger.info(f"Total URLs collected so far: {len(current_urls)}")
             else:
                 logger.warning(f"No URLs found for category {link}")
 
     finally:
-        # Close the driver after URL collection
-        driver.quit()
+        # Return the driver to the pool after URL collection
+        browser_pool.release(driver)
     
     # Step 3: Read URLs from file - EXACT same logic as original
     try:
@@ -496,11 +489,12 @@ def collect_urls_and_scrape(max_workers: int = 50, task_id: Optional[str] = None
         urls = []
     
     if task_id:
-        tasks[task_id].stage = "URL collection completed"
-        tasks[task_id].progress = f"{len(links)}/{len(links)} categories processed"
-        tasks[task_id].urls_collected = len(urls)
-        tasks[task_id].status = "scraping_details"
-        tasks[task_id].stage = "Starting extension details scraping"
+        logger.info("URL collection completed")
+        tasks.update(task_id,
+                     progress=f"{len(links)}/{len(links)} categories processed",
+                     urls_collected=len(urls),
+                     status="scraping_details",
+                     stage="Starting extension details scraping")
     
     # Step 4: Run concurrent scraping - EXACT same logic as original
     extensions = run_concurrently(urls, max_workers, task_id)
@@ -522,7 +516,7 @@ def collect_urls_and_scrape(max_workers: int = 50, task_id: Optional[str] = None
 def complete_scraping_task(task_id: str, request: ChromeWebStoreScrapeRequest):
     """Background task using the exact same pattern as original script"""
     try:
-        tasks[task_id].started_at = datetime.datetime.now().isoformat()
+        tasks.update(task_id, started_at=datetime.datetime.now().isoformat())
         start_time = time.time()
         
         # Convert enum categories to strings if provided
@@ -552,7 +546,7 @@ def complete_scraping_task(task_id: str, request: ChromeWebStoreScrapeRequest):
         )
         
         # Store all extensions data for later pagination access
-        tasks[task_id].all_extensions_data = result["extensions_scraped"]
+        tasks.append_results(task_id, result["extensions_scraped"])
         
         # Apply pagination to the response we return
         page = request.page or 1
@@ -578,28 +572,30 @@ def complete_scraping_task(task_id: str, request: ChromeWebStoreScrapeRequest):
             download_urls=download_urls
         )
         
-        tasks[task_id].status = "completed"
-        tasks[task_id].stage = "Scraping completed successfully"
-        tasks[task_id].completed_at = datetime.datetime.now().isoformat()
-        tasks[task_id].result = response
+        tasks.update(task_id,
+                     status="completed",
+                     stage="Scraping completed successfully",
+                     completed_at=datetime.datetime.now().isoformat(),
+                     result=response)
         
         logger.info(f"Scraping task {task_id} completed successfully")
         
     except Exception as e:
         logger.error(f"Scraping task {task_id} failed: {e}")
-        tasks[task_id].status = "failed"
-        tasks[task_id].stage = f"Failed: {str(e)}"
-        tasks[task_id].completed_at = datetime.datetime.now().isoformat()
-        tasks[task_id].result = ChromeWebStoreScrapeResponse(
-            success=False,
-            total_urls_collected=tasks[task_id].urls_collected or 0,
-            total_processed=0,
-            successful_scrapes=0,
-            failed_scrapes=0,
-            execution_time_seconds=0,
-            extensions=[],
-            message=f"Scraping failed: {str(e)}"
-        )
+        tasks.update(task_id,
+                     status="failed",
+                     stage=f"Failed: {str(e)}",
+                     completed_at=datetime.datetime.now().isoformat(),
+                     result=ChromeWebStoreScrapeResponse(
+                         success=False,
+                         total_urls_collected=tasks.get_field(task_id, 'urls_collected') or 0,
+                         total_processed=0,
+                         successful_scrapes=0,
+                         failed_scrapes=0,
+                         execution_time_seconds=0,
+                         extensions=[],
+                         message=f"Scraping failed: {str(e)}"
+                     ))
 
 # API Endpoints
 @router.get("/", summary="API Information")
@@ -737,7 +733,7 @@ async def get_categories():
     }
 
 @router.post("/scrape", summary="Scrape Chrome Extensions (Async)")
-async def scrape_chrome_webstore_async(background_tasks: BackgroundTasks, request: ChromeWebStoreScrapeRequest):
+async def scrape_chrome_webstore_async(request: ChromeWebStoreScrapeRequest):
     """Complete Chrome Web Store scraping process - asynchronous"""
     import uuid
     
@@ -750,7 +746,11 @@ async def scrape_chrome_webstore_async(background_tasks: BackgroundTasks, reques
         progress="Waiting to start..."
     )
     
-    background_tasks.add_task(complete_scraping_task, task_id, request)
+    try:
+        queue_info = scheduler.submit("chrome_webstore", task_id, complete_scraping_task, task_id, request)
+    except HTTPException:
+        tasks.delete(task_id)
+        raise
     
     logger.info(f"Queued async Chrome Web Store scraping task {task_id}")
     
@@ -758,6 +758,7 @@ async def scrape_chrome_webstore_async(background_tasks: BackgroundTasks, reques
         "task_id": task_id,
         "status": "pending", 
         "message": "Complete scraping task queued successfully",
+        "queue_position": queue_info["queue_position"],
         "status_url": f"/chrome-webstore/status/{task_id}",
     }
 
@@ -771,11 +772,12 @@ async def get_task_status(task_id: str):
         )
     
     task = tasks[task_id]
+    total_results = tasks.count_results(task_id)
     
     # If task is completed, include preview of results
-    if task.status == "completed" and task.all_extensions_data:
+    if task.status == "completed" and total_results:
         # Get preview of first 10 results
-        preview_data = task.all_extensions_data[:10]
+        preview_data = tasks.get_results(task_id, 0, 10)
         preview_extensions = [ExtensionData(**ext) for ext in preview_data]
         
         return {
@@ -790,7 +792,7 @@ async def get_task_status(task_id: str):
             "started_at": task.started_at,
             "completed_at": task.completed_at,
             "preview_results": {
-                "showing": f"Preview of first 10 results (out of {len(task.all_extensions_data)} total)",
+                "showing": f"Preview of first 10 results (out of {total_results} total)",
                 "extensions": [ext.dict() for ext in preview_extensions],
                 "message": "🎉 Scraping completed successfully! Use the endpoints below to get full data."
             },
@@ -818,7 +820,8 @@ async def get_task_status(task_id: str):
         "total_extensions": task.total_extensions,
         "current_category": task.current_category,
         "started_at": task.started_at,
-        "completed_at": task.completed_at
+        "completed_at": task.completed_at,
+        "queue_position": scheduler.get_queue_position(task_id)
     }
 
 @router.get("/results/{task_id}", response_model=ChromeWebStoreScrapeResponse, summary="Get Paginated Results")
@@ -852,9 +855,8 @@ async def get_task_results(
     original_response = task.result
     
     # Get the full extensions data from task storage
-    if task.all_extensions_data:
-        all_extensions_data = task.all_extensions_data
-    else:
+    all_extensions_data = tasks.get_results(task_id)
+    if not all_extensions_data:
         # Fallback - extract from response if available
         if hasattr(original_response, 'extensions'):
             all_extensions_data = [ext.dict() for ext in original_response.extensions]
@@ -898,8 +900,9 @@ async def download_results_json(task_id: str):
         )
     
     task = tasks[task_id]
+    all_extensions_data = tasks.get_results(task_id)
     
-    if task.status != "completed" or not task.all_extensions_data:
+    if task.status != "completed" or not all_extensions_data:
         logger.warning(f"❌ Task {task_id} not completed or has no results")
         raise HTTPException(
             status_code=400,
@@ -907,7 +910,7 @@ async def download_results_json(task_id: str):
         )
     
     # Convert to JSON
-    extensions_data = [ExtensionData(**ext).dict() for ext in task.all_extensions_data]
+    extensions_data = [ExtensionData(**ext).dict() for ext in all_extensions_data]
     
     download_data = {
         "total_extensions": len(extensions_data),
@@ -948,8 +951,9 @@ async def download_results_csv(task_id: str):
         )
     
     task = tasks[task_id]
+    all_extensions_data = tasks.get_results(task_id)
     
-    if task.status != "completed" or not task.all_extensions_data:
+    if task.status != "completed" or not all_extensions_data:
         logger.warning(f"❌ Task {task_id} not completed or has no results")
         raise HTTPException(
             status_code=400,
@@ -957,7 +961,7 @@ async def download_results_csv(task_id: str):
         )
     
     # Convert to CSV
-    extensions_obj = [ExtensionData(**ext) for ext in task.all_extensions_data]
+    extensions_obj = [ExtensionData(**ext) for ext in all_extensions_data]
     csv_content = convert_extensions_to_csv(extensions_obj)
     
     # Generate filename
@@ -978,15 +982,14 @@ async def download_results_csv(task_id: str):
 @router.delete("/tasks", summary="Clear Completed Tasks")
 async def clear_tasks():
     """Clear all completed and failed tasks"""
-    global tasks
-    
-    before_count = len(tasks)
-    tasks = {
-        task_id: task for task_id, task in tasks.items()
-        if task.status in ["pending", "collecting_urls", "scraping_details"]
-    }
-    after_count = len(tasks)
-    cleared_count = before_count - after_count
+    all_tasks = tasks.items()
+    before_count = len(all_tasks)
+    cleared_count = 0
+    for task_id, task in all_tasks:
+        if task.status not in ["pending", "collecting_urls", "scraping_details"]:
+            tasks.delete(task_id)
+            cleared_count += 1
+    after_count = before_count - cleared_count
     
     return {
         "message": f"Cleared {cleared_count} completed/failed tasks",
@@ -4,7 +4,10 @@ from typing import Dict, Any
 import urllib.parse
 import json
 import logging
-from curl_cffi import requests as curl_requests
+
+from http_clients import http_clients
+from redis_cache import response_cache
+from single_flight import single_flight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -77,7 +80,12 @@ def extract_domain(url_or_query: str) -> str:
     return url
 
 
-def search_and_match_entities(search_query: str, match_domain: str) -> Dict[str, Any]:
+async def crunchbase_get(url: str, params: Dict[str, Any] = None, timeout: float = 30):
+    """GET a Crunchbase endpoint on the shared Chrome-impersonated session"""
+    return await http_clients.async_curl("chrome").get(url, params=params, cookies=COOKIES, headers=HEADERS, timeout=timeout)
+
+
+async def search_and_match_entities(search_query: str, match_domain: str) -> Dict[str, Any]:
     """
     Helper function to search for entities and find a match based on domain.
     
@@ -97,12 +105,9 @@ def search_and_match_entities(search_query: str, match_domain: str) -> Dict[str,
         'source': 'topSearch',
     }
     
-    autocomplete_response = curl_requests.get(
+    autocomplete_response = await crunchbase_get(
         'https://www.crunchbase.com/v4/data/autocompletes',
         params=autocomplete_params,
-        cookies=COOKIES,
-        headers=HEADERS,
-        impersonate="chrome"
     )
     
     if autocomplete_response.status_code != 200:
@@ -165,13 +170,7 @@ def search_and_match_entities(search_query: str, match_domain: str) -> Dict[str,
         url = f"{base_url}?{encoded_params}"
         
         try:
-            response = curl_requests.get(
-                url,
-                cookies=COOKIES,
-                headers=HEADERS,
-                impersonate="chrome",
-                timeout=10
-            )
+            response = await crunchbase_get(url, timeout=10)
             
             if response.status_code != 200:
                 logger.warning(f"Failed to fetch company details for {company_permalink}: {response.status_code}")
@@ -210,7 +209,35 @@ def search_and_match_entities(search_query: str, match_domain: str) -> Dict[str,
     return {}
 
 
+async def find_company(domain: str, name: str, match_domain: str) -> Dict[str, Any]:
+    """Search by domain, then by name; return the first entity whose website matches ``match_domain``"""
+    # Step 1: Try searching with domain first
+    logger.info("Attempting search with domain parameter...")
+    result = await search_and_match_entities(domain, match_domain)
+    
+    if result:
+        logger.info("Match found using domain search")
+        return result
+    
+    # Step 2: If no match with domain, try searching with name
+    logger.info("No match with domain search, attempting search with name parameter...")
+    result = await search_and_match_entities(name, match_domain)
+    
+    if result:
+        logger.info("Match found using name search")
+        return result
+    
+    # No match found with either approach
+    logger.info("No match found with either domain or name search")
+    return {}
+
+
 @router.get("/crunchbase_info")
+@response_cache.cached(
+    "crunchbase:company_info",
+    key=lambda domain, name: f"crunchbase:company_info:{extract_domain(domain)}:{name.strip().lower()}",
+    ttl=86400  # 24 hours
+)
 async def get_crunchbase_info(
     domain: str = Query(..., description="Company domain to search and match against"),
     name: str = Query(..., description="Company name to search with if domain search fails")
@@ -239,25 +266,9 @@ async def get_crunchbase_info(
             logger.info("Could not extract domain from domain parameter")
             return {}
         
-        # Step 1: Try searching with domain first
-        logger.info("Attempting search with domain parameter...")
-        result = search_and_match_entities(domain, match_domain)
-        
-        if result:
-            logger.info("Match found using domain search")
-            return result
-        
-        # Step 2: If no match with domain, try searching with name
-        logger.info("No match with domain search, attempting search with name parameter...")
-        result = search_and_match_entities(name, match_domain)
-        
-        if result:
-            logger.info("Match found using name search")
-            return result
-        
-        # No match found with either approach
-        logger.info("No match found with either domain or name search")
-        return {}
+        # Concurrent lookups for the same company share one set of Crunchbase calls
+        flight_key = single_flight.make_key("crunchbase", domain=match_domain, name=name)
+        return await single_flight.run(flight_key, lambda: find_company(domain, name, match_domain))
         
     except HTTPException:
         raise
@@ -0,0 +1,151 @@
+"""
+Domain Resolver
+
+Process-wide resolver that follows a link's redirects to find the final website domain.
+
+ProductHunt lists each product's website as a ``producthunt.com/r/...`` redirect.
+Every scrape used to resolve those links with its own 100-thread pool. Each
+thread downloaded the full page body just to read the final URL, and results
+were collected in submit order. All lookups in the process now go through one
+resolver:
+
+- it runs on its own event loop in a background thread, so scraping tasks on
+  any scheduler thread (each with its own loop) share it
+- lookups send ``HEAD`` and follow redirects. If the server rejects ``HEAD``,
+  the resolver falls back to a streamed ``GET`` that is closed before the body
+  is read
+- ``DOMAIN_RESOLVER_CONCURRENCY`` caps the lookups in flight across all tasks
+- a link that is already being resolved (by this task or any other) is joined,
+  not requested again
+- ``resolve_many`` yields results as lookups finish, not in submit order
+
+    async for url, domain in domain_resolver.resolve_many(urls):
+        ...
+
+``domain`` is the final host without ``www.``, or None if the lookup failed.
+Results aren't cached here; callers keep them in ``redis_cache.domain_cache``.
+
+Configuration (environment):
+    DOMAIN_RESOLVER_CONCURRENCY  Lookups in flight per process (default 50)
+    DOMAIN_RESOLVER_TIMEOUT      Seconds per lookup, redirects included (default 10)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from http_clients import http_clients
+
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'concurrency': int(os.getenv('DOMAIN_RESOLVER_CONCURRENCY', 50)),
+    'timeout': float(os.getenv('DOMAIN_RESOLVER_TIMEOUT', 10)),
+}
+
+
+class DomainResolver:
+    """Shared redirect-following lookups with a global concurrency cap and in-flight dedupe"""
+
+    def __init__(self, concurrency: int = CONFIG['concurrency'], timeout: float = CONFIG['timeout']):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid: Optional[int] = None
+        # Only touched on the resolver loop
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats_counters = {"lookups": 0, "deduplicated": 0, "head": 0, "get_fallback": 0, "failed": 0}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                # First use, or a forked worker whose parent's loop thread didn't come along
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="domain-resolver", daemon=True).start()
+                self._loop, self._pid = loop, os.getpid()
+                self._inflight, self._semaphore = {}, None
+            return self._loop
+
+    async def resolve_many(self, urls: List[str]) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """Yield ``(url, domain)`` for each distinct URL as its lookup finishes; usable from any event loop"""
+        loop = self._ensure_loop()
+        pending = {
+            asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._shared(url), loop)): url
+            for url in dict.fromkeys(urls)
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            # A caller that stops early doesn't cancel lookups other tasks are waiting on (see _shared)
+            for future in pending:
+                future.cancel()
+
+    async def resolve(self, url: str) -> Optional[str]:
+        async for _, domain in self.resolve_many([url]):
+            return domain
+        return None
+
+    async def _shared(self, url: str) -> Optional[str]:
+        """Runs on the resolver loop: join the in-flight lookup for ``url`` or start it"""
+        future = self._inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._resolve(url))
+            self._inflight[url] = future
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        else:
+            self.stats_counters["deduplicated"] += 1
+        return await asyncio.shield(future)
+
+    async def _resolve(self, url: str) -> Optional[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        target = url if url.startswith('http') else f"https://{url}"
+        client = http_clients.async_curl("chrome")
+        async with self._semaphore:
+            self.stats_counters["lookups"] += 1
+            try:
+                response = await client.request("HEAD", target, allow_redirects=True, timeout=self.timeout)
+                if response.status_code >= 400:
+                    raise ValueError(f"HEAD returned {response.status_code}")
+                self.stats_counters["head"] += 1
+            except Exception:
+                try:
+                    # Some servers refuse HEAD; read the redirects and headers, never the body
+                    response = await client.request("GET", target, allow_redirects=True, timeout=self.timeout, stream=True)
+                    await response.aclose()
+                    self.stats_counters["get_fallback"] += 1
+                except Exception as e:
+                    self.stats_counters["failed"] += 1
+                    logger.warning(f"⚠️ Failed to resolve domain for {url}: {str(e)}")
+                    return None
+        domain = urlparse(str(response.url)).netloc
+        return domain.replace('www.', '') if domain else None
+
+    async def aclose(self):
+        """Close the resolver's HTTP clients and stop its loop (app shutdown)"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            if loop is None or self._pid != os.getpid():
+                return
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(http_clients.aclose(), loop))
+        loop.call_soon_threadsafe(loop.stop)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "running": self._loop is not None,
+            "in_flight": len(self._inflight),
+            **self.stats_counters,
+        }
+
+
+# Global resolver (one per process)
+domain_resolver = DomainResolver()
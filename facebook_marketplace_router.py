@@ -4,13 +4,15 @@ Facebook Marketplace Search Router
 
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
-import requests
+import httpx
 import json
 from typing import Optional
 
+from http_clients import http_clients
+
 router = APIRouter()
 
-def get_coordinates_from_location(city: str, country: str) -> tuple[float, float]:
+async def get_coordinates_from_location(city: str, country: str) -> tuple[float, float]:
     """
     Get coordinates from city and country using GPS coordinates API.
     
@@ -46,7 +48,7 @@ def get_coordinates_from_location(city: str, country: str) -> tuple[float, float
     }
     
     try:
-        response = requests.get('https://www.gps-coordinates.net/geoproxy', params=params, headers=headers)
+        response = await http_clients.async_client().get('https://www.gps-coordinates.net/geoproxy', params=params, headers=headers)
         response.raise_for_status()
         
         data = response.json()
@@ -58,10 +60,10 @@ def get_coordinates_from_location(city: str, country: str) -> tuple[float, float
         
         return lat, lon
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Error getting coordinates: {str(e)}")
 
-def get_coordinates_from_ip(ip: str) -> tuple[float, float]:
+async def get_coordinates_from_ip(ip: str) -> tuple[float, float]:
     """
     Get coordinates from IP address using IP-API.
     
@@ -93,7 +95,7 @@ def get_coordinates_from_ip(ip: str) -> tuple[float, float]:
     }
     
     try:
-        response = requests.get(f'https://demo.ip-api.com/json/{ip}', headers=headers)
+        response = await http_clients.async_client().get(f'https://demo.ip-api.com/json/{ip}', headers=headers)
         response.raise_for_status()
         
         data = response.json()
@@ -105,10 +107,10 @@ def get_coordinates_from_ip(ip: str) -> tuple[float, float]:
         
         return lat, lon
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Error getting coordinates from IP: {str(e)}")
 
-def search_facebook_marketplace(lat: float, lon: float, query: str = "bicycle", count: int = 24) -> dict:
+async def search_facebook_marketplace(lat: float, lon: float, query: str = "bicycle", count: int = 24) -> dict:
     """
     Search Facebook Marketplace using coordinates.
     
@@ -147,7 +149,7 @@ def search_facebook_marketplace(lat: float, lon: float, query: str = "bicycle",
     }
     
     try:
-        response = requests.post('https://www.facebook.com/api/graphql/', headers=headers, data=data)
+        response = await http_clients.async_client().post('https://www.facebook.com/api/graphql/', headers=headers, data=data)
         
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail=f"Facebook API returned status {response.status_code}")
@@ -161,7 +163,7 @@ def search_facebook_marketplace(lat: float, lon: float, query: str = "bicycle",
         
         return data
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Error searching Facebook Marketplace: {str(e)}")
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=500, detail=f"Invalid JSON response from Facebook: {str(e)}")
@@ -228,16 +230,16 @@ async def search_marketplace(
         if city or country:
             # Use provided location (city, country, or both)
             location_query = f"{city or ''}, {country or ''}".strip(', ')
-            lat, lon = get_coordinates_from_location(city or '', country or '')
+            lat, lon = await get_coordinates_from_location(city or '', country or '')
             location_source = location_query
         else:
             # Use IP geolocation
             client_ip = get_client_ip(request)
-            lat, lon = get_coordinates_from_ip(client_ip)
+            lat, lon = await get_coordinates_from_ip(client_ip)
             location_source = f"IP: {client_ip}"
         
         # Search Facebook Marketplace
-        marketplace_data = search_facebook_marketplace(lat, lon, query, count)
+        marketplace_data = await search_facebook_marketplace(lat, lon, query, count)
         
         # Extract and format results
         if not marketplace_data or 'data' not in marketplace_data:
@@ -4,24 +4,28 @@ Google Maps Scraper API
 FastAPI router for Google Maps business scraping functionality.
 """
 
+import base64
 import json
 import logging
-import random
+import math
 import re
+import threading
 import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Tuple, Any
 import asyncio
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 import csv
 import io
 import re
+from urllib.parse import parse_qs, quote_plus, urlparse
 from selenium import webdriver
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
@@ -36,6 +40,12 @@ from selenium.common.exceptions import (
     StaleElementReferenceException
 )
 
+from browser_pool import browser_pool
+from job_scheduler import scheduler
+from single_flight import single_flight
+from place_cache import place_cache
+from task_store import TaskCollection
+
 # Configure comprehensive logging
 logging.basicConfig(
     level=logging.INFO,
@@ -65,7 +75,23 @@ CONFIG = {
     'user_agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     # 'output_dir': 'gmaps_results',
     'retry_attempts': 3,
-    'retry_delay': 0.5
+    'retry_delay': 0.5,
+    # RPC extraction mode: how long to wait for a search XHR after each scroll,
+    # and how many scrolls without new places before giving up
+    'rpc_wait_timeout': 8,
+    'rpc_poll_interval': 0.25,
+    'rpc_max_idle_scrolls': 3,
+    # Timeouts (seconds) for the condition-based waits in the scraping loop
+    'wait_timeouts': {
+        'search_results': 15,   # feed or single place panel shown after search
+        'detail_panel': 10,     # detail h1 changed after clicking a card
+        'back_to_results': 8,   # URL left /place/ and the feed is back
+        'new_cards': 6,         # more cards appended to the feed after a scroll
+        'viewport': 10,         # map position (@lat,lng,zoom) written to the URL
+    },
+    # Geo tiling: tiles searched at once per task (also capped by the browser pool size)
+    'tile_concurrency': 4,
+    'wait_poll_interval': 0.1
 }
 
 # CSS Selectors
@@ -100,6 +126,7 @@ class BusinessData(BaseModel):
     address: Optional[str] = None
     phone: Optional[str] = None
     website: Optional[str] = None
+    place_id: Optional[str] = None
     scraped_time: str
     scraped_index: int
 
@@ -107,6 +134,9 @@ class ScrapeRequest(BaseModel):
     """Scrape request model"""
     query: str = Field(..., description="Search query (e.g., 'car companies in Takoradi')")
     max_results: Optional[int] = Field(default=100, description="Maximum number of results to scrape", ge=1, le=10000)
+    extraction_mode: Literal["rpc", "dom"] = Field(default="rpc", description="'rpc' decodes the Maps search responses (fast); 'dom' opens every business card")
+    tiles: Optional[int] = Field(default=None, description="Split the search area into a tiles x tiles grid of map viewports searched in parallel", ge=2, le=8)
+    tile_zoom: Optional[float] = Field(default=None, description="Map zoom for each tile (default: derived from the grid size)", ge=3, le=21)
 
 class ScrapeResponse(BaseModel):
     """Scrape response model"""
@@ -140,9 +170,18 @@ class ScrapeStatus(BaseModel):
     success_count: Optional[int] = None
     failure_count: Optional[int] = None
     last_updated: Optional[str] = None
+    # Where wall time goes: {wait_name: {count, total_seconds, max_seconds, timeouts}}
+    wait_timings: Optional[Dict[str, Dict[str, float]]] = None
+    # Geo-tiled searches: one entry per tile with its center, status and business counts
+    tiles: Optional[List[Dict[str, Any]]] = None
+    # Place cache: places looked up / served from cache (detail page skipped)
+    cache_lookups: Optional[int] = None
+    cache_hits: Optional[int] = None
+    cache_hit_rate: Optional[float] = None
 
-# In-memory task storage (in production, use Redis or database)
-tasks: Dict[str, ScrapeStatus] = {}
+# Shared task storage (Redis or SQLite) so every worker sees the same tasks.
+# Scraped businesses are stored as result chunks, not inside ``result``.
+tasks = TaskCollection("gmaps", ScrapeStatus)
 
 def update_task_status(task_id: str, **kwargs):
     """Update task status with detailed progress information"""
@@ -151,16 +190,14 @@ def update_task_status(task_id: str, **kwargs):
         kwargs['last_updated'] = datetime.now().isoformat()
         
         # Update elapsed time if task has started
-        started_at = tasks[task_id].started_at
+        started_at = kwargs.get('started_at') or tasks.get_field(task_id, 'started_at')
         if started_at is not None and 'elapsed_time_seconds' not in kwargs:
             start_time = datetime.fromisoformat(started_at)
             elapsed = (datetime.now() - start_time).total_seconds()
             kwargs['elapsed_time_seconds'] = round(elapsed, 2)
         
-        # Update the task with new information
-        for key, value in kwargs.items():
-            if hasattr(tasks[task_id], key):
-                setattr(tasks[task_id], key, value)
+        # Persist the new information (unknown fields are ignored)
+        tasks.update(task_id, **kwargs)
         
         logger.debug(f"📊 Updated task {task_id}: {kwargs}")
     else:
@@ -184,7 +221,8 @@ def convert_businesses_to_csv(businesses: List[BusinessData]) -> str:
         'phone',
         'website',
         'scraped_time',
-        'scraped_index'
+        'scraped_index',
+        'place_id'
     ]
     
     writer = csv.DictWriter(output, fieldnames=fieldnames)
@@ -211,93 +249,232 @@ def get_download_filename(query: str, format_type: str, scraped_time: str) -> st
     
     return f"gmaps_{clean_query}_{clean_time}.{format_type}"
 
+class WaitTimings:
+    """Accumulates how long each kind of browser wait took during one scrape"""
+    
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+    
+    def record(self, name: str, seconds: float, timed_out: bool = False):
+        entry = self.stats.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "timeouts": 0})
+        entry["count"] += 1
+        entry["total_seconds"] = round(entry["total_seconds"] + seconds, 3)
+        entry["max_seconds"] = round(max(entry["max_seconds"], seconds), 3)
+        if timed_out:
+            entry["timeouts"] += 1
+    
+    def merge(self, other: "WaitTimings"):
+        """Fold another scrape's timings into this one (geo tiles)"""
+        for name, theirs in other.stats.items():
+            entry = self.stats.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "timeouts": 0})
+            entry["count"] += theirs["count"]
+            entry["total_seconds"] = round(entry["total_seconds"] + theirs["total_seconds"], 3)
+            entry["max_seconds"] = max(entry["max_seconds"], theirs["max_seconds"])
+            entry["timeouts"] += theirs["timeouts"]
+    
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: dict(entry) for name, entry in self.stats.items()}
+
+# JS helpers for the waits: card count in the feed and current detail panel title
+COUNT_CARDS_JS = f"return document.querySelectorAll({json.dumps(', '.join(SELECTORS['business_items']))}).length;"
+DETAIL_TITLE_JS = f"const h = document.querySelector({json.dumps(SELECTORS['business_name'])}); return h ? h.textContent : '';"
+
+# Single-round-trip field extraction: one execute_script per card batch or detail panel
+# instead of a find_element call per field. arguments[0] is SELECTORS.
+# arguments[1] is a single card element (or null for the whole feed), arguments[2] the first index to read.
+EXTRACT_CARDS_JS = """
+const s = arguments[0];
+const all = Array.from(document.querySelectorAll(s.business_items.join(', ')));
+const start = arguments[2] || 0;
+const cards = arguments[1] ? [arguments[1]] : all.slice(start);
+const text = (root, sel) => { const el = root.querySelector(sel); return el ? el.innerText.trim() : null; };
+const href = (root, sel) => { const el = root.querySelector(sel); return el ? el.href : null; };
+return {
+    total: all.length,
+    cards: cards.map((card, i) => ({
+        index: start + i,
+        place_url: href(card, s.business_link),
+        phone: text(card, s.phone),
+        website: href(card, s.alt_website),
+        reviews_text: text(card, s.review_count),
+        label: (card.innerText || '').slice(0, 50)
+    }))
+};
+"""
+
+FIND_CARD_LINK_JS = """
+const s = arguments[0];
+const url = arguments[1];
+return Array.from(document.querySelectorAll(s.business_link)).find(a => a.href === url) || null;
+"""
+
+EXTRACT_DETAIL_JS = """
+const s = arguments[0];
+const text = sel => { const el = document.querySelector(sel); return el ? el.innerText.trim() : null; };
+const link = document.querySelector(s.website);
+return {
+    business_name: text(s.business_name),
+    average_rating: text(s.average_rating),
+    website: link ? link.href : null,
+    business_type: text(s.business_type),
+    address: text(s.address)
+};
+"""
+
+def extract_card_fields(driver, card=None) -> List[Dict[str, Any]]:
+    """Listing fields for one card element, or for every card in the feed when ``card`` is None"""
+    return (driver.execute_script(EXTRACT_CARDS_JS, SELECTORS, card, 0) or {}).get("cards", [])
+
+def index_cards(driver, start: int = 0) -> Dict[str, Any]:
+    """Listing fields for cards from ``start`` onward, plus the total card count in the feed"""
+    return driver.execute_script(EXTRACT_CARDS_JS, SELECTORS, None, start) or {"total": 0, "cards": []}
+
+PLACE_ID_PATTERNS = [
+    re.compile(r"!19s([^!?&/]+)"),                # ChIJ... place id
+    re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)"),  # feature id
+]
+
+def get_place_id(place_url: str) -> str:
+    """Stable key for a place from its Maps URL (falls back to the URL itself)"""
+    for pattern in PLACE_ID_PATTERNS:
+        match = pattern.search(place_url)
+        if match:
+            return match.group(1)
+    return place_url
+
+def extract_detail_fields(driver) -> Dict[str, Any]:
+    """All detail panel fields in a single WebDriver call"""
+    return driver.execute_script(EXTRACT_DETAIL_JS, SELECTORS) or {}
+
+def parse_review_count(reviews_text: Optional[str]) -> Optional[int]:
+    """'4.5(1,234)' -> 1234"""
+    if not reviews_text or "(" not in reviews_text or ")" not in reviews_text:
+        return None
+    reviews = reviews_text[reviews_text.index("(") + 1:reviews_text.index(")")].replace(",", "")
+    return int(reviews) if reviews.isdigit() else None
+
+VIEWPORT_PATTERN = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(\d+(?:\.\d+)?)z")
+
+def parse_viewport(url: str) -> Optional[Tuple[float, float, float]]:
+    """(lat, lng, zoom) from a Maps URL like .../@5.6037,-0.1870,13z"""
+    match = VIEWPORT_PATTERN.search(url or "")
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2)), float(match.group(3))
+
+def build_tile_grid(lat: float, lng: float, zoom: float, grid: int, width_px: int, height_px: int,
+                    tile_zoom: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Centers of a grid x grid split of the viewport at (lat, lng, zoom)"""
+    # Web Mercator: 256px world at zoom 0; latitude degrees shrink by cos(lat)
+    degrees_per_px = 360.0 / (256 * 2 ** zoom)
+    lng_span = width_px * degrees_per_px
+    lat_span = height_px * degrees_per_px * math.cos(math.radians(lat))
+    tile_zoom = tile_zoom or round(zoom + math.log2(grid), 2)
+    
+    tiles = []
+    for row in range(grid):
+        for col in range(grid):
+            tiles.append({
+                "tile": len(tiles) + 1,
+                "row": row,
+                "col": col,
+                "lat": round(lat + lat_span * (0.5 - (row + 0.5) / grid), 6),
+                "lng": round(lng + lng_span * ((col + 0.5) / grid - 0.5), 6),
+                "zoom": tile_zoom,
+            })
+    return tiles
+
+def build_tile_url(query: str, tile: Dict[str, Any]) -> str:
+    """Search URL pinned to a tile's viewport"""
+    return f"https://www.google.com/maps/search/{quote_plus(query)}/@{tile['lat']},{tile['lng']},{tile['zoom']}z"
+
+CACHED_PLACE_FIELDS = ("business_name", "average_rating", "review_count", "business_type",
+                       "address", "phone", "website", "place_id")
+
+def cacheable_place(business: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a scraped business worth keeping in the place cache"""
+    return {field: business.get(field) for field in CACHED_PLACE_FIELDS}
+
+def _search_results_shown(driver) -> bool:
+    """Results feed (or a single place panel) is on screen"""
+    return bool(driver.find_elements(By.CSS_SELECTOR, "div[role='feed']")
+                or driver.find_elements(By.CSS_SELECTOR, SELECTORS['business_name']))
+
+def _back_on_results(driver) -> bool:
+    """Left the place page and the results feed is back"""
+    return "/place/" not in driver.current_url and bool(driver.find_elements(By.CSS_SELECTOR, "div[role='feed']"))
+
+def _dig(data: Any, *path: int) -> Any:
+    """Walk nested lists of a Maps RPC payload, returning None for missing entries"""
+    for index in path:
+        if not isinstance(data, list) or index >= len(data):
+            return None
+        data = data[index]
+    return data
+
+def decode_search_rpc_body(body: str) -> Any:
+    """Decode a Maps ``/search?tbm=map`` response body into its JSON array"""
+    text = body.strip()
+    # Newer responses wrap the payload: {"c":0,"d":")]}'\n[...]"}/*""*/
+    if text.startswith("{"):
+        text = json.loads(text.split('/*""*/')[0])["d"]
+    # Strip the XSSI guard
+    if text.startswith(")]}'"):
+        text = text[4:]
+    return json.loads(text)
+
+def _clean_rpc_url(url: Optional[str]) -> Optional[str]:
+    """Unwrap Google ``/url?q=`` redirects found in place websites"""
+    if not url:
+        return None
+    if url.startswith("/url?"):
+        return parse_qs(urlparse(url).query).get("q", [url])[0]
+    return url
+
+def parse_rpc_places(payload: Any) -> List[Dict[str, Any]]:
+    """Pull place fields out of a decoded search RPC payload"""
+    places = []
+    for entry in _dig(payload, 0, 1) or []:
+        info = _dig(entry, 14)
+        if not isinstance(info, list):
+            continue
+        
+        rating = _dig(info, 4, 7)
+        review_count = _dig(info, 4, 8)
+        categories = _dig(info, 13)
+        places.append({
+            "place_id": _dig(info, 78) or _dig(info, 10),
+            "business_name": _dig(info, 11),
+            "average_rating": str(rating) if rating is not None else None,
+            "review_count": int(review_count) if isinstance(review_count, (int, float)) else None,
+            "business_type": categories[0] if isinstance(categories, list) and categories else None,
+            "address": _dig(info, 39) or _dig(info, 18),
+            "phone": _dig(info, 178, 0, 0),
+            "website": _clean_rpc_url(_dig(info, 7, 0)),
+        })
+    return places
+
 class ChromeDriverManager:
-    """Context manager for Chrome WebDriver"""
+    """Context manager that leases a warm Chrome WebDriver from the shared browser pool"""
     
-    def __init__(self, headless: bool = True):
+    def __init__(self):
         self.driver = None
-        self.headless = headless
-        self.retry_count = 0
-        self.max_retries = 3
-        logger.info(f"🔧 ChromeDriverManager initialized (headless={headless})")
+        logger.info(f"🔧 ChromeDriverManager initialized (headless={browser_pool.headless})")
     
     def __enter__(self):
-        """Initialize Chrome driver with retry logic"""
-        logger.info("🚀 Starting Chrome WebDriver initialization")
-        
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"🔄 Driver creation attempt {attempt + 1}/{self.max_retries}")
-                self.driver = self._create_driver()
-                logger.info(f"✅ Chrome WebDriver created successfully on attempt {attempt + 1}")
-                return self.driver
-            except Exception as e:
-                logger.warning(f"❌ Driver creation attempt {attempt + 1} failed: {str(e)}")
-                
-                if attempt == self.max_retries - 1:
-                    logger.error("💥 Failed to create Chrome WebDriver after all retry attempts")
-                    raise
-                
-                logger.info(f"⏳ Waiting 0.5s before retry attempt {attempt + 2}")
-                time.sleep(0.5)  # Wait before retry
-        
-        raise Exception("Failed to initialize Chrome driver")
-    
-    def _create_driver(self):
-        """Create Chrome driver using exact same options as working script"""
-        logger.info("🔧 Configuring Chrome options")
-        options = webdriver.ChromeOptions()
-        
-        # Use exact same options as the working script
-        chrome_args = [
-            "disable-cookies",
-            "disable-extensions", 
-            "disable-gpu",
-            "disable-infobars",
-            "disable-notifications",
-            "disable-popup-blocking",
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-web-security",
-            "--disable-features=VizDisplayCompositor",
-            "--disable-ipc-flooding-protection",
-            "user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "--remote-debugging-pipe",
-            "--headless"
-        ]
-        
-        for arg in chrome_args:
-            options.add_argument(arg)
-            logger.debug(f"   Added Chrome argument: {arg}")
-        
-        # Only add headless if requested
-        if self.headless:
-            options.add_argument("--headless")
-            logger.info("🙈 Running in headless mode")
-        else:
-            logger.info("👁️  Running with visible browser")
-        
-        logger.info(f"📊 Total Chrome arguments configured: {len(chrome_args) + (1 if self.headless else 0)}")
-        
-        # Create driver with configured options
-        logger.info("🚗 Creating Chrome WebDriver instance")
-        driver = webdriver.Chrome(options=options)
-        
-        # Log driver capabilities
-        logger.info(f"🏷️  Browser version: {driver.capabilities.get('browserVersion', 'Unknown')}")
-        logger.info(f"🏷️  ChromeDriver version: {driver.capabilities.get('chrome', {}).get('chromedriverVersion', 'Unknown')}")
-        
-        return driver
+        """Lease a driver (the pool launches one, with retries, if none is idle)"""
+        logger.info("🚀 Leasing Chrome WebDriver from browser pool")
+        lease_start = time.time()
+        self.driver = browser_pool.acquire()
+        logger.info(f"✅ Chrome WebDriver leased in {time.time() - lease_start:.2f}s")
+        return self.driver
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Clean up Chrome driver"""
+        """Hand the driver back; the pool resets cookies/tabs or recycles it"""
         if self.driver:
-            try:
-                logger.info("🧹 Cleaning up Chrome WebDriver")
-                self.driver.quit()
-                logger.info("✅ Chrome WebDriver closed successfully")
-            except Exception as e:
-                logger.warning(f"⚠️  Error during driver cleanup: {str(e)}")
+            logger.info("🧹 Returning Chrome WebDriver to browser pool")
+            browser_pool.release(self.driver)
+            self.driver = None
         else:
             logger.warning("⚠️  No driver instance to clean up")
 
@@ -305,10 +482,8 @@ class ChromeDriverManager:
 class GoogleMapsScraper:
     """Google Maps business scraper following the exact working workflow"""
     
-    def __init__(self, headless: bool = True):
-        """Initialize the Google Maps scraper"""
-        self.headless = headless
-        
+    def __init__(self):
+        """Initialize the Google Maps scraper (headless mode is set on the browser pool)"""
         # # Create output directory
         # self.output_dir = Path(CONFIG['output_dir'])
         # self.output_dir.mkdir(exist_ok=True)
@@ -317,125 +492,229 @@ class GoogleMapsScraper:
         # logger.info(f"📂 Output directory: {self.output_dir.absolute()}")
         logger.info(f"🎯 Max results limit: {CONFIG['max_results']}")
         logger.info(f"⏱️  Timing config - Implicit wait: {CONFIG['implicit_wait']}s, Explicit wait: {CONFIG['explicit_wait']}s")
-        logger.info("🙈 Running in headless mode for optimal performance")
+        if browser_pool.headless:
+            logger.info("🙈 Running in headless mode for optimal performance")
+        self.wait_timings = WaitTimings()
+        self.cache_lookups = 0
+        self.cache_hits = 0
     
-    def search_businesses(self, query: str, max_results: Optional[int] = None, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Search for businesses on Google Maps using the exact working workflow"""
+    def _lookup_cached_place(self, card: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached record for an indexed card, counting the lookup towards the hit rate"""
+        self.cache_lookups += 1
+        cached = place_cache.get(get_place_id(card["place_url"]))
+        if cached:
+            self.cache_hits += 1
+        return cached
+    
+    def cache_status(self) -> Dict[str, Any]:
+        """Place cache counters for the task status"""
+        return {
+            "cache_lookups": self.cache_lookups,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.cache_lookups, 3) if self.cache_lookups else None,
+        }
+
+    def _wait_for(self, driver, name: str, condition, timeout: Optional[float] = None) -> bool:
+        """Wait until ``condition(driver)`` is truthy, recording the time taken under ``name``"""
+        timeout = CONFIG['wait_timeouts'][name] if timeout is None else timeout
+        wait_start = time.time()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=CONFIG['wait_poll_interval']).until(condition)
+            timed_out = False
+        except TimeoutException:
+            timed_out = True
+            logger.debug(f"⏰ Wait '{name}' timed out after {timeout}s")
+        self.wait_timings.record(name, time.time() - wait_start, timed_out)
+        return not timed_out
+    
+    def search_businesses(self, query: str, max_results: Optional[int] = None, task_id: Optional[str] = None,
+                          extraction_mode: str = "rpc", start_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for businesses on Google Maps using the exact working workflow
+
+        ``start_url`` opens a ready-made search URL (e.g. a geo tile viewport) instead of typing the query.
+        """
         logger.info("=" * 60)
-        logger.info(f"🎯 Starting Google Maps search for: '{query}'")
+        logger.info(f"🎯 Starting Google Maps search for: '{query}' (mode={extraction_mode})")
         
         max_results = max_results or CONFIG['max_results']
         logger.info(f"📊 Target max results: {max_results}")
         businesses = []
+        self.wait_timings = WaitTimings()
         
         scrape_start_time = time.time()
         
         try:
-            with ChromeDriverManager(self.headless) as driver:
+            with ChromeDriverManager() as driver:
                 wait = WebDriverWait(driver, 10)
                 actions = ActionChains(driver)
                 
-                # Step 1: Navigate to Google Maps
-                logger.info("🌐 Step 1: Navigating to Google Maps")
-                if task_id:
-                    update_task_status(task_id, 
-                                     current_stage="navigation",
-                                     current_operation="Loading Google Maps",
-                                     progress="Navigating to Google Maps")
+                if start_url:
+                    # Viewport search (geo tiles): the URL carries the query and the map position
+                    logger.info(f"🌐 Steps 1-2: Opening search URL {start_url}")
+                    search_start = time.time()
+                    driver.get(start_url)
+                    if not self._wait_for(driver, "search_results", _search_results_shown):
+                        logger.warning("⚠️  Search results did not appear before timeout - continuing")
+                    logger.info(f"✅ Search completed in {time.time() - search_start:.2f}s")
+                else:
+                    # Step 1: Navigate to Google Maps
+                    logger.info("🌐 Step 1: Navigating to Google Maps")
+                    if task_id:
+                        update_task_status(task_id, 
+                                         current_stage="navigation",
+                                         current_operation="Loading Google Maps",
+                                         progress="Navigating to Google Maps")
                 
-                nav_start = time.time()
-                driver.get("https://www.google.com/maps/")
-                logger.info(f"✅ Navigation completed in {time.time() - nav_start:.2f}s")
+                    nav_start = time.time()
+                    driver.get("https://www.google.com/maps/")
+                    logger.info(f"✅ Navigation completed in {time.time() - nav_start:.2f}s")
                 
-                # Step 2: Find search input and enter query
-                logger.info(f"🔍 Step 2: Searching for '{query}'")
-                if task_id:
-                    update_task_status(task_id,
-                                     current_stage="search",
-                                     current_operation="Entering search query",
-                                     progress=f"Searching for '{query}'")
+                    # Step 2: Find search input and enter query
+                    logger.info(f"🔍 Step 2: Searching for '{query}'")
+                    if task_id:
+                        update_task_status(task_id,
+                                         current_stage="search",
+                                         current_operation="Entering search query",
+                                         progress=f"Searching for '{query}'")
                 
-                search_start = time.time()
-                try:
-                    input_element = driver.find_element(By.CSS_SELECTOR, "input.searchboxinput")
-                    logger.info("✅ Found search input element")
-                    input_element.send_keys(query)
-                    logger.info(f"⌨️  Entered query: '{query}'")
-                    input_element.send_keys(Keys.ENTER)
-                    logger.info("🔍 Submitted search query")
-                    time.sleep(5)
-                    logger.info(f"✅ Search completed in {time.time() - search_start:.2f}s")
-                except Exception as e:
-                    logger.error(f"❌ Failed to perform search: {str(e)}")
-                    raise
+                    search_start = time.time()
+                    try:
+                        input_element = driver.find_element(By.CSS_SELECTOR, "input.searchboxinput")
+                        logger.info("✅ Found search input element")
+                        input_element.send_keys(query)
+                        logger.info(f"⌨️  Entered query: '{query}'")
+                        input_element.send_keys(Keys.ENTER)
+                        logger.info("🔍 Submitted search query")
+                        if not self._wait_for(driver, "search_results", _search_results_shown):
+                            logger.warning("⚠️  Search results did not appear before timeout - continuing")
+                        logger.info(f"✅ Search completed in {time.time() - search_start:.2f}s")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to perform search: {str(e)}")
+                        raise
+                
+                # Step 3 (RPC mode): decode the search XHRs instead of clicking every card
+                business_index = 0
+                if extraction_mode == "rpc":
+                    logger.info("⚡ Step 3: Reading places from the search RPC payloads")
+                    businesses.extend(self._collect_from_rpc(driver, max_results, task_id))
+                    business_index = len(businesses)
+                    if not businesses:
+                        logger.warning("⚠️  No search RPC payloads captured - falling back to opening each business card")
                 
-                # Step 3: Skipping rating filter - getting all businesses
-                logger.info("📋 Step 3: Skipping rating filter to get all businesses")
-                if task_id:
-                    update_task_status(task_id,
-                                     current_stage="preparing",
-                                     current_operation="Preparing to load all businesses",
-                                     progress="Skipping filters to get comprehensive results")
+                if not businesses:
+                    # Step 3: Skipping rating filter - getting all businesses
+                    logger.info("📋 Step 3: Skipping rating filter to get all businesses")
+                    if task_id:
+                        update_task_status(task_id,
+                                         current_stage="preparing",
+                                         current_operation="Preparing to load all businesses",
+                                         progress="Skipping filters to get comprehensive results")
                 
-                logger.info("✅ No filtering applied - will scrape all available businesses")
+                    logger.info("✅ No filtering applied - will scrape all available businesses")
                 
-                # Step 4: Start processing businesses immediately while scrolling as needed
-                logger.info("🏢 Step 4: Processing businesses incrementally from top while scrolling")
-                processing_start = time.time()
-                successful_extractions = 0
-                failed_extractions = 0
-                business_index = 0
-                processed_businesses = set()  # Track processed businesses by their text/identifier
-                scroll_count = 0
-                last_business_count = 0
-                no_new_businesses_count = 0
+                    # Step 4: Start processing businesses immediately while scrolling as needed
+                    logger.info("🏢 Step 4: Processing businesses incrementally from top while scrolling")
+                    processing_start = time.time()
+                    successful_extractions = 0
+                    failed_extractions = 0
+                    business_index = 0
+                    processed_businesses = set()  # Place ids already indexed (queued or processed)
+                    pending_cards = deque()  # Indexed cards waiting to be opened, in feed order
+                    card_cursor = 0  # Cards in the feed that have already been indexed
+                    scroll_count = 0
                 
-                logger.info("🔍 Starting immediate business processing from top")
+                    logger.info("🔍 Starting immediate business processing from top")
                 
-                if task_id:
-                    update_task_status(task_id,
-                                     current_stage="processing",
-                                     current_operation="Starting immediate business data extraction",
-                                     businesses_processed=0,
-                                     success_count=0,
-                                     failure_count=0,
-                                     progress="Processing businesses from top while scrolling")
+                    if task_id:
+                        update_task_status(task_id,
+                                         current_stage="processing",
+                                         current_operation="Starting immediate business data extraction",
+                                         businesses_processed=0,
+                                         success_count=0,
+                                         failure_count=0,
+                                         progress="Processing businesses from top while scrolling")
                 
-                while business_index < max_results:
-                    # Find current available businesses (fresh query each time)
-                    logger.debug(f"🔍 Looking for business #{business_index + 1}")
-                    current_businesses = []
-                    business_detection_errors = []
-                    
-                    # Try multiple selectors to find businesses with detailed error logging
-                    for selector in ["div.Nv2PK.tH5CWc.THOPZb", "div.Nv2PK.Q2HXcd.THOPZb", "div.Nv2PK.THOPZb.CpccDe"]:
-                        try:
-                            found_businesses = driver.find_elements(By.CSS_SELECTOR, selector)
-                            current_businesses.extend(found_businesses)
-                            logger.debug(f"✅ Selector '{selector}' found {len(found_businesses)} businesses")
-                        except Exception as e:
-                            error_msg = f"❌ Selector '{selector}' failed: {type(e).__name__}: {str(e)}"
-                            logger.debug(error_msg)
-                            business_detection_errors.append(error_msg)
-                    
-                    # Log detailed information about business detection
-                    logger.debug(f"📊 Total businesses found with all selectors: {len(current_businesses)}")
-                    
-                    # Check if we have any new businesses
-                    if len(current_businesses) == last_business_count:
-                        no_new_businesses_count += 1
+                    while business_index < max_results:
+                        # Index only the cards appended since the last pass - one WebDriver call per batch
+                        if not pending_cards:
+                            batch = index_cards(driver, card_cursor)
+                            if batch["total"] < card_cursor:
+                                # Feed was re-rendered (e.g. after back navigation); rescan, seen place ids dedupe
+                                logger.debug(f"🔁 Feed shrank from {card_cursor} to {batch['total']} cards - re-indexing")
+                                batch = index_cards(driver, 0)
+                            card_cursor = batch["total"]
+                            
+                            for card in batch["cards"]:
+                                if not card["place_url"]:
+                                    logger.debug(f"⚠️  Skipping card without a place link: '{card['label']}'")
+                                    continue
+                                place_key = get_place_id(card["place_url"])
+                                if place_key in processed_businesses:
+                                    continue
+                                processed_businesses.add(place_key)
+                                pending_cards.append(card)
+                            logger.debug(f"📊 Indexed {len(batch['cards'])} new cards ({card_cursor} in feed, {len(pending_cards)} pending)")
+                        
+                        if not pending_cards and card_cursor == 0:
+                            # Log detailed error information about WHY no businesses were found
+                            logger.error("=" * 80)
+                            logger.error("💥 NO BUSINESSES FOUND - DETAILED ANALYSIS")
+                            logger.error("=" * 80)
+                            logger.error(f"🔍 Business detection attempted for position #{business_index + 1}")
+                            logger.error(f"📊 Cards in feed: {card_cursor}")
+                            logger.error(f"📜 Scroll count: {scroll_count}")
+                            logger.error(f"📋 Total processed businesses: {len(processed_businesses)}")
+                            
+                            # Try to get page source information for debugging
+                            try:
+                                page_url = driver.current_url
+                                page_title = driver.title
+                                logger.error(f"🌐 Current page URL: {page_url}")
+                                logger.error(f"📄 Current page title: {page_title}")
+                                
+                                # Check if we're still on a maps page
+                                if "google.com/maps" not in page_url:
+                                    logger.error(f"❌ NOT ON GOOGLE MAPS PAGE! Current URL: {page_url}")
+                                
+                                # Check for common error elements
+                                try:
+                                    error_elements = driver.find_elements(By.CSS_SELECTOR, ".error, .no-results, .empty")
+                                    if error_elements:
+                                        logger.error(f"🚨 Found {len(error_elements)} error/empty result elements on page")
+                                        for elem in error_elements[:3]:  # Log first 3
+                                            logger.error(f"  • Error element text: '{elem.text}'")
+                                except:
+                                    pass
+                                    
+                            except Exception as debug_error:
+                                logger.error(f"❌ Could not get page debug info: {type(debug_error).__name__}: {str(debug_error)}")
+                            
+                            logger.error("📍 Full current stack trace:")
+                            logger.error(''.join(traceback.format_stack()))
+                            logger.error("=" * 80)
+                            
+                            logger.warning("📭 STOPPING: No businesses found on page after detailed analysis")
+                            break
                         
-                        # If no new businesses for 3 consecutive checks, try scrolling
-                        if no_new_businesses_count >= 3:
+                        if not pending_cards:
+                            # Every indexed card is done - scroll to load more
                             # Simple scroll limit to prevent infinite scrolling
-                            if scroll_count >= 10:  # Stop after 15 scrolls
+                            if scroll_count >= 10:
                                 logger.info(f"🛑 Reached maximum scroll limit ({scroll_count} scrolls)")
                                 logger.info(f"✅ Finished processing all available businesses")
                                 break
-                                
+                            
+                            # Check if we've reached the end
+                            end_markers = driver.find_elements(By.CSS_SELECTOR, SELECTORS['end_of_results'])
+                            if end_markers:
+                                logger.info(f"🎯 Reached end of results: '{end_markers[0].text}'")
+                                logger.info(f"✅ Finished processing all available businesses")
+                                break
+                            
                             logger.info(f"📜 No new businesses found, scrolling to load more...")
                             scroll_count += 1
                             
+                            cards_before = card_cursor
                             try:
                                 actions.send_keys(Keys.END).perform()
                                 logger.debug(f"✅ Scroll action #{scroll_count} executed")
@@ -443,368 +722,248 @@ class GoogleMapsScraper:
                                 logger.error(f"❌ Scroll action #{scroll_count} failed: {type(e).__name__}: {str(e)}")
                                 logger.error(f"📍 Scroll error traceback: {traceback.format_exc()}")
                             
-                            # Wait a bit for new content to load
-                            wait_time = random.randint(1, 3)
-                            logger.debug(f"⏳ Waiting {wait_time}s after scroll #{scroll_count}")
-                            time.sleep(wait_time)
+                            # Wait for new cards to be appended (or the end-of-results marker)
+                            logger.debug(f"⏳ Waiting for new cards after scroll #{scroll_count}")
+                            self._wait_for(driver, "new_cards",
+                                           lambda d: d.execute_script(COUNT_CARDS_JS) > cards_before
+                                           or d.find_elements(By.CSS_SELECTOR, SELECTORS['end_of_results']))
                             
                             # Update status during scrolling
                             if task_id and scroll_count % 3 == 0:
                                 update_task_status(task_id,
                                                  current_operation=f"Scrolling for more businesses... (scroll #{scroll_count})",
                                                  progress=f"Processed {business_index} businesses, scrolling for more...")
-                            
-                            # Check if we've reached the end with detailed logging
-                            try:
-                                end_marker = driver.find_element(By.CSS_SELECTOR, "span.HlvSq")
-                                logger.info(f"🎯 Reached end of results: '{end_marker.text}'")
-                                logger.info(f"✅ Finished processing all available businesses")
-                                break
-                            except Exception as e:
-                                logger.debug(f"📄 No end marker found (continuing): {type(e).__name__}: {str(e)}")
-                                # Continue scrolling if no end marker found
-                                pass
-                            
-                            # Reset the counter after scrolling
-                            no_new_businesses_count = 0
                             continue
-                    else:
-                        # We found new businesses, reset counter
-                        last_business_count = len(current_businesses)
-                        no_new_businesses_count = 0
-                    
-                    if not current_businesses:
-                        # Log detailed error information about WHY no businesses were found
-                        logger.error("=" * 80)
-                        logger.error("💥 NO BUSINESSES FOUND - DETAILED ANALYSIS")
-                        logger.error("=" * 80)
-                        logger.error(f"🔍 Business detection attempted for position #{business_index + 1}")
-                        logger.error(f"📊 Current business count: {len(current_businesses)}")
-                        logger.error(f"📊 Last business count: {last_business_count}")
-                        logger.error(f"📊 No new businesses count: {no_new_businesses_count}")
-                        logger.error(f"📜 Scroll count: {scroll_count}")
-                        logger.error(f"📋 Total processed businesses: {len(processed_businesses)}")
-                        
-                        if business_detection_errors:
-                            logger.error("🚨 Business detection errors encountered:")
-                            for error in business_detection_errors:
-                                logger.error(f"  • {error}")
-                        else:
-                            logger.error("✅ No detection errors - selectors ran successfully but returned 0 businesses")
-                        
-                        # Try to get page source information for debugging
-                        try:
-                            page_url = driver.current_url
-                            page_title = driver.title
-                            logger.error(f"🌐 Current page URL: {page_url}")
-                            logger.error(f"📄 Current page title: {page_title}")
-                            
-                            # Check if we're still on a maps page
-                            if "google.com/maps" not in page_url:
-                                logger.error(f"❌ NOT ON GOOGLE MAPS PAGE! Current URL: {page_url}")
-                            
-                            # Check for common error elements
-                            try:
-                                error_elements = driver.find_elements(By.CSS_SELECTOR, ".error, .no-results, .empty")
-                                if error_elements:
-                                    logger.error(f"🚨 Found {len(error_elements)} error/empty result elements on page")
-                                    for elem in error_elements[:3]:  # Log first 3
-                                        logger.error(f"  • Error element text: '{elem.text}'")
-                            except:
-                                pass
-                                
-                        except Exception as debug_error:
-                            logger.error(f"❌ Could not get page debug info: {type(debug_error).__name__}: {str(debug_error)}")
                         
-                        logger.error("📍 Full current stack trace:")
-                        logger.error(''.join(traceback.format_stack()))
-                        logger.error("=" * 80)
+                        card = pending_cards.popleft()
+                        business_start = time.time()
                         
-                        logger.warning("📭 STOPPING: No businesses found on page after detailed analysis")
-                        break
-
+                        # Fresh cached record: skip the click-into-detail step entirely
+                        cached_place = self._lookup_cached_place(card)
+                        if cached_place:
+                            cached_place.update(
+                                # Listing values are already on the card, so prefer the current ones
+                                phone=card["phone"] or cached_place.get("phone"),
+                                review_count=parse_review_count(card["reviews_text"]) or cached_place.get("review_count"),
+                                scraped_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                scraped_index=business_index + 1
+                            )
+                            businesses.append(cached_place)
+                            successful_extractions += 1
+                            logger.info(f"💾 Cache hit for '{cached_place.get('business_name')}' - skipped detail page")
+                            if task_id:
+                                update_task_status(task_id,
+                                                 current_business_name=cached_place.get("business_name"),
+                                                 success_count=successful_extractions,
+                                                 businesses_processed=business_index + 1,
+                                                 **self.cache_status())
+                            business_index += 1
+                            continue
                         
-                    logger.debug(f"✅ Found {len(current_businesses)} current businesses on page")
-                    
-                    # Find a business we haven't processed yet
-                    current_item = None
-                    business_identifier = None
+                        max_retries = 3
+                        retry_count = 0
                     
-                    for idx, business_element in enumerate(current_businesses):
-                        try:
-                            # Create a unique identifier for this business to avoid duplicates
+                        while retry_count < max_retries:
                             try:
-                                business_link = business_element.find_element(By.CSS_SELECTOR, "a.hfpxzc")
-                                business_identifier = business_link.get_attribute("href")
-                            except:
-                                # Fallback identifier using element text or position
-                                business_identifier = f"business_{idx}_{business_element.text[:50] if business_element.text else 'unknown'}"
-                            
-                            # Skip if we've already processed this business
-                            if business_identifier in processed_businesses:
-                                continue
-                                
-                            # This is a new business we can process
-                            current_item = business_element
-                            break
-                            
-                        except Exception as e:
-                            logger.debug(f"⚠️  Could not get identifier for business {idx}: {str(e)}")
-                            continue
-                    
-                    if not current_item or not business_identifier:
-                        # No new businesses found, continue to trigger scrolling logic
-                        continue
-                    
-                    # Mark this business as being processed
-                    processed_businesses.add(business_identifier)
-                    business_start = time.time()
-                    max_retries = 3
-                    retry_count = 0
-                    
-                    while retry_count < max_retries:
-                        try:
-                            logger.info(f"🔄 Processing business #{business_index + 1} (attempt {retry_count + 1})")
+                                logger.info(f"🔄 Processing business #{business_index + 1} (attempt {retry_count + 1})")
                             
-                            # Update status for current business
-                            if task_id:
-                                estimated_remaining = None
-                                if business_index > 0:
-                                    elapsed = time.time() - processing_start
-                                    avg_time = elapsed / business_index
-                                    remaining_businesses = max_results - business_index
-                                    estimated_remaining = remaining_businesses * avg_time
+                                # Update status for current business
+                                if task_id:
+                                    estimated_remaining = None
+                                    if business_index > 0:
+                                        elapsed = time.time() - processing_start
+                                        avg_time = elapsed / business_index
+                                        remaining_businesses = max_results - business_index
+                                        estimated_remaining = remaining_businesses * avg_time
                                 
-                                update_task_status(task_id,
-                                                 current_operation=f"Processing business #{business_index + 1}",
-                                                 businesses_processed=business_index,
-                                                 success_count=successful_extractions,
-                                                 failure_count=failed_extractions,
-                                                 estimated_remaining_seconds=estimated_remaining,
-                                                 progress=f"Extracting data from business #{business_index + 1}")
+                                    update_task_status(task_id,
+                                                     current_operation=f"Processing business #{business_index + 1}",
+                                                     businesses_processed=business_index,
+                                                     success_count=successful_extractions,
+                                                     failure_count=failed_extractions,
+                                                     estimated_remaining_seconds=estimated_remaining,
+                                                     wait_timings=self.wait_timings.as_dict(),
+                                                     **self.cache_status(),
+                                                     progress=f"Extracting data from business #{business_index + 1}")
                             
-                            # Extract basic info from listing first
-                            logger.debug("📞 Extracting phone number")
-                            try:
-                                telephone = current_item.find_element(By.CSS_SELECTOR, "span.UsdlK").text
-                                logger.debug(f"✅ Phone found: {telephone}")
-                            except:
-                                telephone = None
-                                logger.debug("⚠️  No phone number found")
-                                
-                            logger.debug("🌐 Extracting website from listing")
-                            try:
-                                website = current_item.find_element(By.CSS_SELECTOR, "a.lcr4fd.S9kvJb").get_attribute("href")
-                                logger.debug(f"✅ Website found: {website}")
-                            except:
-                                website = False
-                                logger.debug("⚠️  No website found in listing")
-                                
-                            logger.debug("⭐ Extracting review count")
-                            try:
-                                reviews_text = current_item.find_element(By.CSS_SELECTOR, "span.e4rVHe.fontBodyMedium").text
-                                reviews = reviews_text[reviews_text.index("(") + 1:reviews_text.index(")")].replace(",", "")
-                                reviews = int(reviews) if reviews.isdigit() else None
-                                logger.debug(f"✅ Reviews found: {reviews}")
-                            except:
-                                reviews = None
-                                logger.debug("⚠️  No review count found")
+                                # Basic info from the listing was read when the card was indexed
+                                telephone = card["phone"]
+                                website = card["website"] or False  # False = look it up in the detail panel
+                                reviews = parse_review_count(card["reviews_text"])
+                                logger.debug(f"✅ Listing fields - phone: {telephone}, website: {website}, reviews: {reviews}")
                             
-                            # Click on the business link with retry logic
-                            logger.debug("🖱️  Clicking business link for details")
-                            business_link = None
-                            click_attempts = 0
-                            max_click_attempts = 3
+                                # Click on the business link with retry logic
+                                logger.debug("🖱️  Clicking business link for details")
+                                business_link = None
+                                click_attempts = 0
+                                max_click_attempts = 3
                             
-                            while click_attempts < max_click_attempts:
-                                try:
-                                    business_link = current_item.find_element(By.CSS_SELECTOR, "a.hfpxzc")
-                                    logger.debug("✅ Found business link")
-                                    
-                                    logger.debug("📜 Scrolling business link into view")
-                                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", business_link)
-                                    time.sleep(2)  # Wait for scroll to complete
+                                while click_attempts < max_click_attempts:
+                                    try:
+                                        # Re-locate the link by URL each attempt; the feed re-renders after back()
+                                        business_link = driver.execute_script(FIND_CARD_LINK_JS, SELECTORS, card["place_url"])
+                                        if business_link is None:
+                                            raise NoSuchElementException(f"Card no longer in feed: {card['place_url']}")
+                                        logger.debug("✅ Found business link")
                                     
-                                    # Check if element is still attached to DOM
-                                    business_link.tag_name  # Test for staleness
+                                        logger.debug("📜 Scrolling business link into view")
+                                        # Instant scroll completes synchronously, so there is nothing to wait for
+                                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", business_link)
+
+                                        # Check if element is still attached to DOM
+                                        business_link.tag_name  # Test for staleness
                                     
-                                    logger.debug("🖱️  Clicking business link")
-                                    driver.execute_script("arguments[0].click();", business_link)  # Use JavaScript click for reliability
-                                    logger.debug("✅ Business link clicked successfully")
-                                    break
+                                        logger.debug("🖱️  Clicking business link")
+                                        previous_title = driver.execute_script(DETAIL_TITLE_JS)
+                                        driver.execute_script("arguments[0].click();", business_link)  # Use JavaScript click for reliability
+                                        logger.debug("✅ Business link clicked successfully")
+                                        break
                                     
-                                except Exception as click_error:
-                                    click_attempts += 1
-                                    logger.warning(f"❌ Click attempt {click_attempts} failed: {str(click_error)}")
+                                    except Exception as click_error:
+                                        click_attempts += 1
+                                        logger.warning(f"❌ Click attempt {click_attempts} failed: {str(click_error)}")
                                     
-                                    if click_attempts >= max_click_attempts:
-                                        logger.warning("❌ All click attempts failed")
-                                        raise click_error
+                                        if click_attempts >= max_click_attempts:
+                                            logger.warning("❌ All click attempts failed")
+                                            raise click_error
                                     
-                                    # Wait and try to re-find the element
-                                    time.sleep(1)
-                                    logger.warning("⚠️  Will retry with fresh element search")
-                            
-                            logger.debug("⏳ Waiting 5s for business details to load")
-                            time.sleep(5)  # Wait for details to load
-                            
-                            # Extract detailed information with error handling
-                            logger.debug("📊 Extracting detailed business information")
-                            
-                            logger.debug("🏷️  Extracting business name")
-                            try:
-                                business_name = driver.find_element(By.CSS_SELECTOR, "h1.DUwDvf.lfPIob").text
-                                logger.debug(f"✅ Business name: {business_name}")
-                            except:
-                                business_name = None
-                                logger.debug("⚠️  No business name found")
-                                
-                            logger.debug("⭐ Extracting average rating")
-                            try:
-                                average_star = driver.find_element(By.CSS_SELECTOR, "div.F7nice span span").text
-                                logger.debug(f"✅ Average rating: {average_star}")
-                            except:
-                                average_star = None
-                                logger.debug("⚠️  No average rating found")
+                                        # Wait and try to re-find the element
+                                        time.sleep(1)
+                                        logger.warning("⚠️  Will retry with fresh element search")
                             
-                            # Get website if not found in listing
-                            if website == False:
-                                logger.debug("🌐 Extracting website from details page")
-                                try:
-                                    website = driver.find_element(By.CSS_SELECTOR, "a.CsEnBe").get_attribute("href")
-                                    logger.debug(f"✅ Website from details: {website}")
-                                except:
-                                    website = None
-                                    logger.debug("⚠️  No website found in details")
+                                logger.debug("⏳ Waiting for business details to load")
+                                if not self._wait_for(driver, "detail_panel",
+                                                      lambda d: (d.execute_script(DETAIL_TITLE_JS) or previous_title) != previous_title):
+                                    logger.warning("⚠️  Detail panel did not change before timeout")
+
+                                # Extract detailed information with error handling
+                                logger.debug("📊 Extracting detailed business information")
                             
-                            logger.debug("🏢 Extracting business type")
-                            try:
-                                business_type = driver.find_element(By.CSS_SELECTOR, "button.DkEaL").text
-                                logger.debug(f"✅ Business type: {business_type}")
-                            except:
-                                business_type = None
-                                logger.debug("⚠️  No business type found")
+                                details = extract_detail_fields(driver)
+                                business_name = details.get("business_name")
+                                average_star = details.get("average_rating")
+                                business_type = details.get("business_type")
+                                address = details.get("address")
                                 
-                            logger.debug("📍 Extracting address")
-                            try:
-                                address = driver.find_element(By.CSS_SELECTOR, "div.Io6YTe.fontBodyMedium.kR99db").text
-                                logger.debug(f"✅ Address: {address}")
-                            except:
-                                address = None
-                                logger.debug("⚠️  No address found")
+                                # Get website from details page if not found in listing
+                                if website == False:
+                                    website = details.get("website")
+                                logger.debug(f"✅ Detail fields - name: {business_name}, rating: {average_star}, type: {business_type}, address: {address}, website: {website}")
                             
-                            # Create business data
-                            business_details = {
-                                "business_name": business_name,
-                                "average_rating": average_star,
-                                "review_count": reviews,
-                                "business_type": business_type,
-                                "address": address,
-                                "phone": telephone,
-                                "website": website,
-                                "scraped_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                "scraped_index": business_index + 1
-                            }
+                                # Create business data
+                                business_details = {
+                                    "business_name": business_name,
+                                    "average_rating": average_star,
+                                    "review_count": reviews,
+                                    "business_type": business_type,
+                                    "address": address,
+                                    "phone": telephone,
+                                    "website": website,
+                                    "place_id": get_place_id(card["place_url"]),
+                                    "scraped_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                    "scraped_index": business_index + 1
+                                }
                             
-                            if business_name:  # Only add if we got the name
-                                businesses.append(business_details)
-                                successful_extractions += 1
-                                business_time = time.time() - business_start
-                                logger.info(f"✅ Successfully scraped '{business_name}' in {business_time:.2f}s")
+                                if business_name:  # Only add if we got the name
+                                    businesses.append(business_details)
+                                    place_cache.set(business_details["place_id"], cacheable_place(business_details))
+                                    successful_extractions += 1
+                                    business_time = time.time() - business_start
+                                    logger.info(f"✅ Successfully scraped '{business_name}' in {business_time:.2f}s")
                                 
-                                # Update status with current business name
-                                if task_id:
-                                    update_task_status(task_id,
-                                                     current_business_name=business_name,
-                                                     success_count=successful_extractions,
-                                                     businesses_processed=business_index+1)
+                                    # Update status with current business name
+                                    if task_id:
+                                        update_task_status(task_id,
+                                                         current_business_name=business_name,
+                                                         success_count=successful_extractions,
+                                                         businesses_processed=business_index+1)
                                 
-                                # Log progress every 10 businesses
-                                if successful_extractions % 10 == 0:
-                                    elapsed = time.time() - processing_start
-                                    avg_time = elapsed / (business_index + 1)
-                                    remaining = max_results - (business_index + 1)
-                                    eta = remaining * avg_time
-                                    logger.info(f"📊 Progress: {successful_extractions} businesses scraped, ETA: {eta:.1f}s")
-                            else:
-                                failed_extractions += 1
-                                logger.warning(f"⚠️  Skipping business #{business_index+1} - no name found")
+                                    # Log progress every 10 businesses
+                                    if successful_extractions % 10 == 0:
+                                        elapsed = time.time() - processing_start
+                                        avg_time = elapsed / (business_index + 1)
+                                        remaining = max_results - (business_index + 1)
+                                        eta = remaining * avg_time
+                                        logger.info(f"📊 Progress: {successful_extractions} businesses scraped, ETA: {eta:.1f}s")
+                                else:
+                                    failed_extractions += 1
+                                    logger.warning(f"⚠️  Skipping business #{business_index+1} - no name found")
                                 
-                                # Update failure count in status
-                                if task_id:
-                                    update_task_status(task_id,
-                                                     failure_count=failed_extractions,
-                                                     businesses_processed=business_index+1)
+                                    # Update failure count in status
+                                    if task_id:
+                                        update_task_status(task_id,
+                                                         failure_count=failed_extractions,
+                                                         businesses_processed=business_index+1)
                             
-                            # Successfully processed, break retry loop
-                            logger.debug("🔙 Navigating back to search results for next business")
-                            try:
-                                # Go back to search results page to find next business
-                                driver.back()
-                                logger.debug("✅ Navigated back to search results")
-                                
-                                # Wait for search results to load
-                                time.sleep(2)
+                                # Successfully processed, break retry loop
+                                logger.debug("🔙 Navigating back to search results for next business")
+                                try:
+                                    # Go back to search results page to find next business
+                                    driver.back()
+                                    logger.debug("✅ Navigated back to search results")
                                 
-                                # Verify we're back on search results (not on a business page)
-                                current_url = driver.current_url
-                                if "/place/" in current_url:
-                                    logger.warning("⚠️  Still on business page after back button, trying alternative navigation")
-                                    # Alternative: reload the search URL
-                                    search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
-                                    driver.get(search_url)
-                                    time.sleep(3)
-                                    logger.debug(f"✅ Reloaded search results: {search_url}")
+                                    # Wait for the results feed to come back
+                                    self._wait_for(driver, "back_to_results", _back_on_results)
+
+                                    # Verify we're back on search results (not on a business page)
+                                    current_url = driver.current_url
+                                    if "/place/" in current_url:
+                                        logger.warning("⚠️  Still on business page after back button, trying alternative navigation")
+                                        # Alternative: reload the search URL
+                                        search_url = start_url or f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
+                                        driver.get(search_url)
+                                        self._wait_for(driver, "search_results", _search_results_shown)
+                                        logger.debug(f"✅ Reloaded search results: {search_url}")
                                 
-                                logger.debug(f"🌐 Current URL after navigation: {driver.current_url}")
+                                    logger.debug(f"🌐 Current URL after navigation: {driver.current_url}")
                                 
-                            except Exception as nav_error:
-                                logger.error(f"❌ Navigation back to search results failed: {type(nav_error).__name__}: {str(nav_error)}")
-                                logger.error(f"📍 Navigation error traceback: {traceback.format_exc()}")
-                                # Try to recover by reloading search results
-                                try:
-                                    search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
-                                    driver.get(search_url)
-                                    time.sleep(3)
-                                    logger.info(f"✅ Recovery: Reloaded search results: {search_url}")
-                                except Exception as recovery_error:
-                                    logger.error(f"❌ Recovery navigation also failed: {str(recovery_error)}")
-                                    # This might be a fatal error for continuing
-                                    raise recovery_error
+                                except Exception as nav_error:
+                                    logger.error(f"❌ Navigation back to search results failed: {type(nav_error).__name__}: {str(nav_error)}")
+                                    logger.error(f"📍 Navigation error traceback: {traceback.format_exc()}")
+                                    # Try to recover by reloading search results
+                                    try:
+                                        search_url = start_url or f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
+                                        driver.get(search_url)
+                                        self._wait_for(driver, "search_results", _search_results_shown)
+                                        logger.info(f"✅ Recovery: Reloaded search results: {search_url}")
+                                    except Exception as recovery_error:
+                                        logger.error(f"❌ Recovery navigation also failed: {str(recovery_error)}")
+                                        # This might be a fatal error for continuing
+                                        raise recovery_error
                             
-                            break
+                                break
                             
-                        except Exception as e:
-                            retry_count += 1
-                            logger.warning(f"❌ Error processing business #{business_index+1} (attempt {retry_count}): {str(e)}")
+                            except Exception as e:
+                                retry_count += 1
+                                logger.warning(f"❌ Error processing business #{business_index+1} (attempt {retry_count}): {str(e)}")
                             
-                            if retry_count >= max_retries:
-                                failed_extractions += 1
-                                logger.warning(f"❌ Failed to process business #{business_index+1} after {max_retries} attempts")
+                                if retry_count >= max_retries:
+                                    failed_extractions += 1
+                                    logger.warning(f"❌ Failed to process business #{business_index+1} after {max_retries} attempts")
                                 
-                                # Update failure count in status
-                                if task_id:
-                                    update_task_status(task_id,
-                                                     failure_count=failed_extractions,
-                                                     businesses_processed=business_index+1,
-                                                     current_operation=f"Failed to process business #{business_index+1}")
-                                break
-                            else:
-                                logger.info(f"🔄 Retrying business #{business_index+1} in 2 seconds...")
-                                time.sleep(2)  # Wait before retry
+                                    # Update failure count in status
+                                    if task_id:
+                                        update_task_status(task_id,
+                                                         failure_count=failed_extractions,
+                                                         businesses_processed=business_index+1,
+                                                         current_operation=f"Failed to process business #{business_index+1}")
+                                    break
+                                else:
+                                    logger.info(f"🔄 Retrying business #{business_index+1} in 2 seconds...")
+                                    time.sleep(2)  # Wait before retry
                     
-                    # Move to next business
-                    business_index += 1
+                        # Move to next business
+                        business_index += 1
                 
-                # Processing complete
-                total_processing_time = time.time() - processing_start
-                logger.info("=" * 60)
-                logger.info("🎯 SCRAPING SUMMARY")
-                logger.info(f"✅ Successfully extracted: {successful_extractions} businesses")
-                logger.info(f"❌ Failed extractions: {failed_extractions}")
-                logger.info(f"📊 Success rate: {(successful_extractions/(successful_extractions + failed_extractions)*100):.1f}%")
-                logger.info(f"⏱️  Processing time: {total_processing_time:.2f}s")
-                logger.info(f"⚡ Average time per business: {total_processing_time/(successful_extractions + failed_extractions):.2f}s")
+                    # Processing complete
+                    total_processing_time = time.time() - processing_start
+                    logger.info("=" * 60)
+                    logger.info("🎯 SCRAPING SUMMARY")
+                    logger.info(f"✅ Successfully extracted: {successful_extractions} businesses")
+                    logger.info(f"❌ Failed extractions: {failed_extractions}")
+                    logger.info(f"📊 Success rate: {(successful_extractions/(successful_extractions + failed_extractions)*100):.1f}%")
+                    logger.info(f"⏱️  Processing time: {total_processing_time:.2f}s")
+                    logger.info(f"⚡ Average time per business: {total_processing_time/(successful_extractions + failed_extractions):.2f}s")
                 
         except Exception as e:
             total_scrape_time = time.time() - scrape_start_time
@@ -837,6 +996,200 @@ class GoogleMapsScraper:
         
         return businesses
     
+    def search_businesses_tiled(self, query: str, grid: int, max_results: Optional[int] = None,
+                                task_id: Optional[str] = None, extraction_mode: str = "rpc",
+                                tile_zoom: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Split the query's map area into a grid of viewports and search the tiles in parallel"""
+        max_results = max_results or CONFIG['max_results']
+        self.wait_timings = WaitTimings()
+        logger.info("=" * 60)
+        logger.info(f"🗺️  Starting geo-tiled search for '{query}' ({grid}x{grid} tiles)")
+        
+        # Step 1: Let Maps pick the area for the query, then read it back from the URL
+        if task_id:
+            update_task_status(task_id,
+                             current_stage="tiling",
+                             current_operation="Locating search area",
+                             progress=f"Finding the map area for '{query}'")
+        with ChromeDriverManager() as driver:
+            driver.get(f"https://www.google.com/maps/search/{quote_plus(query)}")
+            self._wait_for(driver, "viewport", lambda d: parse_viewport(d.current_url))
+            viewport = parse_viewport(driver.current_url)
+            window = driver.get_window_size()
+        
+        if viewport is None:
+            raise Exception(f"Unable to determine the map area for '{query}'. Try a query that names a city or region.")
+        
+        lat, lng, zoom = viewport
+        tiles = build_tile_grid(lat, lng, zoom, grid, window["width"], window["height"], tile_zoom)
+        logger.info(f"📐 Area @{lat},{lng},{zoom}z split into {len(tiles)} tiles at zoom {tiles[0]['zoom']}")
+        
+        tile_progress = [{**tile, "status": "pending", "businesses": 0, "new_businesses": 0} for tile in tiles]
+        businesses: List[Dict[str, Any]] = []
+        seen_places = set()
+        lock = threading.Lock()
+        
+        def publish():
+            # Called with ``lock`` held
+            if not task_id:
+                return
+            done = sum(1 for tile in tile_progress if tile["status"] in ("completed", "failed"))
+            update_task_status(task_id,
+                             current_stage="processing",
+                             current_operation=f"Searched {done}/{len(tiles)} tiles",
+                             businesses_processed=len(businesses),
+                             success_count=len(businesses),
+                             total_businesses_found=len(businesses),
+                             tiles=[dict(tile) for tile in tile_progress],
+                             wait_timings=self.wait_timings.as_dict(),
+                             **self.cache_status(),
+                             progress=f"{len(businesses)} unique businesses from {done}/{len(tiles)} tiles")
+        
+        def run_tile(tile: Dict[str, Any]):
+            progress = tile_progress[tile["tile"] - 1]
+            with lock:
+                progress["status"] = "running"
+                publish()
+            
+            tile_scraper = GoogleMapsScraper()
+            try:
+                found = tile_scraper.search_businesses(query, max_results, None, extraction_mode,
+                                                       start_url=build_tile_url(query, tile))
+                status = "completed"
+            except Exception as e:
+                logger.warning(f"⚠️  Tile {tile['tile']} failed: {str(e)}")
+                found, status = [], "failed"
+            
+            with lock:
+                new_businesses = 0
+                for business in found:
+                    place_key = business.get("place_id") or (business.get("business_name"), business.get("address"))
+                    if place_key in seen_places:
+                        continue
+                    seen_places.add(place_key)
+                    businesses.append(business)
+                    new_businesses += 1
+                progress.update(status=status, businesses=len(found), new_businesses=new_businesses)
+                self.wait_timings.merge(tile_scraper.wait_timings)
+                self.cache_lookups += tile_scraper.cache_lookups
+                self.cache_hits += tile_scraper.cache_hits
+                logger.info(f"🧩 Tile {tile['tile']}/{len(tiles)} {status}: {len(found)} found, {new_businesses} new ({len(businesses)} total)")
+                publish()
+        
+        # Step 2: Search the tiles in parallel, each on its own pooled browser
+        workers = max(1, min(len(tiles), CONFIG['tile_concurrency'], browser_pool.size))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gmaps-tile") as executor:
+            list(executor.map(run_tile, tiles))
+        
+        businesses = businesses[:max_results]
+        for index, business in enumerate(businesses, 1):
+            business["scraped_index"] = index
+        
+        failed_tiles = sum(1 for tile in tile_progress if tile["status"] == "failed")
+        logger.info(f"🎉 Geo-tiled search finished: {len(businesses)} unique businesses, {failed_tiles} failed tiles")
+        if failed_tiles == len(tiles):
+            raise Exception(f"Unable to complete scraping for '{query}'. Please try again or contact support if the issue persists.")
+        return businesses
+    
+    def _read_rpc_payloads(self, driver, pending: set) -> List[Any]:
+        """Decode search XHR bodies that finished loading since the last call"""
+        payloads = []
+        for entry in driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except Exception:
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            
+            if method == "Network.responseReceived":
+                url = params.get("response", {}).get("url", "")
+                if "/search?" in url and "tbm=map" in url:
+                    pending.add(params.get("requestId"))
+            elif method == "Network.loadingFinished" and params.get("requestId") in pending:
+                request_id = params["requestId"]
+                pending.discard(request_id)
+                try:
+                    response = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                    body = response.get("body", "")
+                    if response.get("base64Encoded"):
+                        body = base64.b64decode(body).decode("utf-8")
+                    payloads.append(decode_search_rpc_body(body))
+                except Exception as e:
+                    logger.debug(f"⚠️  Could not decode search RPC response {request_id}: {type(e).__name__}: {str(e)}")
+        return payloads
+    
+    def _collect_from_rpc(self, driver, max_results: int, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Collect businesses from the search RPC responses, scrolling the feed for more pages"""
+        businesses = []
+        seen_places = set()
+        pending = set()
+        idle_scrolls = 0
+        scroll_count = 0
+        
+        if task_id:
+            update_task_status(task_id,
+                             current_stage="processing",
+                             current_operation="Reading search results payload",
+                             businesses_processed=0,
+                             success_count=0,
+                             failure_count=0,
+                             progress="Decoding businesses from search responses")
+        
+        while len(businesses) < max_results:
+            # Wait for the next search response (the first one normally arrived during search)
+            new_places = 0
+            page_wait_start = time.time()
+            deadline = page_wait_start + CONFIG['rpc_wait_timeout']
+            while time.time() < deadline and not new_places:
+                for payload in self._read_rpc_payloads(driver, pending):
+                    for place in parse_rpc_places(payload):
+                        place_key = place["place_id"] or place["business_name"]
+                        if not place["business_name"] or place_key in seen_places or len(businesses) >= max_results:
+                            continue
+                        seen_places.add(place_key)
+                        place["scraped_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        place["scraped_index"] = len(businesses) + 1
+                        businesses.append(place)
+                        new_places += 1
+                if not new_places:
+                    time.sleep(CONFIG['rpc_poll_interval'])
+            self.wait_timings.record("rpc_page", time.time() - page_wait_start, timed_out=not new_places)
+            if new_places:
+                place_cache.set_many({place["place_id"]: cacheable_place(place) for place in businesses[-new_places:]})
+
+            logger.info(f"⚡ RPC page {scroll_count + 1}: {new_places} new businesses ({len(businesses)} total)")
+            if task_id:
+                update_task_status(task_id,
+                                 current_operation=f"Decoded search results page {scroll_count + 1}",
+                                 businesses_processed=len(businesses),
+                                 success_count=len(businesses),
+                                 total_businesses_found=len(businesses),
+                                 current_business_name=businesses[-1]["business_name"] if businesses else None,
+                                 wait_timings=self.wait_timings.as_dict(),
+                                 progress=f"Collected {len(businesses)} businesses from search responses")
+            
+            if len(businesses) >= max_results:
+                break
+            
+            idle_scrolls = 0 if new_places else idle_scrolls + 1
+            if idle_scrolls >= CONFIG['rpc_max_idle_scrolls']:
+                logger.info(f"🛑 No new businesses after {idle_scrolls} scrolls - stopping")
+                break
+            
+            if driver.find_elements(By.CSS_SELECTOR, SELECTORS['end_of_results']):
+                logger.info("🎯 Reached end of results")
+                break
+            
+            # Scroll the results feed to make Maps request the next page
+            scroll_count += 1
+            driver.execute_script(
+                "const feed = document.querySelector(\"div[role='feed']\");"
+                "if (feed) { feed.scrollTop = feed.scrollHeight; } else { window.scrollTo(0, document.body.scrollHeight); }"
+            )
+        
+        return businesses
+    
 
 
 # Background task function
@@ -848,21 +1201,31 @@ def scrape_businesses_task(task_id: str, request: ScrapeRequest):
     try:
         # Update task status
         logger.info(f"📊 Updating task {task_id} status to 'running'")
-        tasks[task_id].status = "running"
-        tasks[task_id].started_at = datetime.now().isoformat()
+        update_task_status(task_id, status="running", started_at=datetime.now().isoformat())
         
         start_time = time.time()
         
-        # Initialize scraper and perform scraping (always headless)
-        logger.info(f"🔧 Initializing GoogleMapsScraper for task {task_id} (headless mode)")
-        scraper = GoogleMapsScraper(headless=True)
+        # Initialize scraper and perform scraping (headless unless BROWSER_POOL_HEADLESS=false)
+        logger.info(f"🔧 Initializing GoogleMapsScraper for task {task_id}")
+        scraper = GoogleMapsScraper()
         
         logger.info(f"🎯 Starting scraping process for task {task_id}")
-        businesses = scraper.search_businesses(
-            query=request.query,
-            max_results=request.max_results,
-            task_id=task_id
-        )
+        if request.tiles:
+            businesses = scraper.search_businesses_tiled(
+                query=request.query,
+                grid=request.tiles,
+                max_results=request.max_results,
+                task_id=task_id,
+                extraction_mode=request.extraction_mode,
+                tile_zoom=request.tile_zoom
+            )
+        else:
+            businesses = scraper.search_businesses(
+                query=request.query,
+                max_results=request.max_results,
+                task_id=task_id,
+                extraction_mode=request.extraction_mode
+            )
         
         execution_time = time.time() - start_time
         logger.info(f"✅ Task {task_id} scraping completed in {execution_time:.2f}s")
@@ -892,8 +1255,10 @@ def scrape_businesses_task(task_id: str, request: ScrapeRequest):
                              businesses_processed=0,
                              total_businesses_found=0,
                              current_business_name=None,
-                             estimated_remaining_seconds=0)
-            tasks[task_id].result = response
+                             estimated_remaining_seconds=0,
+                             wait_timings=scraper.wait_timings.as_dict(),
+                             **scraper.cache_status(),
+                             result=response)
             return
         
         # Generate download URLs for async task (only if businesses found)
@@ -902,6 +1267,9 @@ def scrape_businesses_task(task_id: str, request: ScrapeRequest):
             "csv": f"/gmaps/download/{task_id}?format=csv"
         }
         
+        # Store businesses as result chunks; the response only carries the summary
+        tasks.append_results(task_id, [BusinessData(**business) for business in businesses])
+        
         # Create response
         response = ScrapeResponse(
             success=True,
@@ -909,7 +1277,7 @@ def scrape_businesses_task(task_id: str, request: ScrapeRequest):
             scraped_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             total_results=len(businesses),
             execution_time_seconds=round(execution_time, 2),
-            businesses=[BusinessData(**business) for business in businesses],
+            businesses=[],
             message=f"Successfully scraped {len(businesses)} businesses",
             download_urls=download_urls
         )
@@ -925,8 +1293,10 @@ def scrape_businesses_task(task_id: str, request: ScrapeRequest):
                          progress=f"Successfully scraped {len(businesses)} businesses",
                          businesses_processed=len(businesses),
                          current_business_name=None,
-                         estimated_remaining_seconds=0)
-        tasks[task_id].result = response
+                         estimated_remaining_seconds=0,
+                         wait_timings=scraper.wait_timings.as_dict(),
+                         **scraper.cache_status(),
+                         result=response)
         
     except Exception as e:
         execution_time = time.time() - start_time
@@ -964,17 +1334,17 @@ def scrape_businesses_task(task_id: str, request: ScrapeRequest):
                          current_operation="Scraping failed",
                          progress=user_message,
                          current_business_name=None,
-                         estimated_remaining_seconds=0)
-        
-        tasks[task_id].result = ScrapeResponse(
-            success=False,
-            query=request.query,
-            scraped_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            total_results=0,
-            execution_time_seconds=round(execution_time, 2),
-            businesses=[],
-            message=user_message
-        )
+                         estimated_remaining_seconds=0,
+                         wait_timings=scraper.wait_timings.as_dict() if 'scraper' in locals() else None,
+                         result=ScrapeResponse(
+                             success=False,
+                             query=request.query,
+                             scraped_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                             total_results=0,
+                             execution_time_seconds=round(execution_time, 2),
+                             businesses=[],
+                             message=user_message
+                         ))
 
 # API Endpoints
 @router.get("/about", summary="API Information")
@@ -1067,9 +1437,11 @@ async def health_check():
 
 @router.get("/search", summary="Scrape Businesses (Async)")
 async def scrape_businesses_async(
-    background_tasks: BackgroundTasks, 
     query: str = Query(..., description="Search query (e.g., 'hair salons in London')"),
-    max_results: int = Query(default=100, description="Maximum number of results to scrape", ge=1, le=10000)
+    max_results: int = Query(default=100, description="Maximum number of results to scrape", ge=1, le=10000),
+    extraction_mode: Literal["rpc", "dom"] = Query(default="rpc", description="'rpc' decodes Maps search responses (fast); 'dom' opens every business card"),
+    tiles: Optional[int] = Query(default=None, description="Split the area into a tiles x tiles grid searched in parallel (2-8)", ge=2, le=8),
+    tile_zoom: Optional[float] = Query(default=None, description="Map zoom for each tile (default: derived from the grid size)", ge=3, le=21)
 ):
     """
     Asynchronously scrape businesses from Google Maps
@@ -1078,6 +1450,8 @@ async def scrape_businesses_async(
     
      - **query**: Search query (e.g., "hair salons in London")
      - **max_results**: Maximum number of results (1-10000)
+     - **extraction_mode**: "rpc" (default) or "dom"
+     - **tiles**: Geo-tile the search to get past the ~120 results Maps returns per query
 
     """
     logger.info("🌐 API ENDPOINT: /search (asynchronous GET)")
@@ -1087,10 +1461,24 @@ async def scrape_businesses_async(
         import uuid
         
         # Create ScrapeRequest object from query parameters
-        request = ScrapeRequest(query=query, max_results=max_results)
+        request = ScrapeRequest(query=query, max_results=max_results, extraction_mode=extraction_mode,
+                                tiles=tiles, tile_zoom=tile_zoom)
         
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())
+        # Identical searches already queued or running share that task instead of scraping again
+        flight_key = single_flight.make_key("gmaps", query=request.query, max_results=request.max_results,
+                                            extraction_mode=request.extraction_mode, tiles=request.tiles,
+                                            tile_zoom=request.tile_zoom)
+        task_id, coalesced = single_flight.claim_task(flight_key, str(uuid.uuid4()))
+        if coalesced:
+            return {
+                "task_id": task_id,
+                "status": tasks.get_field(task_id, "status", "pending"),
+                "message": "Attached to an identical scraping task already in progress",
+                "query": request.query,
+                "queue_position": scheduler.get_queue_position(task_id),
+                "status_url": f"/gmaps/result/{task_id}",
+                "coalesced": True
+            }
         logger.info(f"🆔 Generated task ID: {task_id}")
         
         # Create task status
@@ -1111,9 +1499,14 @@ async def scrape_businesses_async(
             last_updated=datetime.now().isoformat()
         )
         
-        # Add background task
+        # Hand the task to the bounded gmaps queue (429 when full)
         logger.info(f"⏰ Adding background task {task_id} to queue")
-        background_tasks.add_task(scrape_businesses_task, task_id, request)
+        try:
+            queue_info = scheduler.submit("gmaps", task_id, scrape_businesses_task, task_id, request)
+        except HTTPException:
+            tasks.delete(task_id)
+            single_flight.release_task(flight_key, task_id)
+            raise
         
         logger.info(f"✅ Async task {task_id} queued successfully for query: '{request.query}'")
         
@@ -1122,12 +1515,15 @@ async def scrape_businesses_async(
             "status": "pending",
             "message": "Scraping task queued successfully",
             "query": request.query,
+            "queue_position": queue_info["queue_position"],
             "status_url": f"/gmaps/result/{task_id}"
         }
         
         logger.info(f"📤 Async response ready: task_id={task_id}")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         # Log full error details to terminal
         logger.error("=" * 80)
@@ -1184,11 +1580,12 @@ async def get_task_result(
                 "started_at": task_status.started_at,
                 "completed_at": task_status.completed_at,
                 "last_updated": task_status.last_updated,
+                "queue_position": scheduler.get_queue_position(task_id),
             }
         
         # Task is completed - return paginated data
         result = task_status.result
-        total_results = result.total_results or len(result.businesses)
+        total_results = result.total_results or tasks.count_results(task_id)
         total_pages = (total_results + page_size - 1) // page_size if total_results else 1
         
         if page > total_pages and total_results != 0:
@@ -1200,7 +1597,7 @@ async def get_task_result(
         
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        businesses_slice = result.businesses[start_idx:end_idx]
+        businesses_slice = [BusinessData(**business) for business in tasks.get_results(task_id, start_idx, end_idx)]
         
         logger.info(f"📦 Returning page {page}/{total_pages} for task {task_id}")
         
@@ -1266,13 +1663,14 @@ async def download_results(
             )
         
         result = task.result
+        businesses = [BusinessData(**business) for business in tasks.get_results(task_id)]
         
         # Generate filename
         filename = get_download_filename(result.query, format, result.scraped_time)
         
         if format == "json":
             # Convert to JSON
-            businesses_data = [business.dict() for business in result.businesses]
+            businesses_data = [business.dict() for business in businesses]
             
             download_data = {
                 "query": result.query,
@@ -1290,7 +1688,7 @@ async def download_results(
             # Create JSON content
             json_content = json.dumps(download_data, indent=2, ensure_ascii=False)
             
-            logger.info(f"📦 JSON download ready for task {task_id}: {len(result.businesses)} businesses")
+            logger.info(f"📦 JSON download ready for task {task_id}: {len(businesses)} businesses")
             logger.info(f"📁 Filename: {filename}")
             
             # Return file response
@@ -1304,9 +1702,9 @@ async def download_results(
             )
         
         # CSV download
-        csv_content = convert_businesses_to_csv(result.businesses)
+        csv_content = convert_businesses_to_csv(businesses)
         
-        logger.info(f"📤 CSV download ready: {len(result.businesses)} businesses, filename: {filename}")
+        logger.info(f"📤 CSV download ready: {len(businesses)} businesses, filename: {filename}")
         
         return Response(
             content=csv_content,
@@ -1344,23 +1742,22 @@ async def clear_tasks():
     logger.info("🌐 API ENDPOINT: /tasks (DELETE)")
     logger.info("📥 Task cleanup request received")
     
-    global tasks
-    
-    before_count = len(tasks)
+    all_tasks = tasks.items()
+    before_count = len(all_tasks)
     logger.info(f"📊 Tasks before cleanup: {before_count}")
     
     # Count tasks by status before cleanup
     status_counts = {}
-    for task in tasks.values():
+    for _, task in all_tasks:
         status_counts[task.status] = status_counts.get(task.status, 0) + 1
     logger.info(f"📊 Task breakdown: {status_counts}")
     
-    tasks = {
-        task_id: task for task_id, task in tasks.items()
-        if task.status in ["pending", "running"]
-    }
-    after_count = len(tasks)
-    cleared_count = before_count - after_count
+    cleared_count = 0
+    for task_id, task in all_tasks:
+        if task.status not in ["pending", "running"]:
+            tasks.delete(task_id)
+            cleared_count += 1
+    after_count = before_count - cleared_count
     
     logger.info(f"🧹 Cleared {cleared_count} completed/failed tasks")
     logger.info(f"📊 Remaining active tasks: {after_count}")
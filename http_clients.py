@@ -0,0 +1,368 @@
+"""
+HTTP Clients
+
+Shared, pooled HTTP clients for the scraper routers.
+
+Opening a new connection for every upstream call pays DNS and a TLS handshake
+each time. Routers ask ``http_clients`` for a long-lived client instead, so
+connections to each host are kept alive and reused across requests.
+
+- ``async_client(profile)`` - httpx.AsyncClient for async handlers (one per event loop)
+- ``async_curl(profile)``   - curl_cffi AsyncSession for browser-impersonated async calls
+- ``session()``             - requests.Session for sync code in scheduler threads
+- ``curl(profile)``         - pool of curl_cffi Sessions for impersonated sync calls
+
+Profiles name a browser fingerprint for the curl clients (``impersonate``) plus
+defaults such as the timeout. httpx speaks HTTP/2 when the optional ``h2``
+package is installed; impersonated curl sessions negotiate it like the browser
+they mimic and keep their own DNS cache per handle.
+
+The shared clients never keep cookies set by upstreams, so one caller's session
+cookies can't leak into another caller's request. httpx and requests refuse them
+with a cookie policy; curl_cffi copies every cookie the handle saw (per-request
+ones included) into its session jar, so the curl clients empty that jar after
+each request. Cookies passed per request are still sent.
+
+Configuration (environment, or ``http_clients.configure(...)`` at start-up):
+    HTTP_POOL_MAX_CONNECTIONS  Max open connections per async client (default 100)
+    HTTP_POOL_MAX_KEEPALIVE    Idle keep-alive connections per async client (default 50)
+    HTTP_POOL_MAX_PER_HOST     Pooled connections per host for sync clients (default 50)
+    HTTP_POOL_KEEPALIVE        Seconds an idle connection is kept open (default 60)
+    HTTP_TIMEOUT               Default request timeout in seconds (default 30)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from curl_cffi import requests as curl_requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'max_connections': int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", 100)),
+    'max_keepalive': int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", 50)),
+    'max_per_host': int(os.getenv("HTTP_POOL_MAX_PER_HOST", 50)),
+    'keepalive_expiry': float(os.getenv("HTTP_POOL_KEEPALIVE", 60)),
+    'timeout': float(os.getenv("HTTP_TIMEOUT", 30)),
+}
+
+# ``impersonate`` is a curl_cffi browser target; None means a plain (non-impersonated) client
+PROFILES: Dict[str, Dict[str, Any]] = {
+    'default': {'impersonate': None},
+    'chrome': {'impersonate': 'chrome'},
+}
+
+
+def with_cookies(headers: Optional[Dict[str, str]], cookies: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Headers with ``cookies`` folded into a Cookie header (per-request cookies on a shared client)"""
+    merged = dict(headers or {})
+    if cookies:
+        merged['cookie'] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+    return merged
+
+
+class NoStoreCookiePolicy(DefaultCookiePolicy):
+    """Send cookies, but never keep the ones upstream responses set"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def _forget_cookies(session):
+    """Empty a curl_cffi session's cookie jar (it keeps everything a response set)"""
+    try:
+        session.cookies.clear()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not clear curl session cookies: {str(e)}")
+
+
+class CurlSessionPool:
+    """Thread-safe pool of curl_cffi Sessions sharing one impersonation profile"""
+
+    def __init__(self, profile: str, impersonate: Optional[str], timeout: float, max_idle: int, on_request):
+        self.profile = profile
+        self.impersonate = impersonate
+        self.timeout = timeout
+        self.max_idle = max(1, max_idle)
+        self._on_request = on_request
+        self._idle: List[curl_requests.Session] = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+
+    def request(self, method: str, url: str, **kwargs):
+        session = self._checkout()
+        try:
+            self._on_request(url)
+            return session.request(method, url, **kwargs)
+        finally:
+            self._checkin(session)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def _checkout(self) -> curl_requests.Session:
+        with self._lock:
+            self.in_use += 1
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return curl_requests.Session(impersonate=self.impersonate, timeout=self.timeout)
+
+    def _checkin(self, session: curl_requests.Session):
+        _forget_cookies(session)
+        with self._lock:
+            self.in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(session)
+                return
+        session.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "impersonate": self.impersonate,
+                "sessions_created": self.created,
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+            }
+
+
+class AsyncCurlClient:
+    """curl_cffi AsyncSession that counts requests per host"""
+
+    def __init__(self, profile: str, impersonate: Optional[str], timeout: float, max_clients: int, on_request):
+        self.profile = profile
+        self.impersonate = impersonate
+        self.max_clients = max_clients
+        self.session = curl_requests.AsyncSession(impersonate=impersonate, timeout=timeout, max_clients=max_clients)
+        self._on_request = on_request
+
+    async def request(self, method: str, url: str, **kwargs):
+        self._on_request(url)
+        try:
+            return await self.session.request(method, url, **kwargs)
+        finally:
+            # No await between the response and this, so a concurrent request never sees its cookies
+            _forget_cookies(self.session)
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self.request("PUT", url, **kwargs)
+
+    async def close(self):
+        await self.session.close()
+
+
+class HTTPClientFactory:
+    """Hands out shared clients; async ones are kept per event loop"""
+
+    def __init__(self):
+        self.profiles: Dict[str, Dict[str, Any]] = {name: dict(profile) for name, profile in PROFILES.items()}
+        self._lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+        self._async_curl: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncCurlClient]]" = weakref.WeakKeyDictionary()
+        self._session: Optional[requests.Session] = None
+        self._curl_pools: Dict[str, CurlSessionPool] = {}
+        self._requests_by_host: Dict[str, int] = {}
+
+    def configure(self, profiles: Optional[Dict[str, Dict[str, Any]]] = None, **overrides):
+        """Apply settings once at start-up; clients created afterwards pick them up"""
+        unknown = set(overrides) - set(CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown HTTP client settings: {sorted(unknown)}")
+        CONFIG.update(overrides)
+        if profiles:
+            self.profiles.update({name: dict(profile) for name, profile in profiles.items()})
+        logger.info(f"🌐 HTTP clients configured: profiles={sorted(self.profiles)}, http2={HTTP2_AVAILABLE}, "
+                    f"max_connections={CONFIG['max_connections']}, max_per_host={CONFIG['max_per_host']}")
+
+    def _profile(self, name: str) -> Dict[str, Any]:
+        if name not in self.profiles:
+            raise ValueError(f"Unknown HTTP client profile: {name}")
+        return self.profiles[name]
+
+    def _record(self, url: Any):
+        host = urlparse(str(url)).netloc
+        with self._lock:
+            self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+
+    async def _on_httpx_request(self, request: httpx.Request):
+        self._record(request.url)
+
+    def async_client(self, profile: str = "default") -> httpx.AsyncClient:
+        """Shared httpx.AsyncClient for the running event loop"""
+        settings = self._profile(profile)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(profile)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=CONFIG['max_connections'],
+                        max_keepalive_connections=CONFIG['max_keepalive'],
+                        keepalive_expiry=CONFIG['keepalive_expiry'],
+                    ),
+                    timeout=settings.get('timeout', CONFIG['timeout']),
+                    follow_redirects=True,
+                    event_hooks={'request': [self._on_httpx_request]},
+                )
+                client.cookies.jar.set_policy(NoStoreCookiePolicy())
+                clients[profile] = client
+            return client
+
+    def async_curl(self, profile: str = "chrome") -> AsyncCurlClient:
+        """Shared curl_cffi AsyncSession for the running event loop"""
+        settings = self._profile(profile)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_curl.setdefault(loop, {})
+            if profile not in clients:
+                clients[profile] = AsyncCurlClient(
+                    profile,
+                    settings.get('impersonate'),
+                    settings.get('timeout', CONFIG['timeout']),
+                    CONFIG['max_connections'],
+                    self._record,
+                )
+            return clients[profile]
+
+    def session(self) -> requests.Session:
+        """Shared requests.Session with a keep-alive pool per host"""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=CONFIG['max_connections'], pool_maxsize=CONFIG['max_per_host'])
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.cookies.set_policy(NoStoreCookiePolicy())
+                session.hooks['response'].append(lambda response, *args, **kwargs: self._record(response.request.url))
+                self._session = session
+            return self._session
+
+    def curl(self, profile: str = "chrome") -> CurlSessionPool:
+        """Shared pool of curl_cffi Sessions for sync code"""
+        settings = self._profile(profile)
+        with self._lock:
+            if profile not in self._curl_pools:
+                self._curl_pools[profile] = CurlSessionPool(
+                    profile,
+                    settings.get('impersonate'),
+                    settings.get('timeout', CONFIG['timeout']),
+                    CONFIG['max_per_host'],
+                    self._record,
+                )
+            return self._curl_pools[profile]
+
+    async def aclose(self):
+        """Close the async clients that belong to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = list(self._async_clients.pop(loop, {}).values())
+            curl_clients = list(self._async_curl.pop(loop, {}).values())
+        for client in clients:
+            await client.aclose()
+        for curl_client in curl_clients:
+            await curl_client.close()
+
+    def close(self):
+        """Close the sync clients"""
+        with self._lock:
+            session, self._session = self._session, None
+            pools, self._curl_pools = list(self._curl_pools.values()), {}
+        if session is not None:
+            session.close()
+        for pool in pools:
+            pool.close()
+
+    @staticmethod
+    def _httpx_pool_stats(client: httpx.AsyncClient) -> Dict[str, Any]:
+        hosts: Dict[str, Dict[str, int]] = {}
+        try:
+            # httpcore does not expose pool stats publicly; read them best-effort
+            for connection in client._transport._pool.connections:
+                host = connection._origin.host.decode()
+                entry = hosts.setdefault(host, {"open": 0, "idle": 0})
+                entry["open"] += 1
+                entry["idle"] += int(connection.is_idle())
+        except Exception:
+            pass
+        return hosts
+
+    def _session_pool_stats(self) -> Dict[str, Any]:
+        if self._session is None:
+            return {}
+        hosts: Dict[str, Dict[str, int]] = {}
+        try:
+            pools = self._session.get_adapter("https://").poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                hosts[pool.host] = {
+                    "connections_opened": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "idle": pool.pool.qsize() if pool.pool is not None else 0,
+                }
+        except Exception:
+            pass
+        return hosts
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            async_clients = [
+                {"profile": profile, "hosts": self._httpx_pool_stats(client)}
+                for clients in self._async_clients.values() for profile, client in clients.items()
+            ]
+            async_curl = [
+                {"profile": profile, "impersonate": client.impersonate, "max_clients": client.max_clients}
+                for clients in self._async_curl.values() for profile, client in clients.items()
+            ]
+            curl_pools = {profile: pool.get_stats() for profile, pool in self._curl_pools.items()}
+            requests_by_host = dict(self._requests_by_host)
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "config": dict(CONFIG),
+            "profiles": self.profiles,
+            "async_clients": async_clients,
+            "async_curl_sessions": async_curl,
+            "session_pools": self._session_pool_stats(),
+            "curl_pools": curl_pools,
+            "requests_by_host": requests_by_host,
+        }
+
+
+# Global factory (one per process)
+http_clients = HTTPClientFactory()
@@ -0,0 +1,339 @@
+"""
+Job Scheduler
+
+Bounded, per-source scheduler for background scraping jobs.
+
+Routers used to hand every job to ``BackgroundTasks.add_task``, so a burst of
+requests started an unbounded number of Chrome processes / upstream scrapes at
+once. ``JobScheduler`` keeps a FIFO queue per source with a fixed number of
+concurrent slots:
+
+- sync job functions run on a dedicated thread pool per source (sized to the
+  source's concurrency), not on Starlette's shared threadpool
+- async job functions run on the event loop, still bounded by the slot count
+- ``submit()`` rejects jobs with 429 + ``Retry-After`` once the queue is full
+- queue state is mirrored to the shared task store so queue positions are
+  visible from every worker process
+
+Limits are per API process. Override them with ``SCHEDULER_CONCURRENCY`` and
+``SCHEDULER_MAX_QUEUE`` (e.g. ``"gmaps=4,amazon=2,zillow=8"``).
+
+Sources listed in ``SCHEDULER_REMOTE_SOURCES`` (e.g. ``"gmaps,amazon"``) are not
+run in the API process at all: their jobs are pushed to a Redis list and picked
+up by ``browser_worker.py`` processes, which may run on dedicated nodes.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from task_store import DEFAULT_TASK_TTL, TaskCollection, create_redis_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Default limits per source
+SOURCE_LIMITS = {
+    "gmaps": {"concurrency": 4, "max_queue": 20},
+    "amazon": {"concurrency": 2, "max_queue": 10},
+    "zillow": {"concurrency": 8, "max_queue": 50},
+    "producthunt": {"concurrency": 4, "max_queue": 50},
+    "twitter": {"concurrency": 4, "max_queue": 50},
+    "chrome_webstore": {"concurrency": 1, "max_queue": 5},
+}
+DEFAULT_LIMITS = {"concurrency": 2, "max_queue": 20}
+
+# Used for Retry-After estimates until a source has finished a few jobs
+DEFAULT_JOB_SECONDS = 60
+MIN_RETRY_AFTER = 5
+MAX_RETRY_AFTER = 900
+
+# Redis keys for jobs handed to out-of-process workers
+REMOTE_QUEUE_PREFIX = "jobs:queue:"      # list of task_ids per source
+REMOTE_PAYLOAD_PREFIX = "jobs:payload:"  # JSON job payload per task_id
+REMOTE_PROCESSING_PREFIX = "jobs:processing:"  # list of task_ids a worker has taken, per worker id
+REMOTE_HEARTBEAT_PREFIX = "jobs:heartbeat:"    # expiring key per live worker id
+REMOTE_WORKERS_KEY = "jobs:workers"             # set of worker ids that may hold jobs
+REMOTE_ATTEMPTS_KEY = "jobs:attempts"           # hash of task_id -> times handed to a worker
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    """Parse ``"gmaps=4,amazon=2"`` into ``{"gmaps": 4, "amazon": 2}``"""
+    limits = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        source, limit = item.split("=", 1)
+        try:
+            limits[source.strip()] = max(1, int(limit))
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid scheduler limit: {item}")
+    return limits
+
+
+@dataclass
+class Job:
+    """A queued unit of background work"""
+    task_id: str
+    source: str
+    func: Callable
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    queued_at: float = field(default_factory=time.time)
+
+
+class SourceQueue:
+    """FIFO queue and concurrency slots for one source"""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.pending: Deque[Job] = deque()
+        self.running: Dict[str, Job] = {}
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"{name}-job")
+
+        # Stats
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.avg_job_seconds: Optional[float] = None
+        self.avg_wait_seconds: Optional[float] = None
+
+    def record_duration(self, job_seconds: float, wait_seconds: float):
+        """Exponential moving averages of run and queue-wait time"""
+        if self.avg_job_seconds is None:
+            self.avg_job_seconds = job_seconds
+            self.avg_wait_seconds = wait_seconds
+        else:
+            self.avg_job_seconds = 0.8 * self.avg_job_seconds + 0.2 * job_seconds
+            self.avg_wait_seconds = 0.8 * self.avg_wait_seconds + 0.2 * wait_seconds
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up"""
+        job_seconds = self.avg_job_seconds or DEFAULT_JOB_SECONDS
+        waves = math.ceil((len(self.pending) + 1) / self.concurrency)
+        return int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, job_seconds * waves)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "queue_depth": len(self.pending),
+            "running": len(self.running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_job_seconds": round(self.avg_job_seconds, 2) if self.avg_job_seconds is not None else None,
+            "avg_wait_seconds": round(self.avg_wait_seconds, 2) if self.avg_wait_seconds is not None else None,
+        }
+
+
+class JobScheduler:
+    """Per-source bounded job queues with admission control"""
+
+    def __init__(self):
+        concurrency_overrides = _parse_limits(os.getenv("SCHEDULER_CONCURRENCY", ""))
+        queue_overrides = _parse_limits(os.getenv("SCHEDULER_MAX_QUEUE", ""))
+
+        self.limits: Dict[str, Dict[str, int]] = {}
+        for source in set(SOURCE_LIMITS) | set(concurrency_overrides) | set(queue_overrides):
+            limits = dict(SOURCE_LIMITS.get(source, DEFAULT_LIMITS))
+            if source in concurrency_overrides:
+                limits["concurrency"] = concurrency_overrides[source]
+            if source in queue_overrides:
+                limits["max_queue"] = queue_overrides[source]
+            self.limits[source] = limits
+
+        self.queues: Dict[str, SourceQueue] = {}
+        # Queue state shared with other workers (position/state per task_id)
+        self.jobs = TaskCollection("scheduler")
+
+        # Sources whose jobs run in browser_worker.py processes
+        self.remote_sources = {
+            source.strip() for source in os.getenv("SCHEDULER_REMOTE_SOURCES", "").split(",") if source.strip()
+        }
+        self._redis = None
+        self._redis_checked = False
+
+    def _remote_client(self):
+        """Redis client for the remote job queue, or None to run jobs locally"""
+        if not self._redis_checked:
+            self._redis_checked = True
+            self._redis = create_redis_client()
+            if self._redis is None:
+                logger.warning(f"⚠️ SCHEDULER_REMOTE_SOURCES set but Redis is unavailable - running {sorted(self.remote_sources)} jobs in-process")
+            else:
+                logger.info(f"✅ Remote worker queue enabled for: {sorted(self.remote_sources)}")
+        return self._redis
+
+    def _get_queue(self, source: str) -> SourceQueue:
+        if source not in self.queues:
+            limits = self.limits.get(source, DEFAULT_LIMITS)
+            self.queues[source] = SourceQueue(source, limits["concurrency"], limits["max_queue"])
+            logger.info(f"🧵 Scheduler queue '{source}' ready: concurrency={limits['concurrency']}, max_queue={limits['max_queue']}")
+        return self.queues[source]
+
+    def submit(self, source: str, task_id: str, func: Callable, *args, **kwargs) -> Dict[str, Any]:
+        """Queue a job; raises HTTPException(429) with Retry-After when the queue is full.
+
+        Must be called from the event loop (i.e. from an async route handler).
+        """
+        if source in self.remote_sources and self._remote_client() is not None:
+            return self._submit_remote(source, task_id, func, args, kwargs)
+
+        # Fail before touching any state: a job marked running without a loop to run it would hold its slot forever
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError(f"scheduler.submit for {source} task {task_id} must be called from the event loop")
+
+        queue = self._get_queue(source)
+
+        if len(queue.pending) >= queue.max_queue:
+            queue.rejected += 1
+            retry_after = queue.retry_after()
+            logger.warning(f"🚦 Scheduler queue '{source}' full ({len(queue.pending)} queued) - rejecting task {task_id}, retry after {retry_after}s")
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many {source} jobs queued right now. Please retry in {retry_after} seconds.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+        job = Job(task_id=task_id, source=source, func=func, args=args, kwargs=kwargs)
+        queue.pending.append(job)
+        position = len(queue.pending)
+        self.jobs[task_id] = {
+            "source": source,
+            "state": "queued",
+            "queue_position": position,
+            "queued_at": datetime.now().isoformat(),
+        }
+        logger.info(f"📥 Queued {source} task {task_id} at position {position} ({len(queue.running)}/{queue.concurrency} running)")
+
+        self._start_ready(queue)
+        position = self.jobs.get_field(task_id, "queue_position", 0)
+
+        return {"queue_position": position, "queue_depth": len(queue.pending)}
+
+    def _submit_remote(self, source: str, task_id: str, func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Push a job onto the Redis queue consumed by browser_worker.py"""
+        limits = self.limits.get(source, DEFAULT_LIMITS)
+        queue_key = f"{REMOTE_QUEUE_PREFIX}{source}"
+        depth = self._redis.llen(queue_key)
+
+        if depth >= limits["max_queue"]:
+            retry_after = int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, DEFAULT_JOB_SECONDS * math.ceil((depth + 1) / limits["concurrency"]))))
+            logger.warning(f"🚦 Remote queue '{source}' full ({depth} queued) - rejecting task {task_id}, retry after {retry_after}s")
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many {source} jobs queued right now. Please retry in {retry_after} seconds.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+        payload = {
+            "task_id": task_id,
+            "source": source,
+            "func": f"{func.__module__}:{func.__qualname__}",
+            "args": jsonable_encoder(list(args)),
+            "kwargs": jsonable_encoder(kwargs),
+            "queued_at": time.time(),
+        }
+        self.jobs[task_id] = {
+            "source": source,
+            "state": "queued",
+            "remote": True,
+            "queued_at": datetime.now().isoformat(),
+        }
+
+        pipe = self._redis.pipeline()
+        pipe.set(f"{REMOTE_PAYLOAD_PREFIX}{task_id}", json.dumps(payload), ex=DEFAULT_TASK_TTL)
+        pipe.rpush(queue_key, task_id)
+        _, position = pipe.execute()
+        logger.info(f"📤 Queued {source} task {task_id} for remote workers at position {position}")
+
+        return {"queue_position": position, "queue_depth": position}
+
+    def _start_ready(self, queue: SourceQueue):
+        """Start queued jobs while there are free slots"""
+        started = False
+        while queue.pending and len(queue.running) < queue.concurrency:
+            job = queue.pending.popleft()
+            queue.running[job.task_id] = job
+            self.jobs.update(job.task_id, state="running", queue_position=0, started_at=datetime.now().isoformat())
+            asyncio.create_task(self._run(queue, job))
+            started = True
+
+        if started:
+            self._publish_positions(queue)
+
+    def _publish_positions(self, queue: SourceQueue):
+        for position, job in enumerate(queue.pending, start=1):
+            self.jobs.update(job.task_id, queue_position=position)
+
+    async def _run(self, queue: SourceQueue, job: Job):
+        started_at = time.time()
+        wait_seconds = started_at - job.queued_at
+        logger.info(f"▶️ Starting {job.source} task {job.task_id} after {wait_seconds:.1f}s in queue")
+
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func(*job.args, **job.kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(queue.executor, lambda: job.func(*job.args, **job.kwargs))
+            queue.completed += 1
+            self.jobs.update(job.task_id, state="finished")
+        except Exception as e:
+            queue.failed += 1
+            self.jobs.update(job.task_id, state="failed")
+            logger.error(f"❌ Scheduled {job.source} task {job.task_id} raised: {str(e)}")
+            logger.error(traceback.format_exc())
+        finally:
+            queue.record_duration(time.time() - started_at, wait_seconds)
+            queue.running.pop(job.task_id, None)
+            self._start_ready(queue)
+
+    def get_queue_position(self, task_id: str) -> Optional[int]:
+        """1-based queue position, 0 once running, None if unknown or finished"""
+        job = self.jobs.get(task_id)
+        if not job or job.get("state") not in ("queued", "running"):
+            return None
+        if job.get("remote") and job.get("state") == "queued" and self._remote_client() is not None:
+            position = self._redis.lpos(f"{REMOTE_QUEUE_PREFIX}{job['source']}", task_id)
+            return position + 1 if position is not None else 0
+        return job.get("queue_position", 0) if job.get("state") == "queued" else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput per source (for this process, or the shared remote queue)"""
+        sources = {}
+        for source, limits in sorted(self.limits.items()):
+            if source in self.remote_sources and self._remote_client() is not None:
+                sources[source] = {
+                    "mode": "remote",
+                    "max_queue": limits["max_queue"],
+                    "queue_depth": self._redis.llen(f"{REMOTE_QUEUE_PREFIX}{source}"),
+                }
+            elif source in self.queues:
+                sources[source] = {"mode": "local", **self.queues[source].stats()}
+            else:
+                sources[source] = {"mode": "local", **limits, "queue_depth": 0, "running": 0}
+        return {"pid": os.getpid(), "sources": sources}
+
+
+# Global scheduler instance
+scheduler = JobScheduler()
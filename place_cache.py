@@ -0,0 +1,231 @@
+"""
+Place Cache
+
+Persistent cache of scraped Google Maps places, keyed by place id.
+
+Overlapping queries ("hair salons in Accra", "barbers in Accra") keep hitting the
+same places. When a fresh record is cached, ``GoogleMapsScraper`` skips the
+click-into-detail step for that place.
+
+Entries expire after ``PLACE_CACHE_TTL`` seconds. Once the cache holds more than
+``PLACE_CACHE_MAX_ENTRIES`` places, the least recently used ones are evicted.
+
+- ``redis``  - one string per place plus a sorted set of last-access times
+- ``sqlite`` - one row per place with ``expires_at`` / ``last_access`` columns
+
+Backend selection is controlled with ``PLACE_CACHE_BACKEND`` (``redis`` or
+``sqlite``). When unset, Redis is used if it is reachable, otherwise SQLite.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import redis
+
+from task_store import create_redis_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLACE_TTL = int(os.getenv('PLACE_CACHE_TTL', 1209600))  # 14 days
+DEFAULT_MAX_ENTRIES = int(os.getenv('PLACE_CACHE_MAX_ENTRIES', 200000))
+DEFAULT_SQLITE_PATH = os.getenv('PLACE_CACHE_SQLITE_PATH', 'place_cache.db')
+
+
+class RedisPlaceBackend:
+    """Redis backend: ``gmaps:place:{place_id}`` strings + ``gmaps:place:lru`` sorted set"""
+
+    LRU_KEY = "gmaps:place:lru"
+
+    def __init__(self, client: redis.Redis, ttl: int = DEFAULT_PLACE_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = "redis"
+
+    def _key(self, place_id: str) -> str:
+        return f"gmaps:place:{place_id}"
+
+    def get_many(self, place_ids: Iterable[str]) -> Dict[str, str]:
+        place_ids = list(place_ids)
+        if not place_ids:
+            return {}
+        values = self.client.mget([self._key(place_id) for place_id in place_ids])
+        found = {place_id: value for place_id, value in zip(place_ids, values) if value is not None}
+        missing = [place_id for place_id in place_ids if place_id not in found]
+        if found or missing:
+            pipe = self.client.pipeline()
+            if found:
+                now = time.time()
+                pipe.zadd(self.LRU_KEY, {place_id: now for place_id in found})
+            if missing:
+                # A read refreshes the score but not the key's TTL, so expired keys can leave members behind
+                pipe.zrem(self.LRU_KEY, *missing)
+            pipe.execute()
+        return found
+
+    def set_many(self, records: Dict[str, str]):
+        if not records:
+            return
+        now = time.time()
+        pipe = self.client.pipeline()
+        for place_id, value in records.items():
+            pipe.set(self._key(place_id), value, ex=self.ttl)
+        pipe.zadd(self.LRU_KEY, {place_id: now for place_id in records})
+        # Keys expire on their own; drop their members too (a member's score is at or after its key's last write)
+        pipe.zremrangebyscore(self.LRU_KEY, "-inf", f"({now - self.ttl}")
+        pipe.zcard(self.LRU_KEY)
+        size = pipe.execute()[-1]
+        if size > self.max_entries:
+            self._evict(size - self.max_entries)
+
+    def _evict(self, count: int):
+        oldest = self.client.zrange(self.LRU_KEY, 0, count - 1)
+        if oldest:
+            pipe = self.client.pipeline()
+            pipe.delete(*[self._key(place_id) for place_id in oldest])
+            pipe.zrem(self.LRU_KEY, *oldest)
+            pipe.execute()
+            logger.info(f"🧹 Evicted {len(oldest)} least recently used places from cache")
+
+    def count(self) -> int:
+        # Members older than the TTL belong to expired keys until the next write prunes them
+        return self.client.zcount(self.LRU_KEY, time.time() - self.ttl, "+inf")
+
+
+class SQLitePlaceBackend:
+    """SQLite backend shared by every worker process on the same host"""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, ttl: int = DEFAULT_PLACE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = "sqlite"
+        self._local = threading.local()
+
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS places (
+                    place_id TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS places_last_access ON places (last_access)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, place_ids: Iterable[str]) -> Dict[str, str]:
+        place_ids = list(place_ids)
+        if not place_ids:
+            return {}
+        now = time.time()
+        conn = self._conn()
+        placeholders = ",".join("?" * len(place_ids))
+        with conn:
+            rows = conn.execute(
+                f"SELECT place_id, value FROM places WHERE place_id IN ({placeholders}) AND expires_at > ?",
+                (*place_ids, now)
+            ).fetchall()
+            if rows:
+                conn.executemany("UPDATE places SET last_access = ? WHERE place_id = ?",
+                                 [(now, place_id) for place_id, _ in rows])
+        return dict(rows)
+
+    def set_many(self, records: Dict[str, str]):
+        if not records:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO places (place_id, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                [(place_id, value, now + self.ttl, now) for place_id, value in records.items()]
+            )
+            conn.execute("DELETE FROM places WHERE expires_at < ?", (now,))
+            excess = conn.execute("SELECT COUNT(*) FROM places").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM places WHERE place_id IN (SELECT place_id FROM places ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+                logger.info(f"🧹 Evicted {excess} least recently used places from cache")
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM places WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+
+class PlaceCache:
+    """Place records by place id; the backend is chosen lazily on first use"""
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is not None:
+            return self._backend
+        with self._lock:
+            if self._backend is None:
+                choice = os.getenv('PLACE_CACHE_BACKEND', '').lower()
+                client = create_redis_client() if choice in ('', 'redis') else None
+                if client is not None:
+                    self._backend = RedisPlaceBackend(client)
+                    logger.info("✅ Place cache using Redis backend")
+                else:
+                    if choice == 'redis':
+                        logger.warning("⚠️ PLACE_CACHE_BACKEND=redis but Redis is unavailable - falling back to SQLite")
+                    self._backend = SQLitePlaceBackend(DEFAULT_SQLITE_PATH)
+                    logger.info(f"✅ Place cache using SQLite backend at {DEFAULT_SQLITE_PATH}")
+        return self._backend
+
+    def get(self, place_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not place_id:
+            return None
+        return self.get_many([place_id]).get(place_id)
+
+    def get_many(self, place_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fresh cached records for the given ids (missing/expired ids are left out)"""
+        try:
+            return {place_id: json.loads(value) for place_id, value in self.backend.get_many(place_ids).items()}
+        except Exception as e:
+            logger.warning(f"⚠️ Place cache read failed: {str(e)}")
+            return {}
+
+    def set(self, place_id: Optional[str], record: Dict[str, Any]):
+        if place_id:
+            self.set_many({place_id: record})
+
+    def set_many(self, records: Dict[str, Dict[str, Any]]):
+        try:
+            self.backend.set_many({place_id: json.dumps(record, default=str) for place_id, record in records.items() if place_id})
+        except Exception as e:
+            logger.warning(f"⚠️ Place cache write failed: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "entries": self.backend.count(),
+            "ttl_seconds": self.backend.ttl,
+            "max_entries": self.backend.max_entries,
+        }
+
+
+# Global cache instance
+place_cache = PlaceCache()
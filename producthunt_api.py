@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Tuple
@@ -10,335 +10,238 @@ import uuid
 import logging
 import traceback
 import requests
-import aiohttp
-import ssl
-from datetime import datetime
+from datetime import datetime, timedelta
 from urllib.parse import urlencode
 from bs4 import BeautifulSoup
-from curl_cffi import requests as curl_requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from apollo_ssr import extract_apollo_data
+from cache_warmer import cache_warmer
+from domain_resolver import domain_resolver
+from http_clients import http_clients
+from job_scheduler import scheduler
+from rate_limiter import rate_limits
+from single_flight import single_flight
+from task_store import TaskCollection
+
 # Import cache
 try:
-    from redis_cache import cache
+    from redis_cache import cache, domain_cache
     CACHE_AVAILABLE = True
 except ImportError:
     CACHE_AVAILABLE = False
     cache = None
+    domain_cache = None
 
-def resolve_domain_sync(domain: str, name: str, task_id: str) -> Tuple[str, str]:
-    """Resolve a single domain synchronously using curl_cffi"""
-    try:
-        # If it's already a full URL, use it directly
-        if domain.startswith('http'):
-            url = domain
-        else:
-            url = f"https://{domain}"
-        
-        # Use curl_cffi to make request with Chrome impersonation
-        r = curl_requests.get(url, impersonate="chrome", timeout=10, allow_redirects=True)
-        
-        # Get the final URL after following redirects
-        final_url = r.url
-        resolved_domain = urlparse(final_url).netloc
-        # Remove www. prefix from resolved domain
-        clean_domain = resolved_domain.replace('www.', '') if resolved_domain else resolved_domain
-        logger.info(f"✅ Task {task_id}: Resolved domain for {name}: {clean_domain}")
-        return domain, clean_domain
-    except Exception as e:
-        logger.warning(f"⚠️ Task {task_id}: Failed to resolve domain for {name}: {domain}. Error: {str(e)}")
-        return domain, domain
-
-def extract_description_from_product_page(product_url: str, task_id: str) -> Optional[str]:
-    """Extract description from ProductHunt product detail page using curl_cffi"""
+# lxml parses product pages several times faster than the stdlib parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Category product nodes link their website through this redirect until a product page names it
+PRODUCT_REDIRECT_PREFIX = 'https://producthunt.com/r/p/'
+
+# Browser-like headers for ProductHunt page and GraphQL requests
+BROWSER_HEADERS = {
+    'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'accept-language': 'en-US,en;q=0.6',
+    'cache-control': 'max-age=0',
+    'sec-ch-ua': '"Brave";v="137", "Chromium";v="137", "Not/A)Brand";v="24"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"',
+    'sec-fetch-dest': 'document',
+    'sec-fetch-mode': 'navigate',
+    'sec-fetch-site': 'same-origin',
+    'sec-fetch-user': '?1',
+    'sec-gpc': '1',
+    'upgrade-insecure-requests': '1',
+    'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36',
+}
+
+def extract_page_description(soup: BeautifulSoup) -> Optional[str]:
+    """Product description from a parsed product page"""
+    # The description block, by its full path first and then by its class combination anywhere
+    for selector in [
+        '#root-container > div.pt-header > div > main > div.flex.flex-col.gap-3 > div.relative.text-16.font-normal.text-gray-700',
+        'div.relative.text-16.font-normal.text-gray-700',
+        'div.line-clamp-2 span',
+    ]:
+        description_div = soup.select_one(selector)
+        if description_div:
+            description = description_div.get_text(strip=True)
+            if description:
+                return description
+    return None
+
+def extract_page_media_images(soup: BeautifulSoup) -> List[str]:
+    """Gallery image URLs (ph-files.imgix.net, without query parameters) from a parsed product page"""
+    media_images = []
+    seen_urls = set()  # To avoid duplicates
+    
+    # Gallery images have class "rounded-xl"
+    for img in soup.find_all('img', class_='rounded-xl'):
+        img_url = None
+        
+        # Extract from srcset (format: "url1 1x, url2 2x, url3 3x") - the 1x version comes first
+        srcset = img.get('srcset')
+        if srcset:
+            first_part = srcset.split(',')[0].strip()
+            img_url = first_part.split()[0] if ' ' in first_part else first_part
+        
+        # Fallback to src, then data-src
+        if not img_url:
+            img_url = img.get('src') or img.get('data-src')
+        
+        if img_url:
+            # Remove query parameters to get base URL
+            img_url = img_url.split('?')[0]
+            
+            # Handle relative URLs
+            if img_url.startswith('//'):
+                img_url = 'https:' + img_url
+            elif img_url.startswith('/'):
+                img_url = 'https://www.producthunt.com' + img_url
+            
+            if 'ph-files.imgix.net' in img_url and img_url not in seen_urls:
+                media_images.append(img_url)
+                seen_urls.add(img_url)
+    
+    return media_images
+
+def extract_page_website(soup: BeautifulSoup) -> Optional[str]:
+    """Domain behind the product page's 'Visit website' button, without www."""
+    visit_button = soup.find('a', {'data-test': 'visit-website-button'})
+    if visit_button and visit_button.get('href'):
+        domain = urlparse(visit_button.get('href')).netloc
+        return domain.replace('www.', '') if domain else None
+    return None
+
+def extract_page_makers(soup: BeautifulSoup) -> List[str]:
+    """Usernames linked from the product page's makers section"""
+    makers = []
+    for link in soup.select('[data-test*="maker"] a[href^="/@"]'):
+        username = link['href'][2:].split('/')[0].split('?')[0]
+        if username and username not in makers:
+            makers.append(username)
+    return makers
+
+def fetch_product_page(product_url: str, task_id: str) -> Dict[str, Any]:
+    """Fetch and parse a product detail page once; returns description, media, website and makers together.
+    
+    The record is cached per product, and the website domain also goes to the
+    domain cache so the category domain scrape doesn't fetch the page again.
+    An empty dict means the page couldn't be fetched.
+    """
+    if CACHE_AVAILABLE and cache:
+        cached_page = cache.get("product_page", url=product_url)
+        if cached_page:
+            return cached_page
+    
     try:
-        headers = {
-            'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'accept-language': 'en-US,en;q=0.6',
-            'cache-control': 'max-age=0',
-            'sec-ch-ua': '"Brave";v="137", "Chromium";v="137", "Not/A)Brand";v="24"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"macOS"',
-            'sec-fetch-dest': 'document',
-            'sec-fetch-mode': 'navigate',
-            'sec-fetch-site': 'same-origin',
-            'sec-fetch-user': '?1',
-            'sec-gpc': '1',
-            'upgrade-insecure-requests': '1',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36',
+        response = http_clients.curl("chrome").get(product_url, headers=BROWSER_HEADERS, timeout=15)
+        soup = BeautifulSoup(response.text, HTML_PARSER)
+        page = {
+            "url": product_url,
+            "description": extract_page_description(soup),
+            "media_images": extract_page_media_images(soup),
+            "website": extract_page_website(soup),
+            "makers": extract_page_makers(soup),
+            "fetched_at": datetime.now().isoformat(),
         }
-        
-        # Use curl_cffi to fetch product detail page
-        response = curl_requests.get(product_url, headers=headers, impersonate="chrome", timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract description using the CSS selector path: #root-container > div.pt-header > div > main > div.flex.flex-col.gap-3 > div.relative.text-16.font-normal.text-gray-700
-        # Try multiple approaches to find the description
-        
-        # Method 1: Use CSS selector directly
-        try:
-            description_div = soup.select_one('#root-container > div.pt-header > div > main > div.flex.flex-col.gap-3 > div.relative.text-16.font-normal.text-gray-700')
-            if description_div:
-                description = description_div.get_text(strip=True)
-                if description:
-                    logger.info(f"✅ Task {task_id}: Extracted description from product page: {product_url}")
-                    return description
-        except Exception as e:
-            logger.debug(f"Method 1 failed: {str(e)}")
-        
-        # Method 2: Navigate through the path structure
-        try:
-            root_container = soup.find('div', id='root-container')
-            if root_container:
-                pt_header = root_container.find('div', class_='pt-header')
-                if pt_header:
-                    # Find the div inside pt-header
-                    inner_div = pt_header.find('div', recursive=False)
-                    if inner_div:
-                        main = inner_div.find('main')
-                        if main:
-                            # Find div with classes flex, flex-col, gap-3
-                            flex_col = main.find('div', class_=lambda x: x and 'flex' in x and 'flex-col' in x and 'gap-3' in x)
-                            if flex_col:
-                                # Find div with classes relative, text-16, font-normal, text-gray-700
-                                description_div = flex_col.find('div', class_=lambda x: x and 'relative' in x and 'text-16' in x and 'font-normal' in x and 'text-gray-700' in x)
-                                if description_div:
-                                    description = description_div.get_text(strip=True)
-                                    if description:
-                                        logger.info(f"✅ Task {task_id}: Extracted description from product page (method 2): {product_url}")
-                                        return description
-        except Exception as e:
-            logger.debug(f"Method 2 failed: {str(e)}")
-        
-        # Method 3: Try finding by class combination directly (simpler approach)
-        try:
-            description_div = soup.find('div', class_=lambda x: x and 'relative' in x and 'text-16' in x and 'font-normal' in x and 'text-gray-700' in x)
-            if description_div:
-                description = description_div.get_text(strip=True)
-                if description:
-                    logger.info(f"✅ Task {task_id}: Extracted description from product page (method 3): {product_url}")
-                    return description
-        except Exception as e:
-            logger.debug(f"Method 3 failed: {str(e)}")
-        
-        # Method 4: Try the line-clamp-2 approach as fallback
-        try:
-            description_div = soup.find('div', class_='line-clamp-2')
-            if description_div:
-                span = description_div.find('span')
-                if span:
-                    description = span.get_text(strip=True)
-                    if description:
-                        logger.info(f"✅ Task {task_id}: Extracted description from product page (method 4): {product_url}")
-                        return description
-        except Exception as e:
-            logger.debug(f"Method 4 failed: {str(e)}")
-        
-        logger.warning(f"⚠️ Task {task_id}: No description found on product page: {product_url}")
-        return None
-        
     except Exception as e:
-        logger.warning(f"⚠️ Task {task_id}: Failed to extract description from {product_url}. Error: {str(e)}")
-        return None
-
-def extract_media_images_from_product_page(product_url: str, task_id: str) -> Optional[List[str]]:
-    """Extract media images from ProductHunt product detail page using curl_cffi"""
-    try:
-        headers = {
-            'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'accept-language': 'en-US,en;q=0.6',
-            'cache-control': 'max-age=0',
-            'sec-ch-ua': '"Brave";v="137", "Chromium";v="137", "Not/A)Brand";v="24"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"macOS"',
-            'sec-fetch-dest': 'document',
-            'sec-fetch-mode': 'navigate',
-            'sec-fetch-site': 'same-origin',
-            'sec-fetch-user': '?1',
-            'sec-gpc': '1',
-            'upgrade-insecure-requests': '1',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36',
-        }
-        
-        # Use curl_cffi to fetch product detail page
-        response = curl_requests.get(product_url, headers=headers, impersonate="chrome", timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        media_images = []
-        seen_urls = set()  # To avoid duplicates
-        
-        # Find all images with class "rounded-xl" (gallery images)
-        # The images are in the same HTML structure where we get the description
-        images = soup.find_all('img', class_='rounded-xl')
-        
-        for img in images:
-            # Try to get URL from srcset first (it has multiple resolutions)
-            img_url = None
-            
-            # Extract from srcset (format: "url1 1x, url2 2x, url3 3x")
-            srcset = img.get('srcset')
-            if srcset:
-                # Get the first URL from srcset (1x version)
-                # Split by comma and get the first part, then split by space to get URL
-                first_part = srcset.split(',')[0].strip()
-                img_url = first_part.split()[0] if ' ' in first_part else first_part
-            
-            # Fallback to src attribute
-            if not img_url:
-                img_url = img.get('src')
-            
-            # Fallback to data-src if available
-            if not img_url:
-                img_url = img.get('data-src')
-            
-            if img_url:
-                # Clean up the URL
-                # Remove query parameters to get base URL
-                if '?' in img_url:
-                    img_url = img_url.split('?')[0]
-                
-                # Handle relative URLs
-                if img_url.startswith('//'):
-                    img_url = 'https:' + img_url
-                elif img_url.startswith('/'):
-                    img_url = 'https://www.producthunt.com' + img_url
-                
-                # Only add if it's from imgix (ph-files.imgix.net) and not already seen
-                if 'ph-files.imgix.net' in img_url and img_url not in seen_urls:
-                    media_images.append(img_url)
-                    seen_urls.add(img_url)
-        
-        if media_images:
-            logger.info(f"✅ Task {task_id}: Extracted {len(media_images)} media images from product page: {product_url}")
-            return media_images
-        
-        logger.warning(f"⚠️ Task {task_id}: No media images found on product page: {product_url}")
-        return None
-        
-    except Exception as e:
-        logger.warning(f"⚠️ Task {task_id}: Failed to extract media images from {product_url}. Error: {str(e)}")
-        return None
-
-async def scrape_product_detail_for_domain(session: aiohttp.ClientSession, product_url: str, name: str, task_id: str) -> Tuple[str, str]:
-    """Scrape a product detail page to extract the actual website domain from 'Visit website' button"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    }
-    try:
-        async with session.get(product_url, headers=headers, timeout=15) as response:
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Look for the "Visit website" button
-            visit_button = soup.find('a', {'data-test': 'visit-website-button'})
-            
-            if visit_button and visit_button.get('href'):
-                website_url = visit_button.get('href')
-                # Extract domain from the URL and remove www. prefix
-                domain = urlparse(website_url).netloc
-                clean_domain = domain.replace('www.', '') if domain else domain
-                logger.info(f"✅ Task {task_id}: Found domain for {name}: {clean_domain} (from {website_url})")
-                return product_url, clean_domain
-            else:
-                logger.warning(f"⚠️ Task {task_id}: No 'Visit website' button found for {name} on {product_url}")
-                return product_url, None
-                
-    except Exception as e:
-        logger.warning(f"⚠️ Task {task_id}: Failed to scrape domain for {name} from {product_url}. Error: {str(e)}")
-        return product_url, None
+        logger.warning(f"⚠️ Task {task_id}: Failed to fetch product page {product_url}. Error: {str(e)}")
+        return {}
+    
+    logger.info(f"✅ Task {task_id}: Parsed product page {product_url} "
+                f"(description: {'yes' if page['description'] else 'no'}, {len(page['media_images'])} media images)")
+    if CACHE_AVAILABLE and cache:
+        cache.set("product_page", page, url=product_url)
+        if domain_cache:
+            domain_cache.set_many("website", {product_url: page["website"]})
+    return page
 
-async def resolve_domains_batch(domains_data: List[Tuple[str, str, str]], task_id: str, batch_size: int = 100) -> Dict[str, str]:
-    """Resolve multiple domains concurrently in batches"""
+async def resolve_domains_batch(domains_data: List[Tuple[str, str, str]], task_id: str) -> Dict[str, str]:
+    """Resolve product website links to their final domains; failed lookups keep the original link"""
     resolved_domains = {}
+    names = {domain: name for domain, name, _ in domains_data}
     
-    # If cache is available, check cache first
-    if CACHE_AVAILABLE and cache:
-        for domain, name, _ in domains_data:
-            cached_domain = cache.get(f"domain:{domain}")
-            if cached_domain:
-                resolved_domains[domain] = cached_domain
-                logger.info(f"🎯 Task {task_id}: Cache hit for domain: {domain}")
-                domains_data = [d for d in domains_data if d[0] != domain]
+    # If cache is available, look every domain up in one round trip (failed lookups are cached too)
+    if CACHE_AVAILABLE and domain_cache:
+        cached = await asyncio.to_thread(domain_cache.get_many, "resolved", list(names))
+        for domain, entry in cached.items():
+            resolved_domains[domain] = entry["domain"] or domain
+            del names[domain]
+        if cached:
+            logger.info(f"🎯 Task {task_id}: Cache hit for {len(cached)} domains")
 
     # Only proceed with HTTP requests if there are unresolved domains
-    if domains_data:
-        # Use ThreadPoolExecutor to run curl_cffi requests in parallel
-        from concurrent.futures import ThreadPoolExecutor
-        
-        with ThreadPoolExecutor(max_workers=batch_size) as executor:
-            for i in range(0, len(domains_data), batch_size):
-                batch = domains_data[i:i + batch_size]
-                # Submit all tasks to thread pool and keep track of which domain each future corresponds to
-                future_to_domain = {
-                    executor.submit(resolve_domain_sync, domain, name, task_id): domain 
-                    for domain, name, _ in batch
-                }
-                
-                # Wait for all tasks in this batch to complete
-                for future, original_domain in future_to_domain.items():
-                    try:
-                        _, resolved_domain = future.result(timeout=30)
-                        resolved_domains[original_domain] = resolved_domain
-                        # Cache the result if cache is available
-                        if CACHE_AVAILABLE and cache:
-                            try:
-                                cache.set(f"domain:{original_domain}", resolved_domain, expire=86400)  # Cache for 24 hours
-                            except Exception as e:
-                                logger.warning(f"⚠️ Task {task_id}: Failed to cache domain {original_domain}: {str(e)}")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Task {task_id}: Failed to resolve domain {original_domain} in batch: {str(e)}")
-                        # If resolution fails, use original domain
-                        resolved_domains[original_domain] = original_domain
+    if names:
+        # The shared resolver caps lookups across all tasks and joins ones already in flight
+        results = {}
+        async for domain, resolved in domain_resolver.resolve_many(list(names)):
+            results[domain] = resolved
+            # If resolution fails, use original domain
+            resolved_domains[domain] = resolved or domain
+            if resolved:
+                logger.debug(f"✅ Task {task_id}: Resolved domain for {names[domain]}: {resolved}")
+        logger.info(f"🌐 Task {task_id}: Resolved {sum(1 for resolved in results.values() if resolved)}/{len(results)} domains")
+        
+        # Cache the results (failures included) in one pipeline
+        if CACHE_AVAILABLE and domain_cache:
+            await asyncio.to_thread(domain_cache.set_many, "resolved", results)
     
     return resolved_domains
 
 async def scrape_category_product_domains_batch(product_urls_data: List[Tuple[str, str]], task_id: str, batch_size: int = 10) -> Dict[str, str]:
-    """Scrape multiple product detail pages to extract actual website domains"""
+    """Website domains for category products, from their (cached) product page records"""
     scraped_domains = {}
+    names = dict(product_urls_data)
     
-    # If cache is available, check cache first
-    if CACHE_AVAILABLE and cache:
-        for product_url, name in product_urls_data:
-            cached_domain = cache.get(f"category_domain:{product_url}")
-            if cached_domain:
-                scraped_domains[product_url] = cached_domain
-                logger.info(f"🎯 Task {task_id}: Cache hit for product URL: {product_url}")
-                product_urls_data = [d for d in product_urls_data if d[0] != product_url]
+    # If cache is available, look every product page up in one round trip (pages without a website are cached too)
+    if CACHE_AVAILABLE and domain_cache:
+        cached = await asyncio.to_thread(domain_cache.get_many, "website", list(names))
+        for product_url, entry in cached.items():
+            scraped_domains[product_url] = entry["domain"]
+            del names[product_url]
+        if cached:
+            logger.info(f"🎯 Task {task_id}: Cache hit for {len(cached)} product URLs")
 
     # Only proceed with HTTP requests if there are unresolved domains
-    if product_urls_data:
-        # Configure SSL context to handle certificate verification
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        timeout = aiohttp.ClientTimeout(total=30)  # 30 seconds total timeout
-        
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            for i in range(0, len(product_urls_data), batch_size):
-                batch = product_urls_data[i:i + batch_size]
-                tasks = [scrape_product_detail_for_domain(session, product_url, name, task_id) for product_url, name in batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for (product_url, domain) in results:
-                    if isinstance(domain, Exception):
-                        scraped_domains[product_url] = None
-                    else:
-                        scraped_domains[product_url] = domain
-                        # Cache the result if cache is available
-                        if CACHE_AVAILABLE and cache and domain:
-                            try:
-                                cache.set(f"category_domain:{product_url}", domain, expire=86400)  # Cache for 24 hours
-                            except Exception as e:
-                                logger.warning(f"⚠️ Task {task_id}: Failed to cache domain {product_url}: {str(e)}")
+    if names:
+        # fetch_product_page caches the page record and its website domain itself
+        semaphore = asyncio.Semaphore(batch_size)
+        
+        async def fetch_page(product_url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(fetch_product_page, product_url, task_id)
+        
+        pending = list(names)
+        pages = await asyncio.gather(*[fetch_page(product_url) for product_url in pending])
+        failed = {}
+        for product_url, page in zip(pending, pages):
+            scraped_domains[product_url] = page.get("website")
+            if not page:
+                failed[product_url] = None
+            elif page.get("website"):
+                logger.info(f"✅ Task {task_id}: Found domain for {names[product_url]}: {page['website']}")
+        logger.info(f"🌐 Task {task_id}: Found {sum(1 for product_url in pending if scraped_domains[product_url])}/{len(pending)} website domains")
+        
+        # Pages that couldn't be fetched get a short negative entry too
+        if failed and CACHE_AVAILABLE and domain_cache:
+            await asyncio.to_thread(domain_cache.set_many, "website", failed)
     
     return scraped_domains
 
+def needs_domain_scrape(product: "CategoryProduct") -> bool:
+    """Products still pointing at their ProductHunt redirect link (the enrichment stage fills in the rest)"""
+    return bool(product.url) and (not product.domain or product.domain.startswith(PRODUCT_REDIRECT_PREFIX))
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -353,9 +256,18 @@ logger = logging.getLogger(__name__)
 # Create API router
 router = APIRouter()
 
-# In-memory storage for task status and results (in production, use Redis or database)
-task_status = {}
-task_results = {}
+# Shared storage for task status and results (Redis or SQLite, see task_store).
+# Result metadata lives in task_results; products/categories are stored as result chunks.
+task_results = TaskCollection("producthunt_results")
+
+def store_task_results(task_id: str, item_type: str, items: List[Any], **metadata):
+    """Store a task's items (as result chunks), then its result metadata.
+
+    /results treats the metadata row as "results are ready", so it is written last,
+    and the task is only marked completed after this returns.
+    """
+    task_results.append_results(task_id, items)
+    task_results[task_id] = {"item_type": item_type, **metadata}
 
 class Product(BaseModel):
     id: str
@@ -424,6 +336,8 @@ class TaskStatus(BaseModel):
     created_at: datetime
     completed_at: Optional[datetime] = None
 
+task_status = TaskCollection("producthunt", TaskStatus)
+
 class ScrapingResult(BaseModel):
     task_id: str
     products: List[Product]
@@ -574,6 +488,108 @@ def extract_product_data(product_node: Dict[str, Any]) -> Product:
         categories=categories
     )
 
+def parse_graphql_response(text: str, task_id: str) -> Dict[str, Any]:
+    """JSON body of a GraphQL response (also when it comes back wrapped in an HTML page)"""
+    try:
+        json_data = json.loads(text)
+    except json.JSONDecodeError:
+        # If response is HTML (error page), try to parse as HTML
+        soup = BeautifulSoup(text, 'html.parser')
+        pre_content = soup.find('pre')
+        if pre_content:
+            json_data = json.loads(pre_content.get_text())
+        else:
+            logger.error(f"❌ Task {task_id}: Could not parse GraphQL response")
+            raise Exception("Could not parse GraphQL response")
+    
+    if not json_data:
+        logger.error(f"❌ Task {task_id}: No data in JSON response")
+        raise Exception("No data in JSON response")
+    return json_data
+
+
+async def scrape_leaderboard_pages(task_id: str, rank_type: str, date: str, max_pages: int) -> Tuple[List[Product], bool, Optional[str], int]:
+    """Walk the leaderboard's GraphQL cursor, resolving each page's domains while the next page is fetched.
+    
+    Pages have to be fetched in order (each one needs the previous page's
+    cursor), so they go out back to back, paced by the shared
+    ``producthunt_graphql`` token bucket rather than a fixed sleep. Each page's
+    domains go to ``resolve_domains_batch`` as soon as the page arrives.
+    """
+    client = http_clients.async_curl("chrome")
+    bucket = rate_limits.bucket("producthunt_graphql")
+    base_url = 'https://www.producthunt.com/frontend/graphql'
+    
+    all_products = []
+    enrichment = []  # One domain-resolution task per page
+    current_page = 0
+    cursor = None
+    has_next_page = True
+    
+    while has_next_page and current_page < max_pages:
+        current_page += 1
+        logger.info(f"📄 Task {task_id}: Processing page {current_page} (max: {max_pages})")
+        
+        # Progress based on pages processed, with a cap at 95% until we know we're done
+        progress = min(95, int((current_page / 20) * 100))  # Assume max 20 pages for progress calculation
+        task_status.update(task_id, current_page=current_page, progress=progress)
+        
+        url = base_url + '?' + urlencode(create_params(rank_type, date, cursor))
+        logger.info(f"🌐 Task {task_id}: Making request to {base_url} with cursor: {cursor}")
+        
+        await bucket.acquire()
+        graphql_response = await client.get(url, headers=BROWSER_HEADERS, timeout=30)
+        json_data = parse_graphql_response(graphql_response.text, task_id)
+        
+        # Extract products from edges
+        edges = json_data.get('data', {}).get('homefeedItems', {}).get('edges', [])
+        logger.info(f"📋 Task {task_id}: Found {len(edges)} edges on page {current_page}")
+        
+        page_domains = []  # Tuples of (domain, name, product_data)
+        for edge in edges:
+            node = edge.get('node', {})
+            if node.get('__typename') == 'Post':  # Skip ads
+                product = extract_product_data(node)
+                all_products.append(product)
+                if product.domain:
+                    page_domains.append((product.domain, product.name, {'id': product.id, 'domain': product.domain}))
+            else:
+                logger.debug(f"⏭️  Task {task_id}: Skipping non-Post node: {node.get('__typename')}")
+        
+        # Start resolving this page's domains while the next page is fetched
+        if page_domains:
+            enrichment.append(asyncio.create_task(resolve_domains_batch(page_domains, task_id)))
+        
+        task_status.update(task_id, products_found=len(all_products))
+        logger.info(f"📈 Task {task_id}: Total products so far: {len(all_products)}")
+        
+        # Get pagination info
+        page_info = json_data.get('data', {}).get('homefeedItems', {}).get('pageInfo', {})
+        has_next_page = page_info.get('hasNextPage', False)
+        cursor = page_info.get('endCursor')
+        logger.info(f"📄 Task {task_id}: Page {current_page} - hasNextPage: {has_next_page}, endCursor: {cursor}")
+    
+    # Wait for the pages whose domains are still being resolved
+    logger.info(f"🌐 Task {task_id}: Waiting on domain resolution for {len(enrichment)} pages")
+    resolved_domains = {}
+    for page_resolved in await asyncio.gather(*enrichment):
+        resolved_domains.update(page_resolved)
+    
+    # Create new product instances with resolved domains
+    def update_product_domain(product_data):
+        if product_data.domain in resolved_domains:
+            resolved = resolved_domains[product_data.domain]
+            logger.debug(f"🔄 Updating domain for {product_data.name}: {product_data.domain} -> {resolved}")
+            
+            # Create new Product instance with updated domain
+            data = product_data.dict()
+            data['domain'] = resolved
+            return Product(**data)
+        return product_data
+    
+    return [update_product_domain(product) for product in all_products], has_next_page, cursor, current_page
+
+
 def scrape_producthunt_data_task(task_id: str, rank_type: str, date: str, max_pages: int = 1000000):
     """Background task to scrape ProductHunt data with pagination"""
     
@@ -581,157 +597,29 @@ def scrape_producthunt_data_task(task_id: str, rank_type: str, date: str, max_pa
     
     try:
         # Update task status to running
-        task_status[task_id].status = "running"
-        task_status[task_id].created_at = datetime.now()
+        task_status.update(task_id,
+                           status="running",
+                           created_at=datetime.now())
         logger.info(f"📊 Task {task_id} status set to running")
         
-        all_products = []
-        current_page = 0
-        cursor = None
-        has_next_page = True
-        
-        # List to store domains that need resolution
-        domains_to_resolve = []  # Will store tuples of (domain, name, product_data)
-        
-        # Headers for curl_cffi requests
-        headers = {
-            'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'accept-language': 'en-US,en;q=0.6',
-            'cache-control': 'max-age=0',
-            'sec-ch-ua': '"Brave";v="137", "Chromium";v="137", "Not/A)Brand";v="24"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"macOS"',
-            'sec-fetch-dest': 'document',
-            'sec-fetch-mode': 'navigate',
-            'sec-fetch-site': 'same-origin',
-            'sec-fetch-user': '?1',
-            'sec-gpc': '1',
-            'upgrade-insecure-requests': '1',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36',
-        }
-        
-        while has_next_page and current_page < max_pages:
-            current_page += 1
-            logger.info(f"📄 Task {task_id}: Processing page {current_page} (max: {max_pages})")
-            
-            # Update progress (use a more reasonable estimate since we don't know total pages)
-            task_status[task_id].current_page = current_page
-            # Progress based on pages processed, with a cap at 95% until we know we're done
-            progress = min(95, int((current_page / 20) * 100))  # Assume max 20 pages for progress calculation
-            task_status[task_id].progress = progress
-            
-            # Create parameters
-            params = create_params(rank_type, date, cursor)
-            base_url = 'https://www.producthunt.com/frontend/graphql'
-            url = base_url + '?' + urlencode(params)
-            # print("base_url", url)
-            
-            logger.info(f"🌐 Task {task_id}: Making request to {base_url} with cursor: {cursor}")
-            
-            # Use curl_cffi to make GraphQL API call
-            logger.info(f"⏳ Task {task_id}: Fetching GraphQL response...")
-            # params = {
-            #     'operationName': 'LeaderboardDailyPage',
-            #     'variables': '{"featured":true,"year":2025,"month":10,"day":31,"order":"DAILY_RANK","cursor":null}',
-            #     'extensions': '{"persistedQuery":{"version":1,"sha256Hash":"547bb5ae92ec9a7a5ba5a4007def856e7c9ab781a03f9f80060c8656816a6b5a"}}'
-            # }
-            graphql_response = curl_requests.get(url, headers=headers, impersonate="chrome", timeout=30)
-            # print("graphql_response", graphql_response.text)
-            
-            # Parse response - GraphQL endpoint returns JSON directly
-            try:
-                json_data = graphql_response.json()
-            except json.JSONDecodeError:
-                # If response is HTML (error page), try to parse as HTML
-                soup = BeautifulSoup(graphql_response.text, 'html.parser')
-                pre_content = soup.find('pre')
-                if pre_content:
-                    json_data = json.loads(pre_content.get_text())
-                else:
-                    logger.error(f"❌ Task {task_id}: Could not parse GraphQL response")
-                    raise Exception("Could not parse GraphQL response")
-            
-            if not json_data:
-                logger.error(f"❌ Task {task_id}: No data in JSON response")
-                raise Exception("No data in JSON response")
-            
-            # Parse JSON response
-            logger.info(f"📊 Task {task_id}: Parsing JSON response...")
-            
-            # Extract products from edges
-            edges = json_data.get('data', {}).get('homefeedItems', {}).get('edges', [])
-            logger.info(f"📋 Task {task_id}: Found {len(edges)} edges on page {current_page}")
-            
-            page_products = 0
-            for i, edge in enumerate(edges):
-                node = edge.get('node', {})
-                if node.get('__typename') == 'Post':  # Skip ads
-                    product = extract_product_data(node)
-                    all_products.append(product)
-                    
-                    # Collect domain for batch resolution
-                    if product.domain:
-                        domains_to_resolve.append((product.domain, product.name, {'id': product.id, 'domain': product.domain}))
-                    
-                    page_products += 1
-                    logger.debug(f"✅ Task {task_id}: Extracted product {product.name} (ID: {product.id})")
-                else:
-                    logger.debug(f"⏭️  Task {task_id}: Skipping non-Post node: {node.get('__typename')}")
-            
-            logger.info(f"📊 Task {task_id}: Extracted {page_products} products from page {current_page}")
-            
-            # Update task status
-            task_status[task_id].products_found = len(all_products)
-            logger.info(f"📈 Task {task_id}: Total products so far: {len(all_products)}")
-            
-            # Get pagination info
-            page_info = json_data.get('data', {}).get('homefeedItems', {}).get('pageInfo', {})
-            has_next_page = page_info.get('hasNextPage', False)
-            cursor = page_info.get('endCursor')
-            
-            logger.info(f"📄 Task {task_id}: Page {current_page} - hasNextPage: {has_next_page}, endCursor: {cursor}")
-            
-            # Small delay to be respectful
-            time.sleep(1)
-        
-        # Resolve all domains in batches
-        logger.info(f"🌐 Task {task_id}: Resolving {len(domains_to_resolve)} domains in batches")
-        
-        # Create event loop in the background task
+        # Create event loop in the background task; its async clients are closed with it
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        resolved_domains = loop.run_until_complete(resolve_domains_batch(domains_to_resolve, task_id))
-        loop.close()
-        
-        # Create new product instances with resolved domains
-        def update_product_domain(product_data):
-            if product_data.domain in resolved_domains:
-                resolved = resolved_domains[product_data.domain]
-                logger.info(f"🔄 Updating domain for {product_data.name}: {product_data.domain} -> {resolved}")
-                
-                # Create new Product instance with updated domain
-                data = product_data.dict()
-                data['domain'] = resolved
-                return Product(**data)
-            return product_data
-
-        # Update all products with resolved domains
-        all_products = [update_product_domain(product) for product in all_products]
-        
-        # Update task status to completed
-        task_status[task_id].status = "completed"
-        task_status[task_id].progress = 100
-        task_status[task_id].total_pages = current_page
-        task_status[task_id].completed_at = datetime.now()
-        
-        logger.info(f"🎉 Task {task_id}: Completed successfully. Total products: {len(all_products)}, Total pages: {current_page}")
+        try:
+            all_products, has_next_page, cursor, current_page = loop.run_until_complete(
+                scrape_leaderboard_pages(task_id, rank_type, date, max_pages)
+            )
+        finally:
+            # A failed page can leave other pages' domain lookups pending
+            pending = asyncio.all_tasks(loop)
+            for pending_task in pending:
+                pending_task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(http_clients.aclose())
+            loop.close()
         
         # Store results
-        task_results[task_id] = {
-            "products": all_products,
-            "has_next_page": has_next_page,
-            "end_cursor": cursor
-        }
+        store_task_results(task_id, "products", all_products, has_next_page=has_next_page, end_cursor=cursor)
         
         # Cache the results
         if CACHE_AVAILABLE and cache:
@@ -746,17 +634,27 @@ def scrape_producthunt_data_task(task_id: str, rank_type: str, date: str, max_pa
                 "rank_type": rank_type,
                 "scraped_at": datetime.now().isoformat()
             }
-            cache.set(f"{rank_type}_rankings", cache_data, date=date)
+            cache.set_paged(f"{rank_type}_rankings", cache_data, date=date)
             logger.info(f"💾 Task {task_id}: Cached {rank_type} rankings for {date}")
         
+        # Update task status to completed (only once the results are readable)
+        task_status.update(task_id,
+                           status="completed",
+                           progress=100,
+                           total_pages=current_page,
+                           completed_at=datetime.now())
+        
+        logger.info(f"🎉 Task {task_id}: Completed successfully. Total products: {len(all_products)}, Total pages: {current_page}")
+        
         return all_products, has_next_page, cursor
         
     except Exception as e:
         logger.error(f"💥 Task {task_id}: Failed with error: {str(e)}")
         # Update task status to failed
-        task_status[task_id].status = "failed"
-        task_status[task_id].error_message = str(e)
-        task_status[task_id].completed_at = datetime.now()
+        task_status.update(task_id,
+                           status="failed",
+                           error_message=str(e),
+                           completed_at=datetime.now())
         raise e
 
 
@@ -767,8 +665,9 @@ def scrape_todays_launches_task(task_id: str):
     
     try:
         # Update task status to running
-        task_status[task_id].status = "running"
-        task_status[task_id].created_at = datetime.now()
+        task_status.update(task_id,
+                           status="running",
+                           created_at=datetime.now())
         logger.info(f"📊 Task {task_id} status set to running")
         
         # List to store domains that need resolution
@@ -797,21 +696,12 @@ def scrape_todays_launches_task(task_id: str):
         }
         
         # Use curl_cffi for the main page
-        response = curl_requests.get('https://www.producthunt.com/', headers=headers, impersonate="chrome")
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract data from script tags
-        json_content1 = None
-        for script in soup.find_all('script'):
-            content = script.get_text()
-            if content and content.strip().startswith('(window[Symbol.for("ApolloSSRDataTransport")]'):
-                content = (content.replace('(window[Symbol.for("ApolloSSRDataTransport")] ??= []).push(', '').replace('undefined', 'null'))[:-1]
-                json_content1 = json.loads(content)
-                if json_content1:
-                    logger.info(f"✅ Task {task_id}: Successfully extracted JSON content from homepage")
-                    # with open('homepage_data.json', 'w') as f:
-                    #     json.dump(json_content1, f)
-                break
+        response = http_clients.curl("chrome").get('https://www.producthunt.com/', headers=headers)
+        
+        # Extract the Apollo SSR data pushed by the page's scripts (no DOM parse)
+        json_content1 = extract_apollo_data(response.content)
+        if json_content1:
+            logger.info(f"✅ Task {task_id}: Successfully extracted JSON content from homepage")
         
         if json_content1 and 'events' in json_content1 and len(json_content1['events']) >= 1:
             try:
@@ -938,7 +828,7 @@ def scrape_todays_launches_task(task_id: str):
         
         # Use curl_cffi to make GraphQL API call
         logger.info(f"⏳ Task {task_id}: Fetching GraphQL response...")
-        graphql_response = curl_requests.get(url, headers=headers, impersonate="chrome")
+        graphql_response = http_clients.curl("chrome").get(url, headers=headers)
 
         # print("graphql_response", graphql_response.text)
         
@@ -1092,23 +982,9 @@ def scrape_todays_launches_task(task_id: str):
         
         logger.info(f"📊 Task {task_id}: Combined {len(homepage_products)} homepage products + {len(unique_graphql_products)} unique GraphQL products = {len(all_products)} total")
         
-        # Update task status to completed
-        task_status[task_id].status = "completed"
-        task_status[task_id].progress = 100
-        task_status[task_id].total_pages = 1  # Today's launches is typically one page
-        task_status[task_id].completed_at = datetime.now()
-        task_status[task_id].products_found = len(all_products)
-        
-        logger.info(f"🎉 Task {task_id}: Completed successfully. Total products: {len(all_products)}")
-        
         # Store results
-        result_data = {
-            "products": all_products,
-            "has_next_page": False,  # Today's launches don't have pagination
-            "end_cursor": None
-        }
-        
-        task_results[task_id] = result_data
+        # Today's launches don't have pagination
+        store_task_results(task_id, "products", all_products, has_next_page=False, end_cursor=None)
         
         # Cache the results (convert products to dictionaries for JSON serialization)
         if CACHE_AVAILABLE and cache:
@@ -1121,14 +997,25 @@ def scrape_todays_launches_task(task_id: str):
             cache.set("todays_launches", cache_data)
             logger.info(f"💾 Cached today's launches data for task {task_id}")
         
+        # Update task status to completed (only once the results are readable)
+        task_status.update(task_id,
+                           status="completed",
+                           progress=100,
+                           total_pages=1,  # Today's launches is typically one page
+                           completed_at=datetime.now(),
+                           products_found=len(all_products))
+        
+        logger.info(f"🎉 Task {task_id}: Completed successfully. Total products: {len(all_products)}")
+        
         return all_products, False, None
         
     except Exception as e:
         logger.error(f"💥 Task {task_id}: Failed with error: {str(e)}")
         # Update task status to failed
-        task_status[task_id].status = "failed"
-        task_status[task_id].error_message = str(e)
-        task_status[task_id].completed_at = datetime.now()
+        task_status.update(task_id,
+                           status="failed",
+                           error_message=str(e),
+                           completed_at=datetime.now())
         raise e
 
 
@@ -1387,8 +1274,9 @@ def scrape_categories_task(task_id: str):
     
     try:
         # Update task status to running
-        task_status[task_id].status = "running"
-        task_status[task_id].created_at = datetime.now()
+        task_status.update(task_id,
+                           status="running",
+                           created_at=datetime.now())
         logger.info(f"📊 Task {task_id} status set to running")
         
         # Headers for curl_cffi requests
@@ -1422,7 +1310,7 @@ def scrape_categories_task(task_id: str):
         
         # Use curl_cffi to make GraphQL API call
         logger.info(f"⏳ Task {task_id}: Fetching GraphQL response...")
-        graphql_response = curl_requests.get(url, headers=headers, impersonate="chrome", timeout=30)
+        graphql_response = http_clients.curl("chrome").get(url, headers=headers, timeout=30)
         
         # Parse response - GraphQL endpoint returns JSON directly
         try:
@@ -1492,9 +1380,10 @@ def scrape_categories_task(task_id: str):
         logger.info(f"📊 Task {task_id}: Successfully extracted {len(category_list)} categories")
         
         # Update task status
-        task_status[task_id].current_page = 1
-        task_status[task_id].products_found = len(category_list)
-        task_status[task_id].progress = 100
+        task_status.update(task_id,
+                           current_page=1,
+                           products_found=len(category_list),
+                           progress=100)
         
         # Store results
         result_data = {
@@ -1504,7 +1393,7 @@ def scrape_categories_task(task_id: str):
             "end_cursor": None
         }
         
-        task_results[task_id] = result_data
+        store_task_results(task_id, "categories", result_data["categories"], has_next_page=False, end_cursor=None)
         
         # Cache the results
         if CACHE_AVAILABLE and cache:
@@ -1512,10 +1401,11 @@ def scrape_categories_task(task_id: str):
             logger.info(f"💾 Cached categories data for task {task_id}")
         
         # Update task status to completed
-        task_status[task_id].status = "completed"
-        task_status[task_id].completed_at = datetime.now()
-        task_status[task_id].total_pages = 1
-        task_status[task_id].products_found = len(category_list)
+        task_status.update(task_id,
+                           status="completed",
+                           completed_at=datetime.now(),
+                           total_pages=1,
+                           products_found=len(category_list))
         
         logger.info(f"✅ Task {task_id} completed successfully with {len(category_list)} categories")
         logger.info("=" * 80)
@@ -1531,9 +1421,10 @@ def scrape_categories_task(task_id: str):
         logger.error("=" * 80)
         
         # Update task status to failed
-        task_status[task_id].status = "failed"
-        task_status[task_id].completed_at = datetime.now()
-        task_status[task_id].error_message = str(e)
+        task_status.update(task_id,
+                           status="failed",
+                           completed_at=datetime.now(),
+                           error_message=str(e))
         
         logger.error(f"❌ Task {task_id} failed: {str(e)}")
 
@@ -1546,8 +1437,9 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
     
     try:
         # Update task status to running
-        task_status[task_id].status = "running"
-        task_status[task_id].created_at = datetime.now()
+        task_status.update(task_id,
+                           status="running",
+                           created_at=datetime.now())
         logger.info(f"📊 Task {task_id} status set to running")
         
         all_products = []
@@ -1585,20 +1477,13 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
         logger.info(f"🌐 Fetching category page: {category_url}")
         
         # Use curl_cffi for the initial category page
-        response = curl_requests.get(category_url, headers=headers, impersonate="chrome")
+        response = http_clients.curl("chrome").get(category_url, headers=headers)
         # logger.info("response22", response.text)
         # with open('response22.html', 'w') as f:
         #     f.write(response.text)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract JSON data from Apollo SSR data transport script
-        json_content = None
-        for script in soup.find_all('script'):
-            content = script.get_text()
-            if content and content.strip().startswith('(window[Symbol.for("ApolloSSRDataTransport")]'):
-                content = (content.replace('(window[Symbol.for("ApolloSSRDataTransport")] ??= []).push(', '').replace('undefined', 'null'))[:-1]
-                json_content = json.loads(content)
-                break
+        
+        # Extract JSON data from Apollo SSR data transport script (no DOM parse)
+        json_content = extract_apollo_data(response.content)
         
         if not json_content:
             raise Exception("Could not extract JSON data from ProductHunt category page")
@@ -1618,7 +1503,7 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
                 if product_data:
                     all_products.append(product_data)
                     # Collect product URL for domain scraping
-                    if product_data.url:
+                    if needs_domain_scrape(product_data):
                         product_urls_to_scrape.append((product_data.url, product_data.name))
                     logger.info(f"✅ Extracted product: {product_data.name}")
             except Exception as e:
@@ -1626,8 +1511,9 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
                 continue
         
         current_page += 2
-        task_status[task_id].current_page = current_page
-        task_status[task_id].products_found = len(all_products)
+        task_status.update(task_id,
+                           current_page=current_page,
+                           products_found=len(all_products))
         logger.info(f"📄 Page {current_page} completed - {len(all_products)} products found so far")
             
         # Step 2: Continue with GraphQL pagination
@@ -1651,7 +1537,7 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
             
             # Use curl_cffi to make GraphQL API call
             logger.info(f"⏳ Task {task_id}: Fetching GraphQL response...")
-            graphql_response = curl_requests.get(url, headers=headers, impersonate="chrome", timeout=30)
+            graphql_response = http_clients.curl("chrome").get(url, headers=headers, timeout=30)
 
             # print("resccc", graphql_response.text)
             
@@ -1685,7 +1571,7 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
                     if product_data:
                         all_products.append(product_data)
                         # Collect product URL for domain scraping
-                        if product_data.url:
+                        if needs_domain_scrape(product_data):
                             product_urls_to_scrape.append((product_data.url, product_data.name))
                         logger.info(f"✅ Extracted product: {product_data.name}")
                 except Exception as e:
@@ -1693,9 +1579,10 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
                     continue
             
             current_page += 1
-            task_status[task_id].current_page = current_page
-            task_status[task_id].products_found = len(all_products)
-            task_status[task_id].progress = min(95, (current_page * 100) // 50)  # Estimate 50 pages max
+            task_status.update(task_id,
+                               current_page=current_page,
+                               products_found=len(all_products),
+                               progress=min(95, (current_page * 100) // 50))  # Estimate 50 pages max
             
             logger.info(f"📄 Page {current_page} completed - {len(all_products)} products found so far")
                 
@@ -1729,14 +1616,7 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
         all_products = [update_category_product_domain(product) for product in all_products]
         
         # Store results with updated domains
-        result_data = {
-            "products": [product.dict() for product in all_products],
-            "total_products": len(all_products),
-            "has_next_page": has_next_page,
-            "end_cursor": cursor
-        }
-        
-        task_results[task_id] = result_data
+        store_task_results(task_id, "products", all_products, has_next_page=has_next_page, end_cursor=cursor)
         
         # Cache the results (convert products to dictionaries for JSON serialization)
         if CACHE_AVAILABLE and cache:
@@ -1750,11 +1630,12 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
             logger.info(f"💾 Cached category products data for task {task_id} - {category_slug} (order: {order})")
         
         # Update task status to completed
-        task_status[task_id].status = "completed"
-        task_status[task_id].completed_at = datetime.now()
-        task_status[task_id].progress = 100
-        task_status[task_id].total_pages = current_page
-        task_status[task_id].products_found = len(all_products)
+        task_status.update(task_id,
+                           status="completed",
+                           completed_at=datetime.now(),
+                           progress=100,
+                           total_pages=current_page,
+                           products_found=len(all_products))
         
         logger.info(f"✅ Task {task_id} completed successfully with {len(all_products)} category products")
         logger.info("=" * 80)
@@ -1770,9 +1651,10 @@ def scrape_category_products_task(task_id: str, category_slug: str, order: str =
         logger.error("=" * 80)
         
         # Update task status to failed
-        task_status[task_id].status = "failed"
-        task_status[task_id].completed_at = datetime.now()
-        task_status[task_id].error_message = str(e)
+        task_status.update(task_id,
+                           status="failed",
+                           completed_at=datetime.now(),
+                           error_message=str(e))
         
         logger.error(f"❌ Task {task_id} failed: {str(e)}")
 
@@ -1792,7 +1674,7 @@ def extract_category_product_data(product_node: Dict[str, Any]) -> Optional[Cate
         
         # Extract short URL
         product_id = product_node.get('id')
-        domain = f'https://producthunt.com/r/p/{product_id}' if product_id else None
+        domain = f'{PRODUCT_REDIRECT_PREFIX}{product_id}' if product_id else None
         
         # Extract reviews
         reviews_count = product_node.get('reviewsCount')
@@ -1815,15 +1697,6 @@ def extract_category_product_data(product_node: Dict[str, Any]) -> Optional[Cate
         # Extract description
         description = product_node.get('description')
         
-        # If description is missing, try to fetch it from product detail page
-        if not description and url:
-            try:
-                description = extract_description_from_product_page(url, "category_products")
-                if description:
-                    logger.info(f"✅ Fetched description from product page for: {name}")
-            except Exception as e:
-                logger.debug(f"Could not fetch description from product page for {name}: {str(e)}")
-        
         # Extract media images
         media_images = None
         try:
@@ -1833,15 +1706,18 @@ def extract_category_product_data(product_node: Dict[str, Any]) -> Optional[Cate
         except Exception:
             media_images = None
         
-        # If media images are missing, try to fetch them from product detail page
-        if (not media_images or len(media_images) == 0) and url:
-            try:
-                scraped_media_images = extract_media_images_from_product_page(url, "category_products")
-                if scraped_media_images and len(scraped_media_images) > 0:
-                    media_images = scraped_media_images
-                    logger.info(f"✅ Fetched {len(media_images)} media images from product page for: {name}")
-            except Exception as e:
-                logger.debug(f"Could not fetch media images from product page for {name}: {str(e)}")
+        # If description or media images are missing, fetch the product detail page (once) for both
+        if (not description or not media_images) and url:
+            page = fetch_product_page(url, "category_products")
+            if not description and page.get("description"):
+                description = page["description"]
+                logger.info(f"✅ Fetched description from product page for: {name}")
+            if not media_images and page.get("media_images"):
+                media_images = page["media_images"]
+                logger.info(f"✅ Fetched {len(media_images)} media images from product page for: {name}")
+            # The page already names the website, so the domain stage can skip this product
+            if page.get("website"):
+                domain = page["website"]
         
         # Extract additional metrics
         posts_count = product_node.get('postsCount')
@@ -1868,14 +1744,73 @@ def extract_category_product_data(product_node: Dict[str, Any]) -> Optional[Cate
         return None
 
 
+async def start_rankings_task(rank_type: str, date: str, *task_args) -> Dict[str, Any]:
+    """Queue a rankings scrape, or attach to the one already in flight for the same period.
+
+    Claims and task status live in the shared store, so those round trips run in
+    a thread; the job itself is submitted on the loop.
+    """
+    flight_key = single_flight.make_key("producthunt", rank_type=rank_type, date=date)
+    task_id, coalesced = await asyncio.to_thread(single_flight.claim_task, flight_key, str(uuid.uuid4()))
+    if coalesced:
+        status, queue_position = await asyncio.to_thread(
+            lambda: (task_status.get_field(task_id, "status", "pending"), scheduler.get_queue_position(task_id))
+        )
+        return {
+            "task_id": task_id,
+            "status": status,
+            "date": date,
+            "rank_type": rank_type,
+            "queue_position": queue_position,
+            "status_url": f"/producthunt/status/{task_id}",
+            "coalesced": True
+        }
+
+    await asyncio.to_thread(task_status.__setitem__, task_id, TaskStatus(
+        task_id=task_id,
+        status="pending",
+        created_at=datetime.now()
+    ))
+    
+    logger.info(f"🆔 Created task {task_id} for {rank_type} rankings on {date}")
+    
+    # Start background task
+    try:
+        queue_info = scheduler.submit("producthunt", task_id, scrape_producthunt_data_task, task_id, rank_type, date, *task_args)
+    except Exception:
+        # Full queue (429) or no loop to run on: don't leave a claim that later callers would attach to
+        await asyncio.to_thread(task_status.delete, task_id)
+        await asyncio.to_thread(single_flight.release_task, flight_key, task_id)
+        raise
+    
+    logger.info(f"✅ Task {task_id} queued successfully for {rank_type} rankings")
+    
+    return {
+        "task_id": task_id, 
+        "status": "pending",
+        "date": date,
+        "rank_type": rank_type,
+        "queue_position": queue_info["queue_position"],
+        "status_url": f"/producthunt/status/{task_id}"
+    }
+
+
+async def refresh_stale_rankings(rank_type: str, date: str, *task_args) -> Optional[str]:
+    """Start (or join) the background refresh of stale cached rankings; the stale copy is served either way"""
+    try:
+        return (await start_rankings_task(rank_type, date, *task_args))["task_id"]
+    except HTTPException as e:
+        logger.warning(f"⚠️ Could not queue refresh of {rank_type} rankings for {date}: {e.detail}")
+        return None
+
+
 @router.get("/products/daily")
 async def get_daily_rankings(
     year: int = Query(..., description="Year (e.g., 2024)"),
     month: int = Query(..., description="Month (1-12)"),
     day: int = Query(..., description="Day (1-31)"),
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)")
 ):
     """Get daily ProductHunt rankings for a specific date"""
     
@@ -1884,22 +1819,19 @@ async def get_daily_rankings(
     
     # Check cache first
     if CACHE_AVAILABLE and cache:
-        cached_data = cache.get("daily_rankings", date=date)
+        start_index = (page - 1) * limit
+        # Only the cached chunks covering this page are read and decoded
+        cached_data, page_products, stale = await cache.aget_page("daily_rankings", start_index, start_index + limit, date=date)
         if cached_data:
             logger.info("✅ Returning cached data for daily rankings")
-            
-            # Get all products from cache
-            all_products = cached_data.get("products", [])
-            total_products = len(all_products)
+            # Past its duration: serve it anyway and refresh it once in the background
+            refresh_task_id = await refresh_stale_rankings("daily", date) if stale else None
             
             # Calculate pagination
+            total_products = cached_data.get("total_products", 0)
             total_pages = (total_products + limit - 1) // limit
-            start_index = (page - 1) * limit
             end_index = min(start_index + limit, total_products)
             
-            # Get products for current page
-            page_products = all_products[start_index:end_index]
-            
             # Calculate pagination info
             has_next_page = page < total_pages
             has_previous_page = page > 1
@@ -1923,39 +1855,20 @@ async def get_daily_rankings(
                 },
                 "date": date,
                 "rank_type": "daily",
-                "scraped_at": cached_data.get("scraped_at")
+                "scraped_at": cached_data.get("scraped_at"),
+                "stale": stale,
+                "refresh_task_id": refresh_task_id
             }
     
-    # If no cache, start scraping
-    task_id = str(uuid.uuid4())
-    task_status[task_id] = TaskStatus(
-        task_id=task_id,
-        status="pending",
-        created_at=datetime.now()
-    )
-    
-    logger.info(f"🆔 Created task {task_id} for daily rankings on {date}")
-    
-    # Start background task
-    background_tasks.add_task(scrape_producthunt_data_task, task_id, "daily", date)
-    
-    logger.info(f"✅ Task {task_id} queued successfully for daily rankings")
-    
-    return {
-        "task_id": task_id, 
-        "status": "pending",
-        "date": date,
-        "rank_type": "daily",
-        "status_url": f"/producthunt/status/{task_id}"
-    }
+    # If no cache, start scraping - unless a scrape of the same daily rankings is already in flight
+    return await start_rankings_task("daily", date)
 
 @router.get("/products/weekly")
 async def get_weekly_rankings(
     year: int = Query(..., description="Year (e.g., 2024)"),
     week: int = Query(..., description="Week number (1-52)"),
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)")
 ):
     """Get weekly ProductHunt rankings for a specific year and week"""
     
@@ -1964,22 +1877,19 @@ async def get_weekly_rankings(
     
     # Check cache first
     if CACHE_AVAILABLE and cache:
-        cached_data = cache.get("weekly_rankings", date=date)
+        start_index = (page - 1) * limit
+        # Only the cached chunks covering this page are read and decoded
+        cached_data, page_products, stale = await cache.aget_page("weekly_rankings", start_index, start_index + limit, date=date)
         if cached_data:
             logger.info("✅ Returning cached data for weekly rankings")
-            
-            # Get all products from cache
-            all_products = cached_data.get("products", [])
-            total_products = len(all_products)
+            # Past its duration: serve it anyway and refresh it once in the background
+            refresh_task_id = await refresh_stale_rankings("weekly", date) if stale else None
             
             # Calculate pagination
+            total_products = cached_data.get("total_products", 0)
             total_pages = (total_products + limit - 1) // limit
-            start_index = (page - 1) * limit
             end_index = min(start_index + limit, total_products)
             
-            # Get products for current page
-            page_products = all_products[start_index:end_index]
-            
             # Calculate pagination info
             has_next_page = page < total_pages
             has_previous_page = page > 1
@@ -2003,39 +1913,20 @@ async def get_weekly_rankings(
                 },
                 "date": date,
                 "rank_type": "weekly",
-                "scraped_at": cached_data.get("scraped_at")
+                "scraped_at": cached_data.get("scraped_at"),
+                "stale": stale,
+                "refresh_task_id": refresh_task_id
             }
     
-    # If no cache, start scraping
-    task_id = str(uuid.uuid4())
-    task_status[task_id] = TaskStatus(
-        task_id=task_id,
-        status="pending",
-        created_at=datetime.now()
-    )
-    
-    logger.info(f"🆔 Created task {task_id} for weekly rankings on {date}")
-    
-    # Start background task
-    background_tasks.add_task(scrape_producthunt_data_task, task_id, "weekly", date)
-    
-    logger.info(f"✅ Task {task_id} queued successfully for weekly rankings")
-    
-    return {
-        "task_id": task_id, 
-        "status": "pending",
-        "date": date,
-        "rank_type": "weekly",
-        "status_url": f"/producthunt/status/{task_id}"
-    }
+    # If no cache, start scraping - unless a scrape of the same weekly rankings is already in flight
+    return await start_rankings_task("weekly", date)
 
 @router.get("/products/monthly")
 async def get_monthly_rankings(
     year: int = Query(..., description="Year (e.g., 2024)"),
     month: int = Query(..., description="Month (1-12)"),
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)")
 ):
     """Get monthly ProductHunt rankings for a specific year and month"""
     
@@ -2044,22 +1935,19 @@ async def get_monthly_rankings(
     
     # Check cache first
     if CACHE_AVAILABLE and cache:
-        cached_data = cache.get("monthly_rankings", date=date)
+        start_index = (page - 1) * limit
+        # Only the cached chunks covering this page are read and decoded
+        cached_data, page_products, stale = await cache.aget_page("monthly_rankings", start_index, start_index + limit, date=date)
         if cached_data:
             logger.info("✅ Returning cached data for monthly rankings")
-            
-            # Get all products from cache
-            all_products = cached_data.get("products", [])
-            total_products = len(all_products)
+            # Past its duration: serve it anyway and refresh it once in the background
+            refresh_task_id = await refresh_stale_rankings("monthly", date, 100) if stale else None
             
             # Calculate pagination
+            total_products = cached_data.get("total_products", 0)
             total_pages = (total_products + limit - 1) // limit
-            start_index = (page - 1) * limit
             end_index = min(start_index + limit, total_products)
             
-            # Get products for current page
-            page_products = all_products[start_index:end_index]
-            
             # Calculate pagination info
             has_next_page = page < total_pages
             has_previous_page = page > 1
@@ -2083,38 +1971,19 @@ async def get_monthly_rankings(
                 },
                 "date": date,
                 "rank_type": "monthly",
-                "scraped_at": cached_data.get("scraped_at")
+                "scraped_at": cached_data.get("scraped_at"),
+                "stale": stale,
+                "refresh_task_id": refresh_task_id
             }
     
-    # If no cache, start scraping
-    task_id = str(uuid.uuid4())
-    task_status[task_id] = TaskStatus(
-        task_id=task_id,
-        status="pending",
-        created_at=datetime.now()
-    )
-    
-    logger.info(f"🆔 Created task {task_id} for monthly rankings on {date}")
-    
-    # Use higher max_pages for monthly data since it can be larger
-    background_tasks.add_task(scrape_producthunt_data_task, task_id, "monthly", date, 100)
-    
-    logger.info(f"✅ Task {task_id} queued successfully for monthly rankings")
-    
-    return {
-        "task_id": task_id, 
-        "status": "pending",
-        "date": date,
-        "rank_type": "monthly",
-        "status_url": f"/producthunt/status/{task_id}"
-    }
+    # If no cache, start scraping - unless a scrape of the same monthly rankings is already in flight
+    return await start_rankings_task("monthly", date, 100)
 
 @router.get("/products/yearly")
 async def get_yearly_rankings(
     year: int = Query(..., description="Year (e.g., 2024)"),
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)")
 ):
     """Get yearly ProductHunt rankings for a specific year"""
     
@@ -2123,22 +1992,19 @@ async def get_yearly_rankings(
     
     # Check cache first
     if CACHE_AVAILABLE and cache:
-        cached_data = cache.get("yearly_rankings", date=date)
+        start_index = (page - 1) * limit
+        # Only the cached chunks covering this page are read and decoded
+        cached_data, page_products, stale = await cache.aget_page("yearly_rankings", start_index, start_index + limit, date=date)
         if cached_data:
             logger.info("✅ Returning cached data for yearly rankings")
-            
-            # Get all products from cache
-            all_products = cached_data.get("products", [])
-            total_products = len(all_products)
+            # Past its duration: serve it anyway and refresh it once in the background
+            refresh_task_id = await refresh_stale_rankings("yearly", date) if stale else None
             
             # Calculate pagination
+            total_products = cached_data.get("total_products", 0)
             total_pages = (total_products + limit - 1) // limit
-            start_index = (page - 1) * limit
             end_index = min(start_index + limit, total_products)
             
-            # Get products for current page
-            page_products = all_products[start_index:end_index]
-            
             # Calculate pagination info
             has_next_page = page < total_pages
             has_previous_page = page > 1
@@ -2162,37 +2028,66 @@ async def get_yearly_rankings(
                 },
                 "date": date,
                 "rank_type": "yearly",
-                "scraped_at": cached_data.get("scraped_at")
+                "scraped_at": cached_data.get("scraped_at"),
+                "stale": stale,
+                "refresh_task_id": refresh_task_id
             }
     
-    # If no cache, start scraping
-    task_id = str(uuid.uuid4())
+    # If no cache, start scraping - unless a scrape of the same yearly rankings is already in flight
+    return await start_rankings_task("yearly", date)
+
+def start_todays_launches_task() -> Dict[str, Any]:
+    """Queue a scrape of today's launches, or attach to the one already in flight"""
+    flight_key = single_flight.make_key("producthunt", rank_type="todays_launches",
+                                        hour=datetime.now().strftime("%Y-%m-%d:%H"))
+    task_id, coalesced = single_flight.claim_task(flight_key, str(uuid.uuid4()))
+    if coalesced:
+        return {
+            "task_id": task_id,
+            "status": task_status.get_field(task_id, "status", "pending"),
+            "date": datetime.now().strftime("%Y-%m-%d"),
+            "rank_type": "todays_launches",
+            "queue_position": scheduler.get_queue_position(task_id),
+            "status_url": f"/producthunt/status/{task_id}",
+            "coalesced": True
+        }
+    
+    # Initialize task status
     task_status[task_id] = TaskStatus(
         task_id=task_id,
         status="pending",
-        created_at=datetime.now()
+        created_at=datetime.now(),
+        progress=0,
+        total_pages=1,
+        current_page=0
     )
     
-    logger.info(f"🆔 Created task {task_id} for yearly rankings on {date}")
-    
-    # Start background task
-    background_tasks.add_task(scrape_producthunt_data_task, task_id, "yearly", date)
+    # Start background task immediately
+    try:
+        queue_info = scheduler.submit("producthunt", task_id, scrape_todays_launches_task, task_id)
+    except Exception:
+        # Full queue (429) or no loop to run on: don't leave a claim that later callers would attach to
+        task_status.delete(task_id)
+        single_flight.release_task(flight_key, task_id)
+        raise
     
-    logger.info(f"✅ Task {task_id} queued successfully for yearly rankings")
+    logger.info(f"✅ Task {task_id} queued successfully for today's launches")
     
+    # Return immediately with task ID
     return {
-        "task_id": task_id, 
+        "task_id": task_id,
         "status": "pending",
-        "date": date,
-        "rank_type": "yearly",
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "rank_type": "todays_launches",
+        "queue_position": queue_info["queue_position"],
         "status_url": f"/producthunt/status/{task_id}"
     }
 
+
 @router.get("/todays_launches")
 async def get_todays_launches(
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)")
 ):
     """Get today's ProductHunt launches"""
     
@@ -2246,32 +2141,8 @@ async def get_todays_launches(
                 }
             }
     
-    # If no cache, start scraping
-    task_id = str(uuid.uuid4())
-    
-    # Initialize task status
-    task_status[task_id] = TaskStatus(
-        task_id=task_id,
-        status="pending",
-        created_at=datetime.now(),
-        progress=0,
-        total_pages=1,
-        current_page=0
-    )
-    
-    # Start background task immediately
-    background_tasks.add_task(scrape_todays_launches_task, task_id)
-    
-    logger.info(f"✅ Task {task_id} queued successfully for today's launches")
-    
-    # Return immediately with task ID
-    return {
-        "task_id": task_id,
-        "status": "pending",
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "rank_type": "todays_launches",
-        "status_url": f"/producthunt/status/{task_id}"
-    }
+    # If no cache, start scraping - unless today's launches are already being scraped
+    return start_todays_launches_task()
 
 
 # @router.get("/upcoming_launches")
@@ -2411,7 +2282,7 @@ async def get_categories():
         
         # Use curl_cffi to make GraphQL API call
         logger.info("⏳ Fetching GraphQL response...")
-        graphql_response = curl_requests.get(url, headers=headers, impersonate="chrome", timeout=30)
+        graphql_response = await http_clients.async_curl("chrome").get(url, headers=headers, timeout=30)
         
         # Parse response - GraphQL endpoint returns JSON directly
         try:
@@ -2509,13 +2380,65 @@ async def get_categories():
         raise HTTPException(status_code=500, detail=f"Failed to scrape categories: {str(e)}")
 
 
+# Cache warm-up: everyone asks for yesterday, today and this week, so the
+# warmer keeps those keys filled and clients never hit a cold cache on them
+
+async def warm_rankings(rank_type: str, date: str) -> Dict[str, Any]:
+    """Queue a rankings scrape unless a fresh copy is already cached (runs on the loop, like a route handler)"""
+    cached_data, stale = await asyncio.to_thread(cache.get_stale, f"{rank_type}_rankings", date=date)
+    if cached_data and not stale:
+        return {"date": date, "action": "fresh"}
+    try:
+        task = await start_rankings_task(rank_type, date)
+    except HTTPException as e:
+        return {"date": date, "action": "deferred", "reason": e.detail}
+    return {"date": date, "action": "attached" if task.get("coalesced") else "queued", "task_id": task["task_id"]}
+
+
+async def warm_daily_today() -> Dict[str, Any]:
+    return await warm_rankings("daily", datetime.now().strftime("%Y/%m/%d"))
+
+
+async def warm_daily_yesterday() -> Dict[str, Any]:
+    return await warm_rankings("daily", (datetime.now() - timedelta(days=1)).strftime("%Y/%m/%d"))
+
+
+async def warm_weekly_current() -> Dict[str, Any]:
+    year, week, _ = datetime.now().isocalendar()
+    return await warm_rankings("weekly", f"{year}/{week}")
+
+
+async def warm_todays_launches() -> Dict[str, Any]:
+    if await asyncio.to_thread(cache.get, "todays_launches"):
+        return {"action": "fresh"}
+    try:
+        task = start_todays_launches_task()
+    except HTTPException as e:
+        return {"action": "deferred", "reason": e.detail}
+    return {"action": "attached" if task.get("coalesced") else "queued", "task_id": task["task_id"]}
+
+
+async def warm_categories() -> Dict[str, Any]:
+    result = await get_categories()
+    return {"action": "fresh" if result["cached"] else "scraped", "total_categories": result["total_categories"]}
+
+
+if CACHE_AVAILABLE and cache:
+    # Today's rankings go stale after 15 minutes; the other keys are hourly
+    cache_warmer.register("producthunt:daily_today", warm_daily_today, every=900, jitter=60)
+    cache_warmer.register("producthunt:daily_yesterday", warm_daily_yesterday, every=3600, offset=300, jitter=120)
+    cache_warmer.register("producthunt:weekly_current", warm_weekly_current, every=3600, offset=600, jitter=120)
+    # Launch keys are per hour, so fill the new one a minute into the hour
+    cache_warmer.register("producthunt:todays_launches", warm_todays_launches, every=3600, offset=60, jitter=30)
+    cache_warmer.register("producthunt:categories", warm_categories, every=3600, offset=900, jitter=120)
+
+
 @router.get("/category_products")
 async def get_category_products(
     category_slug: str = Query(..., description="Category slug (e.g., ai-notetakers)"),
     order: str = Query(default="highest_rated", description="Order: highest_rated, top_free, best_rated, recent_launches, trending"),
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    limit: int = Query(default=100, ge=1, le=300, description="Number of products per page (max 300)")
 ):
     """Get ProductHunt products from a specific category with specified ordering"""
     
@@ -2590,7 +2513,11 @@ async def get_category_products(
     logger.info(f"🆔 Created task {task_id} for category products")
     
     # Start background task
-    background_tasks.add_task(scrape_category_products_task, task_id, category_slug, order)
+    try:
+        queue_info = scheduler.submit("producthunt", task_id, scrape_category_products_task, task_id, category_slug, order)
+    except HTTPException:
+        task_status.delete(task_id)
+        raise
     
     logger.info(f"✅ Task {task_id} queued successfully for category products")
     
@@ -2601,6 +2528,7 @@ async def get_category_products(
         "order": order,
         "date": datetime.now().strftime("%Y-%m-%d"),
         "rank_type": "category_products",
+        "queue_position": queue_info["queue_position"],
         "status_url": f"/producthunt/status/{task_id}"
     }
 
@@ -2635,34 +2563,31 @@ async def get_task_result(
             "error_message": task.error_message,
             "created_at": task.created_at.isoformat() if task.created_at else None,
             "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+            "queue_position": scheduler.get_queue_position(task_id),
         }
     
     # Task is completed and results are available - return paginated data
     result = task_results[task_id]
     
     # Handle both products and categories
-    if "products" in result:
+    item_type = result.get("item_type")
+    if item_type == "products":
         # Product results
-        all_items = result["products"]
-        total_items = len(all_items)
-        item_type = "products"
         total_items_key = "total_products"
         items_per_page_key = "products_per_page"
-    elif "categories" in result:
+    elif item_type == "categories":
         # Category results
-        all_items = result["categories"]
-        total_items = len(all_items)
-        item_type = "categories"
         total_items_key = "total_categories"
         items_per_page_key = "categories_per_page"
     else:
-        logger.error(f"❌ Task {task_id} results contain neither 'products' nor 'categories' key")
+        logger.error(f"❌ Task {task_id} results contain neither products nor categories")
         raise HTTPException(status_code=500, detail="Invalid result format")
+    total_items = task_results.count_results(task_id)
     
     # Calculate pagination
     start_index = (page - 1) * limit
     end_index = start_index + limit
-    current_page_items = all_items[start_index:end_index]
+    current_page_items = task_results.get_results(task_id, start_index, end_index)
     
     # Calculate pagination metadata
     total_pages = (total_items + limit - 1) // limit  # Ceiling division
@@ -2735,6 +2660,7 @@ async def get_api_info():
             "/results/{task_id}": "Get task status or paginated scraping results",
             "/health": "Health check endpoint",
             "/cache/clear?endpoint_slug=X": "Clear cache for a specific endpoint (or all cache if no slug provided)",
+            "/cache/stats?cursor=0&count=500": "Cache keys, TTLs and memory use, one SCAN page at a time",
         },
         "cache_available": CACHE_AVAILABLE and cache is not None,
         "health": health_status,
@@ -2765,9 +2691,25 @@ async def health_check():
     
     return health_status
 
+@router.get("/cache/stats")
+async def cache_stats(
+    cursor: int = Query(default=0, ge=0, description="SCAN cursor from the previous page's next_cursor (0 to start)"),
+    count: int = Query(default=500, ge=1, le=5000, description="Approximate number of keys to examine per page")
+):
+    """Keys by type, TTLs and memory use for one page of ProductHunt cache keys"""
+    logger.info(f"🌐 API ENDPOINT: /cache/stats (cursor={cursor})")
+
+    if not CACHE_AVAILABLE or not cache or not cache.redis_client:
+        raise HTTPException(status_code=503, detail="Cache not available")
+
+    stats = await asyncio.to_thread(cache.get_cache_stats, cursor, count)
+    if "error" in stats:
+        raise HTTPException(status_code=500, detail=f"Cache stats error: {stats['error']}")
+    return stats
+
 @router.delete("/cache/clear")
 async def clear_cache(
-    endpoint_slug: Optional[str] = Query(None, description="Optional endpoint slug to clear cache for. Options: daily_rankings, weekly_rankings, monthly_rankings, yearly_rankings, todays_launches, upcoming_launches, categories, category_products. If not provided, clears all cache.")
+    endpoint_slug: Optional[str] = Query(None, description="Optional endpoint slug to clear cache for. Options: daily_rankings, weekly_rankings, monthly_rankings, yearly_rankings, todays_launches, upcoming_launches, categories, category_products, product_page. If not provided, clears all cache.")
 ):
     """Clear cache for a specific endpoint or all cache if no slug provided"""
     logger.info(f"🌐 API ENDPOINT: /cache/clear")
@@ -2778,7 +2720,7 @@ async def clear_cache(
     # If no endpoint_slug provided, clear all cache
     if endpoint_slug is None:
         logger.info(f"📥 Cache clear request: ALL cache")
-        success = cache.clear_all()
+        success = await asyncio.to_thread(cache.clear_all)
         logger.info(f"✅ Cache clear {'completed' if success else 'failed'}")
         
         return {
@@ -2801,7 +2743,8 @@ async def clear_cache(
         "todays_launches",
         "upcoming_launches",
         "categories",
-        "category_products"
+        "category_products",
+        "product_page"
     ]
     
     if endpoint_slug not in valid_endpoints:
@@ -2830,11 +2773,10 @@ async def clear_cache(
         else:
             pattern = f"producthunt:{endpoint_slug}:*"
         
-        # Find all keys matching the pattern
-        keys = cache.redis_client.keys(pattern)
+        # Delete matching keys (this worker's local tier included)
+        deleted_count = await asyncio.to_thread(cache.backend.clear_pattern, pattern)
         
-        if keys:
-            deleted_count = cache.redis_client.delete(*keys)
+        if deleted_count:
             logger.info(f"✅ Cleared {deleted_count} cache entries for endpoint '{endpoint_slug}' (pattern: {pattern})")
             return {
                 "message": f"Cache cleared successfully for endpoint '{endpoint_slug}'",
@@ -0,0 +1,124 @@
+"""
+Rate Limiter
+
+Token buckets that pace requests to an upstream host.
+
+Scrapers used to wait a fixed ``time.sleep(1)`` after every page. That is slow
+when the upstream is idle, and it doesn't hold back concurrent tasks hitting
+the same host. Each named bucket refills at ``rate`` tokens per second, up to
+``burst`` tokens. Every request takes one token, and callers wait only when the
+bucket is empty:
+
+    await rate_limits.bucket("producthunt_graphql").acquire()
+
+Buckets are thread-safe and not tied to an event loop, so every scraping task
+in the process shares them, whichever scheduler thread (and loop) it runs on.
+Tokens are handed out in order; a caller that finds the bucket empty reserves
+the next token and sleeps until it is due.
+
+Limits are per API process. Override them with ``RATE_LIMITS``, for example
+``"producthunt_graphql=4/8"`` (rate per second / burst).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default limits per bucket: (tokens per second, burst)
+BUCKET_LIMITS = {
+    "producthunt_graphql": (2.0, 4),
+}
+DEFAULT_LIMIT = (1.0, 1)
+
+
+def _parse_limits(value: str) -> Dict[str, Tuple[float, int]]:
+    """Parse ``"producthunt_graphql=4/8"`` into ``{"producthunt_graphql": (4.0, 8)}``"""
+    limits = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        name, limit = item.split("=", 1)
+        try:
+            rate, _, burst = limit.partition("/")
+            limits[name.strip()] = (max(0.01, float(rate)), max(1, int(burst or 1)))
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid rate limit: {item}")
+    return limits
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``"""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats_counters = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    def _reserve(self) -> float:
+        """Take a token (possibly one that isn't there yet); returns how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.stats_counters["acquired"] += 1
+            if wait:
+                self.stats_counters["waited"] += 1
+                self.stats_counters["wait_seconds"] += wait
+            return wait
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tokens = min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate)
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "tokens": round(tokens, 2),
+                **self.stats_counters,
+                "wait_seconds": round(self.stats_counters["wait_seconds"], 3),
+            }
+
+
+class RateLimits:
+    """Named token buckets for the process, created on first use"""
+
+    def __init__(self):
+        self.limits = {**BUCKET_LIMITS, **_parse_limits(os.getenv("RATE_LIMITS", ""))}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name: str) -> TokenBucket:
+        with self._lock:
+            if name not in self.buckets:
+                rate, burst = self.limits.get(name, DEFAULT_LIMIT)
+                self.buckets[name] = TokenBucket(name, rate, burst)
+            return self.buckets[name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {name: bucket.get_stats() for name, bucket in buckets.items()}
+
+
+# Global instance (one per process)
+rate_limits = RateLimits()
@@ -4,12 +4,15 @@ Realtor.com Real Estate Search Router
 
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
-import curl_cffi
+from curl_cffi.requests import RequestsError
 import json
 import logging
 from typing import Optional
 from datetime import datetime, timedelta
 
+from http_clients import http_clients
+from redis_cache import response_cache
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -435,7 +438,7 @@ def get_graphql_query(search_type: str) -> str:
         raise ValueError(f"Invalid search_type: {search_type}")
 
 
-def search_realtor_properties(
+async def search_realtor_properties(
     location: str,
     search_type: str = 'for_sale',
     limit: int = 64,
@@ -610,7 +613,7 @@ def search_realtor_properties(
     
     try:
         headers = get_headers(search_type)
-        response = curl_cffi.post(
+        response = await http_clients.async_curl("default").post(
             'https://www.realtor.com/frontdoor/graphql',
             headers=headers,
             json=json_data,
@@ -676,7 +679,7 @@ def search_realtor_properties(
             }
         }
         
-    except curl_cffi.exceptions.RequestException as e:
+    except RequestsError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching data from Realtor.com: {str(e)}")
     except json.JSONDecodeError as e:
@@ -688,6 +691,7 @@ def search_realtor_properties(
 
 
 @router.get("/for-sale")
+@response_cache.cached("realtor:for_sale", ttl=1800)  # 30 minutes
 async def search_for_sale(
     location: str = Query(..., description="Location to search (e.g., 'New York', 'Austin TX')"),
     limit: int = Query(64, description="Maximum number of results per page", ge=1, le=200),
@@ -709,7 +713,7 @@ async def search_for_sale(
     Search Realtor.com properties for sale with advanced filters.
     """
     try:
-        result = search_realtor_properties(
+        result = await search_realtor_properties(
             location=location,
             search_type='for_sale',
             limit=limit,
@@ -736,6 +740,7 @@ async def search_for_sale(
 
 
 @router.get("/for-rent")
+@response_cache.cached("realtor:for_rent", ttl=1800)  # 30 minutes
 async def search_for_rent(
     location: str = Query(..., description="Location to search (e.g., 'New York', 'Austin TX')"),
     limit: int = Query(64, description="Maximum number of results per page", ge=1, le=200),
@@ -755,7 +760,7 @@ async def search_for_rent(
     Search Realtor.com properties for rent with advanced filters.
     """
     try:
-        result = search_realtor_properties(
+        result = await search_realtor_properties(
             location=location,
             search_type='for_rent',
             limit=limit,
@@ -780,6 +785,7 @@ async def search_for_rent(
 
 
 @router.get("/sold")
+@response_cache.cached("realtor:sold", ttl=1800)  # 30 minutes
 async def search_sold(
     location: str = Query(..., description="Location to search (e.g., 'New York', 'Austin TX')"),
     limit: int = Query(64, description="Maximum number of results per page", ge=1, le=200),
@@ -803,7 +809,7 @@ async def search_sold(
     Search Realtor.com sold properties with advanced filters.
     """
     try:
-        result = search_realtor_properties(
+        result = await search_realtor_properties(
             location=location,
             search_type='sold',
             limit=limit,
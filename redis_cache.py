@@ -1,303 +1,979 @@
+"""
+Redis Cache
+
+Response cache shared by every router.
+
+Each cached endpoint registers a ``CachePolicy``: a key builder that turns the
+request parameters into a Redis key, and a TTL policy (seconds, ``0`` for
+permanent, ``None`` to skip caching). A policy can also give a stale window.
+Entries are then kept that much longer past their TTL, and ``get_stale`` serves
+them flagged as stale while the caller refreshes them in the background.
+Lookups go through two tiers:
+
+- local - a process-local LRU of decoded values, so hot keys are served without
+  a Redis round trip or a JSON parse. It is bounded by the encoded size of the
+  values it holds (``CACHE_LOCAL_MAX_BYTES``).
+- redis - the shared tier every worker reads and writes
+
+Every set, delete and clear is published on ``CACHE_INVALIDATION_CHANNEL``. Each
+worker listens in a background thread and drops its local copy, so workers
+stay consistent. Local entries also expire after ``CACHE_LOCAL_TTL`` seconds,
+which bounds staleness if an invalidation message is missed.
+
+Routers cache whole responses with the ``cached`` decorator:
+
+    @router.get("/website-info")
+    @response_cache.cached("similarweb:website_info", ttl=604800)
+    async def get_website_info(domain: str = Query(...)):
+        ...
+
+ProductHunt keeps its own key layout (``producthunt:rankings:...``) and
+period-aware durations through ``ProductHuntCache``, which registers its
+endpoints on the shared cache. ``DomainCache`` does the same for the URL ->
+website-domain lookups the ProductHunt scrapers make, reading and writing
+whole batches with ``get_many`` (one MGET) and ``set_many`` (one pipeline).
+Large lists can be stored page-addressably with ``set_paged`` and read back
+a page at a time with ``get_page``, which decodes only the chunks it needs.
+Values handed out by the cache are shared
+between callers and must be treated as read-only. Values are stored in Redis
+through ``cache_codec`` (compressed binary, readable back to plain JSON text).
+"""
+
 import redis
+import asyncio
+import functools
+import inspect
 import json
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Union
+from fnmatch import fnmatchcase
+from typing import Optional, Dict, Any, Union, Callable, Tuple, List
 import logging
 from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from cache_codec import cache_codec
+from single_flight import params_digest
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-class ProductHuntCache:
-    """Redis cache implementation for ProductHunt API"""
-    # os.getenv('REDIS_HOST_I') or
+CONFIG = {
+    'local_max_bytes': int(os.getenv('CACHE_LOCAL_MAX_BYTES', 64 * 1024 * 1024)),
+    'local_ttl': float(os.getenv('CACHE_LOCAL_TTL', 300)),
+    'invalidation_channel': os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate'),
+    'scan_count': int(os.getenv('CACHE_SCAN_COUNT', 500)),
+    'page_chunk_size': int(os.getenv('CACHE_PAGE_CHUNK_SIZE', 50)),
+    'default_ttl': int(os.getenv('CACHE_DEFAULT_TTL', 3600)),
+    'domain_ttl': int(os.getenv('CACHE_DOMAIN_TTL', 30 * 86400)),
+    'domain_negative_ttl': int(os.getenv('CACHE_DOMAIN_NEGATIVE_TTL', 3600)),
+}
+
+TTL = Union[int, None, Callable[..., Optional[int]]]
+
+
+class CachePolicy:
+    """How one endpoint is cached: where its keys live and how long they last"""
+
+    def __init__(self, endpoint: str, key: Optional[Callable[..., str]] = None,
+                 ttl: TTL = CONFIG['default_ttl'], cache_empty: bool = False, stale_ttl: TTL = 0):
+        self.endpoint = endpoint
+        self.key = key
+        self.ttl = ttl
+        self.cache_empty = cache_empty
+        self.stale_ttl = stale_ttl
+
+    def build_key(self, **params) -> str:
+        if self.key is None:
+            return f"{self.endpoint}:{params_digest(**params)}"
+        return self.key(**params)
+
+    def get_ttl(self, **params) -> Optional[int]:
+        return self.ttl(**params) if callable(self.ttl) else self.ttl
+
+    def get_stale_ttl(self, **params) -> int:
+        """Seconds an entry may still be served (as stale) after its TTL"""
+        return (self.stale_ttl(**params) if callable(self.stale_ttl) else self.stale_ttl) or 0
+
+
+class LocalCache:
+    """Process-local LRU of decoded values, bounded by their encoded size in bytes"""
+
+    def __init__(self, max_bytes: int = CONFIG['local_max_bytes']):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats_counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.stats_counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats_counters["hits"] += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, size: int):
+        """Hold ``value`` for ``ttl`` seconds; ``size`` is its encoded length"""
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats_counters["evictions"] += 1
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._drop(key):
+                self.stats_counters["invalidations"] += 1
+
+    def clear(self, pattern: str = "*") -> int:
+        """Drop entries whose key matches the glob ``pattern``"""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatchcase(key, pattern)]
+            for key in keys:
+                self._drop(key)
+            self.stats_counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self.stats_counters,
+            }
+
+
+class ResponseCache:
+    """Local LRU + Redis cache for any endpoint with a registered policy"""
+
     def __init__(self):
         # Redis connection configuration
         self.redis_host = os.getenv('REDIS_HOST_I') or os.getenv('REDIS_HOST_P')
         self.redis_port = int(os.getenv('REDIS_PORT', 6379))
         self.redis_password = os.getenv('REDIS_PASSWORD', None)
         self.redis_db = int(os.getenv('REDIS_DB', 1))
-        
-        # Cache duration mapping (in seconds)
-        self.CACHE_DURATIONS = {
-            # Date-based endpoints
-            "daily_rankings_today": 0,           # No cache for today
-            "daily_rankings_historical": 0,      # Permanent for other days
-            "weekly_rankings_current": 86400,    # 24 hours for this week
-            "weekly_rankings_historical": 0,     # Permanent for past weeks
-            "monthly_rankings_current": 604800,  # 7 days for this month
-            "monthly_rankings_historical": 0,    # Permanent for past months
-            "yearly_rankings_current": 2592000,  # 30 days for this year
-            "yearly_rankings_historical": 0,     # Permanent for past years
-            
-            # Non-date endpoints
-            "todays_launches": 3600,             # 1 hour
-            "upcoming_launches": 21600,          # 6 hours
-            "categories": 2592000,               # 30 days
-            "category_products": 86400,          # 24 hours
-        }
-        
+
+        self.policies: Dict[str, CachePolicy] = {}
+        self.local = LocalCache()
+        self.codec = cache_codec
+        self.stats_counters = {"hits": 0, "misses": 0, "stale_hits": 0, "sets": 0, "errors": 0,
+                               "bytes_stored": 0, "bytes_serialized": 0}
+        self._listener_lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._origin = uuid.uuid4().hex
+
         # Initialize Redis connection
         try:
-            self.redis_client = redis.Redis(
-                host=self.redis_host,
-                port=self.redis_port,
-                password=self.redis_password,
-                db=self.redis_db,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
-            )
+            self.redis_client = self._connect(decode_responses=True)
             # Test connection
             self.redis_client.ping()
+            # Cached values are binary (see cache_codec); keys and admin commands stay text
+            self.value_client = self._connect(decode_responses=False)
             logger.info("✅ Redis connection established successfully")
         except Exception as e:
             logger.error(f"❌ Failed to connect to Redis: {str(e)}")
             self.redis_client = None
-    
+            self.value_client = None
+
+    def _connect(self, decode_responses: bool) -> redis.Redis:
+        return redis.Redis(
+            host=self.redis_host,
+            port=self.redis_port,
+            password=self.redis_password,
+            db=self.redis_db,
+            decode_responses=decode_responses,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+
+    def register(self, endpoint: str, key: Optional[Callable[..., str]] = None,
+                 ttl: TTL = CONFIG['default_ttl'], cache_empty: bool = False, stale_ttl: TTL = 0) -> CachePolicy:
+        """Register (or replace) the key builder and TTL policy for ``endpoint``"""
+        policy = CachePolicy(endpoint, key=key, ttl=ttl, cache_empty=cache_empty, stale_ttl=stale_ttl)
+        self.policies[endpoint] = policy
+        return policy
+
+    def _policy(self, endpoint: str) -> CachePolicy:
+        return self.policies.get(endpoint) or CachePolicy(endpoint)
+
+    @staticmethod
+    def _local_ttl(ttl: Optional[int]) -> float:
+        # Permanent Redis entries still expire locally so other workers' updates show up
+        if ttl is None:
+            return 0
+        return min(CONFIG['local_ttl'], ttl) if ttl > 0 else CONFIG['local_ttl']
+
+    def _get_remote(self, cache_key: str, stale_ttl: int) -> Tuple[Optional[bytes], Optional[float]]:
+        """Return ``(blob, fresh_until)``; ``fresh_until`` is None for entries that never go stale"""
+        if not stale_ttl:
+            cached_data = self.value_client.get(cache_key)
+            fresh_until = None
+        else:
+            # The Redis TTL includes the stale window; the value is fresh until that window starts
+            pipe = self.value_client.pipeline(transaction=False)
+            pipe.get(cache_key)
+            pipe.ttl(cache_key)
+            cached_data, remaining = pipe.execute()
+            fresh_until = time.time() + remaining - stale_ttl if remaining and remaining > 0 else None
+        self.stats_counters["misses" if cached_data is None else "hits"] += 1
+        return cached_data, fresh_until
+
+    def _set_remote(self, cache_key: str, blob: bytes, cache_duration: int):
+        if cache_duration > 0:
+            # Use SETEX for automatic expiration (Redis TTL)
+            self.value_client.setex(cache_key, cache_duration, blob)
+        else:
+            # Use SET for permanent storage (no expiration)
+            self.value_client.set(cache_key, blob)
+        self._publish(key=cache_key)
+
+    def _publish(self, **message):
+        """Tell the other workers to drop their local copy of a key (or pattern)"""
+        try:
+            self.redis_client.publish(CONFIG['invalidation_channel'], json.dumps({"origin": self._origin, **message}))
+        except Exception as e:
+            logger.warning(f"⚠️ Cache invalidation publish failed: {str(e)}")
+
+    def _start_listener(self):
+        if os.getpid() != self._pid:
+            # Forked worker: the parent's listener thread didn't come along
+            self._pid = os.getpid()
+            self._origin = uuid.uuid4().hex
+            self._listener = None
+            self.local.clear()
+        if self._listener is not None or not self.redis_client:
+            return
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CONFIG['invalidation_channel'])
+                # Anything published while we were disconnected is lost - start clean
+                self.local.clear()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._apply_invalidation(message["data"])
+            except Exception as e:
+                logger.warning(f"⚠️ Cache invalidation listener error - reconnecting: {str(e)}")
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _apply_invalidation(self, raw: str):
+        message = json.loads(raw)
+        if message.get("origin") == self._origin:
+            return
+        if "key" in message:
+            self.local.delete(message["key"])
+        elif "pattern" in message:
+            self.local.clear(message["pattern"])
+
+    def get(self, endpoint: str, **params) -> Optional[Any]:
+        """Get fresh data from cache (local tier first, then Redis)"""
+        data, stale = self._get(endpoint, params, check_local=True)
+        return None if stale else data
+
+    def get_stale(self, endpoint: str, **params) -> Tuple[Optional[Any], bool]:
+        """Return ``(data, stale)``; stale data is past its TTL but inside the policy's stale window"""
+        return self._get(endpoint, params, check_local=True)
+
+    def _get(self, endpoint: str, params: Dict[str, Any], check_local: bool) -> Tuple[Optional[Any], bool]:
+        policy = self._policy(endpoint)
+        try:
+            cache_key = policy.build_key(**params)
+            if check_local:
+                entry = self.local.get(cache_key)
+                if entry is not None:
+                    logger.debug(f"⚡ Local cache HIT for {endpoint} with key: {cache_key}")
+                    return self._counted(endpoint, entry)
+
+            if not self.redis_client:
+                logger.warning(f"⚠️ Redis client not available for {endpoint}")
+                return None, False
+
+            cached_data, fresh_until = self._get_remote(cache_key, policy.get_stale_ttl(**params))
+            if cached_data is None:
+                logger.info(f"❌ Cache MISS for {endpoint} with key: {cache_key}")
+                return None, False
+
+            data, size = self.codec.decode(cached_data)
+            logger.info(f"✅ Cache HIT for {endpoint} with key: {cache_key}")
+            self._start_listener()
+            self.local.set(cache_key, (data, fresh_until), self._local_ttl(policy.get_ttl(**params)), size)
+            return self._counted(endpoint, (data, fresh_until))
+
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.error(f"❌ Cache get error for {endpoint}: {str(e)}")
+            return None, False
+
+    def _counted(self, endpoint: str, entry: Tuple[Any, Optional[float]]) -> Tuple[Any, bool]:
+        data, fresh_until = entry
+        stale = fresh_until is not None and time.time() >= fresh_until
+        if stale:
+            self.stats_counters["stale_hits"] += 1
+            logger.info(f"🕰️ Serving stale cache for {endpoint}")
+        return data, stale
+
+    def set(self, endpoint: str, data: Any, **params) -> bool:
+        """Set data in both tiers using the endpoint's TTL policy"""
+        policy = self._policy(endpoint)
+        try:
+            cache_key = policy.build_key(**params)
+            cache_duration = policy.get_ttl(**params)
+            if cache_duration is None:
+                logger.info(f"⏭️ Not caching {endpoint} (policy says no cache for key: {cache_key})")
+                return False
+
+            # Serialize (and compress) data
+            blob, size = self.codec.encode(data)
+
+            # Keep the entry through its stale window; it only counts as fresh for cache_duration
+            stale_ttl = policy.get_stale_ttl(**params) if cache_duration > 0 else 0
+            fresh_until = time.time() + cache_duration if stale_ttl else None
+            entry = (data, fresh_until)
+
+            if not self.redis_client:
+                # Without Redis there are no other workers to keep in sync
+                self.local.set(cache_key, entry, self._local_ttl(cache_duration), size)
+                logger.warning(f"⚠️ Redis client not available for setting {endpoint}")
+                return False
+
+            self._start_listener()
+            self.local.set(cache_key, entry, self._local_ttl(cache_duration), size)
+            self._set_remote(cache_key, blob, cache_duration + stale_ttl)
+            self.stats_counters["sets"] += 1
+            self.stats_counters["bytes_stored"] += len(blob)
+            self.stats_counters["bytes_serialized"] += size
+            if cache_duration > 0:
+                logger.info(f"💾 Cached {endpoint} for {cache_duration}s with key: {cache_key} (auto-expires)")
+            else:
+                logger.info(f"💾 Cached {endpoint} permanently with key: {cache_key} (no expiration)")
+            return True
+
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.error(f"❌ Cache set error for {endpoint}: {str(e)}")
+            return False
+
+    def get_many(self, endpoint: str, params_list: List[Dict[str, Any]]) -> List[Optional[Any]]:
+        """``get`` for many keys of one endpoint: local tier first, the rest in a single MGET.
+
+        Stale windows aren't checked, so use it for endpoints that don't have one.
+        """
+        policy = self._policy(endpoint)
+        results: List[Optional[Any]] = [None] * len(params_list)
+        try:
+            keys = [policy.build_key(**params) for params in params_list]
+            remote = []
+            for index, cache_key in enumerate(keys):
+                entry = self.local.get(cache_key)
+                if entry is not None:
+                    results[index] = entry[0]
+                else:
+                    remote.append(index)
+            if not remote or not self.redis_client:
+                return results
+
+            blobs = self.value_client.mget([keys[index] for index in remote])
+            self._start_listener()
+            for index, blob in zip(remote, blobs):
+                if blob is None:
+                    self.stats_counters["misses"] += 1
+                    continue
+                self.stats_counters["hits"] += 1
+                data, size = self.codec.decode(blob)
+                results[index] = data
+                self.local.set(keys[index], (data, None), self._local_ttl(policy.get_ttl(**params_list[index])), size)
+            logger.info(f"✅ Cache MGET for {endpoint}: {sum(blob is not None for blob in blobs)}/{len(remote)} hits")
+            return results
+
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.error(f"❌ Cache get_many error for {endpoint}: {str(e)}")
+            return results
+
+    def set_many(self, endpoint: str, items: List[Tuple[Any, Dict[str, Any]]], ttl: Optional[int] = None) -> int:
+        """``set`` for many ``(data, params)`` pairs of one endpoint in a single pipeline.
+
+        ``ttl`` overrides the policy's TTL for every item. Returns the number of entries written.
+        """
+        policy = self._policy(endpoint)
+        try:
+            pipe = self.value_client.pipeline(transaction=False) if self.redis_client else None
+            written = 0
+            for data, params in items:
+                cache_key = policy.build_key(**params)
+                cache_duration = policy.get_ttl(**params) if ttl is None else ttl
+                if cache_duration is None:
+                    continue
+                blob, size = self.codec.encode(data)
+                self.local.set(cache_key, (data, None), self._local_ttl(cache_duration), size)
+                if pipe is None:
+                    continue
+                if cache_duration > 0:
+                    pipe.setex(cache_key, cache_duration, blob)
+                else:
+                    pipe.set(cache_key, blob)
+                pipe.publish(CONFIG['invalidation_channel'], json.dumps({"origin": self._origin, "key": cache_key}))
+                self.stats_counters["bytes_stored"] += len(blob)
+                self.stats_counters["bytes_serialized"] += size
+                written += 1
+            if pipe is None:
+                logger.warning(f"⚠️ Redis client not available for setting {endpoint}")
+                return 0
+            if written:
+                self._start_listener()
+                pipe.execute()
+                self.stats_counters["sets"] += written
+                logger.info(f"💾 Cached {written} {endpoint} entries in one pipeline")
+            return written
+
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.error(f"❌ Cache set_many error for {endpoint}: {str(e)}")
+            return 0
+
+    def set_paged(self, endpoint: str, data: Dict[str, Any], items_field: str, **params) -> bool:
+        """Store ``data`` so single pages of ``data[items_field]`` can be read back (see ``get_page``).
+
+        The key holds ``data`` without the items, plus a ``_paged`` descriptor.
+        The items are split into ``CACHE_PAGE_CHUNK_SIZE`` chunks. Each chunk is
+        encoded on its own into a hash at ``<key>#chunks``. Both keys are written
+        in one MULTI, so readers never see metadata without its chunks.
+        """
+        policy = self._policy(endpoint)
+        try:
+            cache_key = policy.build_key(**params)
+            cache_duration = policy.get_ttl(**params)
+            if cache_duration is None:
+                logger.info(f"⏭️ Not caching {endpoint} (policy says no cache for key: {cache_key})")
+                return False
+
+            items = data.get(items_field) or []
+            chunk_size = CONFIG['page_chunk_size']
+            meta = {name: value for name, value in data.items() if name != items_field}
+            meta["_paged"] = {"field": items_field, "total": len(items), "chunk_size": chunk_size}
+            meta_blob, meta_size = self.codec.encode(meta)
+            chunks = {
+                str(index): self.codec.encode(items[start:start + chunk_size])
+                for index, start in enumerate(range(0, len(items), chunk_size))
+            }
+
+            stale_ttl = policy.get_stale_ttl(**params) if cache_duration > 0 else 0
+            fresh_until = time.time() + cache_duration if stale_ttl else None
+            local_ttl = self._local_ttl(cache_duration)
+            self.local.clear(f"{cache_key}#*")
+            self.local.set(cache_key, (meta, fresh_until), local_ttl, meta_size)
+
+            if not self.redis_client:
+                logger.warning(f"⚠️ Redis client not available for setting {endpoint}")
+                return False
+
+            self._start_listener()
+            expiry = cache_duration + stale_ttl
+            pipe = self.value_client.pipeline(transaction=True)
+            pipe.delete(f"{cache_key}#chunks")
+            if chunks:
+                pipe.hset(f"{cache_key}#chunks", mapping={index: blob for index, (blob, _) in chunks.items()})
+            if expiry > 0:
+                pipe.setex(cache_key, expiry, meta_blob)
+                pipe.expire(f"{cache_key}#chunks", expiry)
+            else:
+                pipe.set(cache_key, meta_blob)
+            pipe.execute()
+            self._publish(key=cache_key)
+            self._publish(pattern=f"{cache_key}#*")
+
+            stored = len(meta_blob) + sum(len(blob) for blob, _ in chunks.values())
+            self.stats_counters["sets"] += 1
+            self.stats_counters["bytes_stored"] += stored
+            self.stats_counters["bytes_serialized"] += meta_size + sum(size for _, size in chunks.values())
+            logger.info(f"💾 Cached {endpoint} as {len(chunks)} chunks of {chunk_size} with key: {cache_key}")
+            return True
+
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.error(f"❌ Cache set_paged error for {endpoint}: {str(e)}")
+            return False
+
+    def get_page(self, endpoint: str, start: int, end: int, items_field: str,
+                 **params) -> Tuple[Optional[Dict[str, Any]], List[Any], bool]:
+        """Return ``(meta, items[start:end], stale)``, decoding only the chunks that cover the range.
+
+        ``meta`` is the cached data without its items; it is None on a miss.
+        Entries stored whole (by ``set``) are sliced instead.
+        """
+        meta, stale = self._get(endpoint, params, check_local=True)
+        if meta is None:
+            return None, [], False
+        paged = meta.get("_paged")
+        if not paged:
+            return meta, (meta.get(items_field) or [])[start:end], stale
+
+        end = min(end, paged["total"])
+        if start >= end:
+            return meta, [], stale
+        chunk_size = paged["chunk_size"]
+        indexes = list(range(start // chunk_size, (end - 1) // chunk_size + 1))
+        try:
+            policy = self._policy(endpoint)
+            cache_key = policy.build_key(**params)
+            chunks = {index: self.local.get(f"{cache_key}#{index}") for index in indexes}
+            missing = [index for index, chunk in chunks.items() if chunk is None]
+            if missing:
+                if not self.redis_client:
+                    return None, [], False
+                blobs = self.value_client.hmget(f"{cache_key}#chunks", [str(index) for index in missing])
+                if any(blob is None for blob in blobs):
+                    # Chunks evicted or expired ahead of the metadata - treat it as a miss
+                    logger.warning(f"⚠️ Cached {endpoint} is missing chunks for key: {cache_key}")
+                    return None, [], False
+                local_ttl = self._local_ttl(policy.get_ttl(**params))
+                for index, blob in zip(missing, blobs):
+                    chunk, size = self.codec.decode(blob)
+                    chunks[index] = chunk
+                    self.local.set(f"{cache_key}#{index}", chunk, local_ttl, size)
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.error(f"❌ Cache get_page error for {endpoint}: {str(e)}")
+            return None, [], False
+
+        items = [item for index in indexes for item in chunks[index]]
+        offset = start - indexes[0] * chunk_size
+        return meta, items[offset:offset + end - start], stale
+
+    def delete(self, endpoint: str, **params) -> bool:
+        """Delete data from both tiers"""
+        try:
+            cache_key = self._policy(endpoint).build_key(**params)
+            self.local.delete(cache_key)
+            self.local.clear(f"{cache_key}#*")
+            if not self.redis_client:
+                return False
+            # Paged entries keep their items in a companion hash
+            result = self.redis_client.delete(cache_key, f"{cache_key}#chunks")
+            self._publish(key=cache_key)
+            self._publish(pattern=f"{cache_key}#*")
+            logger.info(f"🗑️ Deleted cache for {endpoint} with key: {cache_key}")
+            return result > 0
+
+        except Exception as e:
+            logger.error(f"❌ Cache delete error for {endpoint}: {str(e)}")
+            return False
+
+    def clear_pattern(self, pattern: str) -> int:
+        """Delete every key matching the glob ``pattern``; returns the Redis keys deleted.
+
+        Keys are found with SCAN and removed with UNLINK one batch at a time, so
+        Redis is never blocked by a big ``KEYS`` call or by freeing large values.
+        """
+        self.local.clear(pattern)
+        if not self.redis_client:
+            return 0
+        deleted = 0
+        cursor = 0
+        while True:
+            cursor, keys = self.redis_client.scan(cursor, match=pattern, count=CONFIG['scan_count'])
+            if keys:
+                deleted += self.redis_client.unlink(*keys)
+            if cursor == 0:
+                break
+        self._publish(pattern=pattern)
+        if deleted:
+            logger.info(f"🗑️ Cleared {deleted} cache entries matching {pattern}")
+        return deleted
+
+    def scan_entries(self, pattern: str, cursor: int = 0, count: int = CONFIG['scan_count']) -> Dict[str, Any]:
+        """One SCAN page of keys matching ``pattern`` with their TTL and memory use.
+
+        TTL and MEMORY USAGE for the whole page go out in one pipeline. Pass
+        the returned ``next_cursor`` back in to continue; ``0`` means done.
+        """
+        next_cursor, keys = self.redis_client.scan(cursor, match=pattern, count=count)
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+            pipe.memory_usage(key)
+        replies = pipe.execute() if keys else []
+        entries = [
+            {"key": key, "ttl": replies[2 * index], "memory_bytes": replies[2 * index + 1]}
+            for index, key in enumerate(keys)
+        ]
+        return {"pattern": pattern, "cursor": cursor, "next_cursor": next_cursor, "entries": entries}
+
+    def cached(self, endpoint: str, key: Optional[Callable[..., str]] = None,
+               ttl: TTL = CONFIG['default_ttl'], cache_empty: bool = False):
+        """Decorator for async route handlers: serve the response from cache, store it on a miss.
+
+        ``key`` and ``ttl`` receive the handler's arguments by name. Empty
+        responses aren't stored unless ``cache_empty`` is set, and errors
+        (``HTTPException`` included) are never cached.
+        """
+        policy = self.register(endpoint, key=key, ttl=ttl, cache_empty=cache_empty)
+
+        def decorator(handler):
+            signature = inspect.signature(handler)
+
+            @functools.wraps(handler)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+
+                data = await self.aget(endpoint, **params)
+                if data is not None:
+                    return data
+
+                result = await handler(*args, **kwargs)
+                if isinstance(result, Response):
+                    # Pre-rendered responses (files, custom status codes) aren't cached
+                    return result
+                data = jsonable_encoder(result)
+                if data or policy.cache_empty:
+                    await asyncio.to_thread(self.set, endpoint, data, **params)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    async def aget(self, endpoint: str, **params) -> Optional[Any]:
+        """``get`` for async handlers: local hits stay on the loop, Redis lookups run in a thread"""
+        try:
+            entry = self.local.get(self._policy(endpoint).build_key(**params))
+        except Exception:
+            entry = None
+        if entry is not None:
+            data, stale = self._counted(endpoint, entry)
+        else:
+            data, stale = await asyncio.to_thread(self._get, endpoint, params, False)
+        return None if stale else data
+
+    async def aget_page(self, endpoint: str, start: int, end: int, items_field: str,
+                        **params) -> Tuple[Optional[Dict[str, Any]], List[Any], bool]:
+        """``get_page`` for async handlers; the metadata and chunk reads run in a thread"""
+        return await asyncio.to_thread(self.get_page, endpoint, start, end, items_field, **params)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "endpoints": sorted(self.policies),
+            "codec": self.codec.describe(),
+            "tiers": {
+                "local": self.local.get_stats(),
+                "redis": {
+                    "status": "connected" if self.redis_client else "unavailable",
+                    "invalidation_listener": self._listener is not None and self._listener.is_alive(),
+                    **self.stats_counters,
+                },
+            },
+        }
+
+
+class ProductHuntCache:
+    """ProductHunt endpoints on the shared response cache, with period-aware keys and durations"""
+
+    # Cache duration mapping (in seconds)
+    CACHE_DURATIONS = {
+        # Date-based endpoints
+        "daily_rankings_today": 900,         # 15 minutes, then served stale while refreshing
+        "daily_rankings_historical": 0,      # Permanent for other days
+        "weekly_rankings_current": 86400,    # 24 hours for this week
+        "weekly_rankings_historical": 0,     # Permanent for past weeks
+        "monthly_rankings_current": 604800,  # 7 days for this month
+        "monthly_rankings_historical": 0,    # Permanent for past months
+        "yearly_rankings_current": 2592000,  # 30 days for this year
+        "yearly_rankings_historical": 0,     # Permanent for past years
+
+        # Non-date endpoints
+        "todays_launches": 3600,             # 1 hour
+        "upcoming_launches": 21600,          # 6 hours
+        "categories": 2592000,               # 30 days
+        "category_products": 86400,          # 24 hours
+        "product_page": 604800,              # 7 days
+    }
+
+    # How long a current-period ranking is still served (flagged stale) after its
+    # duration runs out, while one background scrape refreshes it
+    STALE_WINDOWS = {
+        "daily": 86400,                      # 1 day
+        "weekly": 604800,                    # 7 days
+        "monthly": 2592000,                  # 30 days
+        "yearly": 2592000,                   # 30 days
+    }
+
+    ENDPOINTS = [
+        "daily_rankings", "weekly_rankings", "monthly_rankings", "yearly_rankings",
+        "todays_launches", "upcoming_launches", "categories", "category_products", "product_page",
+    ]
+
+    def __init__(self, backend: ResponseCache):
+        self.backend = backend
+        for endpoint in self.ENDPOINTS:
+            backend.register(
+                endpoint,
+                key=functools.partial(self._generate_cache_key, endpoint),
+                ttl=functools.partial(self._get_cache_duration, endpoint),
+                stale_ttl=functools.partial(self._get_stale_window, endpoint),
+            )
+
+    @property
+    def redis_client(self):
+        return self.backend.redis_client
+
     def _generate_cache_key(self, endpoint: str, **params) -> str:
         """Generate cache key based on endpoint and parameters"""
         today = datetime.now()
-        
+
         if endpoint == "todays_launches":
             return f"producthunt:todays_launches:{today.strftime('%Y-%m-%d')}:{today.hour}"
-        
+
         elif endpoint == "upcoming_launches":
             return f"producthunt:upcoming_launches:{today.strftime('%Y-%m-%d')}:{today.hour // 6}"
-        
+
         elif endpoint == "categories":
             return f"producthunt:categories:{today.strftime('%Y-%m')}"
-        
+
         elif endpoint == "category_products":
             category_slug = params.get('category_slug', 'unknown')
             order = params.get('order', 'highest_rated')
             return f"producthunt:category_products:{category_slug}:{order}:{today.strftime('%Y-%m-%d')}"
-        
+
+        elif endpoint == "product_page":
+            slug = params.get('url', '').rstrip('/').rsplit('/', 1)[-1]
+            return f"producthunt:product_page:{slug}"
+
         elif endpoint in ["daily_rankings", "weekly_rankings", "monthly_rankings", "yearly_rankings"]:
             rank_type = endpoint.replace("_rankings", "")
             date_str = params.get('date', '')
-            
+
             # Check if it's current period
             if self._is_current_period(rank_type, date_str):
                 return f"producthunt:rankings:{rank_type}:current:{date_str}"
             else:
                 return f"producthunt:rankings:{rank_type}:historical:{date_str}"
-        
-        return f"producthunt:{endpoint}:{hash(str(params))}"
-    
 
-    
+        return f"producthunt:{endpoint}:{params_digest(**params)}"
+
+
+
     def _is_historical_data(self, rank_type: str, date_str: str) -> bool:
         """Check if requested date is in the past relative to today"""
         today = datetime.now()
-        
+
         try:
             if rank_type == "daily":
                 requested_date = datetime.strptime(date_str, "%Y/%m/%d")
                 return requested_date.date() < today.date()
-            
+
             elif rank_type == "weekly":
                 year, week = map(int, date_str.split("/"))
                 # Convert to datetime for comparison
                 requested_date = datetime.strptime(f"{year}-W{week:02d}-1", "%Y-W%W-%w")
                 current_week_start = datetime.strptime(f"{today.year}-W{today.isocalendar()[1]:02d}-1", "%Y-W%W-%w")
                 return requested_date < current_week_start
-            
+
             elif rank_type == "monthly":
                 requested_date = datetime.strptime(date_str, "%Y/%m")
                 current_month = datetime(today.year, today.month, 1)
                 return requested_date < current_month
-            
+
             elif rank_type == "yearly":
                 requested_year = int(date_str)
                 return requested_year < today.year
-                
+
         except Exception:
             return False
-        
+
         return False
 
     def _is_current_period(self, rank_type: str, date_str: str) -> bool:
         """Check if requested date is current period (today, this week, this month, this year)"""
         today = datetime.now()
-        
+
         try:
             if rank_type == "daily":
                 requested_date = datetime.strptime(date_str, "%Y/%m/%d")
                 return requested_date.date() == today.date()
-            
+
             elif rank_type == "weekly":
                 year, week = map(int, date_str.split("/"))
                 current_year, current_week, _ = today.isocalendar()
                 return year == current_year and week == current_week
-            
+
             elif rank_type == "monthly":
                 requested_date = datetime.strptime(date_str, "%Y/%m")
                 return requested_date.year == today.year and requested_date.month == today.month
-            
+
             elif rank_type == "yearly":
                 requested_year = int(date_str)
                 return requested_year == today.year
-                
+
         except Exception:
             return False
-        
+
         return False
 
     def _get_cache_duration(self, endpoint: str, **params) -> int:
         """Get cache duration based on endpoint and parameters"""
-        
+
         if endpoint == "todays_launches":
             return self.CACHE_DURATIONS["todays_launches"]
-        
+
         elif endpoint == "upcoming_launches":
             return self.CACHE_DURATIONS["upcoming_launches"]
-        
+
         elif endpoint == "categories":
             return self.CACHE_DURATIONS["categories"]
-        
+
         elif endpoint == "category_products":
             return self.CACHE_DURATIONS["category_products"]
-        
+
+        elif endpoint == "product_page":
+            return self.CACHE_DURATIONS["product_page"]
+
         elif endpoint in ["daily_rankings", "weekly_rankings", "monthly_rankings", "yearly_rankings"]:
             rank_type = endpoint.replace("_rankings", "")
             date_str = params.get('date', '')
-            
+
             # Check if it's current period
             if self._is_current_period(rank_type, date_str):
                 # Current period - use specific cache duration
                 if rank_type == "daily":
-                    return self.CACHE_DURATIONS["daily_rankings_today"]  # No cache for today
+                    return self.CACHE_DURATIONS["daily_rankings_today"]
                 else:
                     return self.CACHE_DURATIONS[f"{rank_type}_rankings_current"]
             else:
                 # Historical period - permanent cache
                 return self.CACHE_DURATIONS[f"{rank_type}_rankings_historical"]
-        
+
         return 3600  # Default 1 hour
-    
+
+    def _get_stale_window(self, endpoint: str, **params) -> int:
+        """Stale window for current-period rankings; historical and non-ranking entries have none"""
+        if endpoint not in ["daily_rankings", "weekly_rankings", "monthly_rankings", "yearly_rankings"]:
+            return 0
+        rank_type = endpoint.replace("_rankings", "")
+        if not self._is_current_period(rank_type, params.get('date', '')):
+            return 0
+        return self.STALE_WINDOWS[rank_type]
+
     def get(self, endpoint: str, **params) -> Optional[Dict[str, Any]]:
         """Get data from cache"""
-        if not self.redis_client:
-            logger.warning(f"⚠️ Redis client not available for {endpoint}")
-            return None
-        
-        try:
-            cache_key = self._generate_cache_key(endpoint, **params)
-            logger.info(f"🔍 Looking for cache key: {cache_key}")
-            cached_data = self.redis_client.get(cache_key)
-            
-            if cached_data:
-                data = json.loads(cached_data)
-                logger.info(f"✅ Cache HIT for {endpoint} with key: {cache_key}")
-                return data
-            else:
-                logger.info(f"❌ Cache MISS for {endpoint} with key: {cache_key}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"❌ Cache get error for {endpoint}: {str(e)}")
-            return None
-    
+        return self.backend.get(endpoint, **params)
+
+    def get_stale(self, endpoint: str, **params):
+        """Get ``(data, stale)`` from cache; stale data should be served while it is refreshed"""
+        return self.backend.get_stale(endpoint, **params)
+
     def set(self, endpoint: str, data: Dict[str, Any], **params) -> bool:
         """Set data in cache with Redis TTL"""
-        if not self.redis_client:
-            logger.warning(f"⚠️ Redis client not available for setting {endpoint}")
-            return False
-        
-        try:
-            cache_key = self._generate_cache_key(endpoint, **params)
-            cache_duration = self._get_cache_duration(endpoint, **params)
-            
-            logger.info(f"💾 Setting cache for {endpoint} with key: {cache_key}, duration: {cache_duration}s")
-            
-            # Serialize data
-            serialized_data = json.dumps(data, default=str)
-            
-            if cache_duration > 0:
-                # Use SETEX for automatic expiration (Redis TTL)
-                self.redis_client.setex(cache_key, cache_duration, serialized_data)
-                logger.info(f"💾 Cached {endpoint} for {cache_duration}s with key: {cache_key} (auto-expires)")
-            else:
-                # Use SET for permanent storage (no expiration)
-                self.redis_client.set(cache_key, serialized_data)
-                logger.info(f"💾 Cached {endpoint} permanently with key: {cache_key} (no expiration)")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Cache set error for {endpoint}: {str(e)}")
-            return False
-    
+        return self.backend.set(endpoint, data, **params)
+
+    def set_paged(self, endpoint: str, data: Dict[str, Any], **params) -> bool:
+        """Set data whose ``products`` are read back a page at a time with ``get_page``"""
+        return self.backend.set_paged(endpoint, data, "products", **params)
+
+    def get_page(self, endpoint: str, start: int, end: int, **params) -> Tuple[Optional[Dict[str, Any]], List[Any], bool]:
+        """Get ``(metadata, products[start:end], stale)``; only the chunks covering the page are decoded"""
+        return self.backend.get_page(endpoint, start, end, "products", **params)
+
+    async def aget_page(self, endpoint: str, start: int, end: int, **params) -> Tuple[Optional[Dict[str, Any]], List[Any], bool]:
+        """``get_page`` for async handlers"""
+        return await self.backend.aget_page(endpoint, start, end, "products", **params)
+
     def delete(self, endpoint: str, **params) -> bool:
         """Delete data from cache"""
-        if not self.redis_client:
-            return False
-        
-        try:
-            cache_key = self._generate_cache_key(endpoint, **params)
-            result = self.redis_client.delete(cache_key)
-            logger.info(f"🗑️ Deleted cache for {endpoint} with key: {cache_key}")
-            return result > 0
-            
-        except Exception as e:
-            logger.error(f"❌ Cache delete error for {endpoint}: {str(e)}")
-            return False
-    
+        return self.backend.delete(endpoint, **params)
+
     def clear_all(self) -> bool:
         """Clear all ProductHunt cache"""
         if not self.redis_client:
             return False
-        
+
         try:
-            pattern = "producthunt:*"
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.info(f"🗑️ Cleared {len(keys)} cache entries")
+            self.backend.clear_pattern("producthunt:*")
             return True
-            
+
         except Exception as e:
             logger.error(f"❌ Cache clear error: {str(e)}")
             return False
-    
-    def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
+
+    def get_cache_stats(self, cursor: int = 0, count: int = CONFIG['scan_count']) -> Dict[str, Any]:
+        """Get cache statistics for one SCAN page of ProductHunt keys"""
         if not self.redis_client:
             return {"error": "Redis not connected"}
-        
+
         try:
-            pattern = "producthunt:*"
-            keys = self.redis_client.keys(pattern)
-            
+            page = self.backend.scan_entries("producthunt:*", cursor=cursor, count=count)
+
             stats = {
-                "total_keys": len(keys),
-                "memory_usage": self.redis_client.info()['used_memory_human'],
+                "page_keys": len(page["entries"]),
+                "cursor": page["cursor"],
+                "next_cursor": page["next_cursor"],
+                "memory_usage": self.redis_client.info("memory")['used_memory_human'],
+                "page_memory_bytes": 0,
                 "keys_by_pattern": {},
                 "ttl_info": {}
             }
-            
-            # Count keys by pattern and get TTL info
-            for key in keys:
+
+            # Count keys by pattern and describe TTLs
+            for entry in page["entries"]:
+                key, ttl = entry["key"], entry["ttl"]
                 parts = key.split(":")
                 if len(parts) >= 2:
                     pattern_type = parts[1]
                     stats["keys_by_pattern"][pattern_type] = stats["keys_by_pattern"].get(pattern_type, 0) + 1
-                
-                # Get TTL for this key
-                ttl = self.redis_client.ttl(key)
+                stats["page_memory_bytes"] += entry["memory_bytes"] or 0
+
                 if ttl == -1:
                     ttl_info = "permanent"
                 elif ttl == -2:
                     ttl_info = "expired"
                 else:
                     ttl_info = f"{ttl}s remaining"
-                
+
                 stats["ttl_info"][key] = ttl_info
-            
+
             return stats
-            
+
         except Exception as e:
             logger.error(f"❌ Cache stats error: {str(e)}")
             return {"error": str(e)}
@@ -306,7 +982,7 @@ class ProductHuntCache:
         """Get TTL information for a specific key"""
         if not self.redis_client:
             return "Redis not connected"
-        
+
         try:
             ttl = self.redis_client.ttl(cache_key)
             if ttl == -1:
@@ -318,5 +994,52 @@ class ProductHuntCache:
         except Exception as e:
             return f"Error: {str(e)}"
 
-# Global cache instance
-cache = ProductHuntCache() 
\ No newline at end of file
+class DomainCache:
+    """URL -> final website domain lookups, cached in bulk for the ProductHunt scrapers.
+
+    Two kinds of lookup are cached, each keyed by the URL it starts from:
+
+    - ``resolved`` - the domain a product's website link redirects to
+    - ``website`` - the domain behind a product page's "Visit website" button
+
+    Entries are ``{"domain": "example.com"}``. Failed lookups are stored as
+    ``{"domain": None}`` with a shorter TTL, so a dead link isn't retried on
+    every scrape but still gets another chance later.
+    """
+
+    KINDS = ["resolved", "website"]
+
+    def __init__(self, backend: ResponseCache):
+        self.backend = backend
+        for kind in self.KINDS:
+            backend.register(
+                f"domains:{kind}",
+                key=functools.partial(self._generate_cache_key, kind),
+                ttl=CONFIG['domain_ttl'],
+            )
+
+    @staticmethod
+    def _generate_cache_key(kind: str, url: str) -> str:
+        return f"domains:{kind}:{url.strip()}"
+
+    def get_many(self, kind: str, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached entries for the URLs that have one (local tier, then one MGET)"""
+        urls = list(dict.fromkeys(urls))
+        entries = self.backend.get_many(f"domains:{kind}", [{"url": url} for url in urls])
+        return {url: entry for url, entry in zip(urls, entries) if entry is not None}
+
+    def set_many(self, kind: str, domains: Dict[str, Optional[str]]) -> int:
+        """Store ``url -> domain`` results in one pipeline; ``None`` marks a failed lookup"""
+        endpoint = f"domains:{kind}"
+        found = [({"domain": domain}, {"url": url}) for url, domain in domains.items() if domain]
+        failed = [({"domain": None}, {"url": url}) for url, domain in domains.items() if not domain]
+        written = self.backend.set_many(endpoint, found) if found else 0
+        if failed:
+            written += self.backend.set_many(endpoint, failed, ttl=CONFIG['domain_negative_ttl'])
+        return written
+
+
+# Global cache instances
+response_cache = ResponseCache()
+cache = ProductHuntCache(response_cache)
+domain_cache = DomainCache(response_cache)
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from typing import Dict, Any, Optional, Tuple
+import asyncio
 import logging
-import requests
 from datetime import datetime, timedelta
 
+from http_clients import http_clients, with_cookies
+from redis_cache import response_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -128,7 +131,7 @@ def get_base_headers(page_view_id: str = 'b6826fe7-c2b5-4fa2-9a64-ce34ffa02452')
         'x-sw-page-view-id': page_view_id,
     }
 
-def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Dict[str, Any]:
+async def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Dict[str, Any]:
     """
     Fetch and structure website data from SimilarWeb API.
     
@@ -163,21 +166,147 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
         }
     }
     
-    # 1. Get header data (basic info)
-    headers = get_base_headers()
-    params = {
-        'keys': domain,
-        'mainDomainOnly': 'true',
-        'includeCrossData': 'true',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/api/WebsiteOverview/getheader',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    header_data = response.json()
-    
+    # Every widget request depends only on the domain and date range, so they are sent concurrently
+    widget_requests = [
+        # 1. Get header data (basic info)
+        ('https://pro.similarweb.com/api/WebsiteOverview/getheader', get_base_headers(), {
+            'keys': domain,
+            'mainDomainOnly': 'true',
+            'includeCrossData': 'true',
+        }),
+        # 2. Get geography data
+        ('https://pro.similarweb.com/widgetApi/WebsiteGeography/Geography/Table', get_base_headers('776568a0-4e1c-4bd3-969e-f36c384340a9'), {
+            'country': '999',
+            'mainDomainOnly': 'true',
+            'includeCrossData': 'true',
+            'keys': domain,
+            'pageSize': '5',
+            'from': from_date,
+            'to': to_date,
+            'isWindow': 'false',
+        }),
+        # 3. Get similar sites (competitors)
+        ('https://pro.similarweb.com/api/WebsiteOverview/getsimilarsites', get_base_headers('3dfedaf0-875f-48ea-a2d0-37b7c7209573'), {
+            'key': domain,
+            'limit': '5',
+        }),
+        # 4. Get desktop vs mobile visits
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverview/EngagementDesktopVsMobileVisits/PieChart', get_base_headers('72df4a2e-8e51-4c5f-b1df-4f7701628fb0'), {
+            'country': '999',
+            'from': from_date,
+            'to': to_date,
+            'includeSubDomains': 'true',
+            'isWindow': 'false',
+            'keys': domain,
+            'timeGranularity': 'Monthly',
+            'webSource': 'Total',
+            'ShouldGetVerifiedData': 'false',
+        }),
+        # 5. Get engagement overview
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverview/EngagementOverview/Table', get_base_headers('e38c147b-3e50-48b6-858b-5236a2a9593b'), {
+            'country': '999',
+            'iso': '[object Object]',
+            'to': to_date,
+            'from': from_date,
+            'isWindow': 'false',
+            'webSource': 'Total',
+            'ignoreFilterConsistency': 'false',
+            'includeSubDomains': 'true',
+            'timeGranularity': 'Monthly',
+            'keys': domain,
+            'ShouldGetVerifiedData': 'false',
+        }),
+        # 6. Get traffic sources breakdown
+        ('https://pro.similarweb.com/widgetApi/MarketingMixTotal/TrafficSourcesOverview/PieChart', get_base_headers('f365ccd9-025d-437d-8fef-d7f2dbde5468'), {
+            'country': '999',
+            'from': from_date,
+            'to': to_date,
+            'includeSubDomains': 'true',
+            'isWindow': 'false',
+            'timeGranularity': 'Monthly',
+            'keys': domain,
+        }),
+        # 7. Get top referrals (incoming)
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverviewDesktop/TopReferrals/Table', get_base_headers('19936c38-93d1-4b5b-bdbf-ca17d6737cba'), {
+            'country': '999',
+            'from': from_date,
+            'includeSubDomains': 'true',
+            'isWindow': 'false',
+            'keys': domain,
+            'timeGranularity': 'Monthly',
+            'to': to_date,
+            'pageSize': '5',
+            'webSource': 'Desktop',
+            'orderBy': 'TotalShare desc',
+        }),
+        # 8. Get traffic destination referrals (outgoing)
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverviewDesktop/TrafficDestinationReferrals/Table', get_base_headers('36d3f4ab-1dda-4cd5-9721-4ea6bbc3027f'), {
+            'appMode': 'single',
+            'country': '999',
+            'from': from_date,
+            'includeSubDomains': 'true',
+            'isWindow': 'false',
+            'keys': domain,
+            'timeGranularity': 'Monthly',
+            'to': to_date,
+            'pageSize': '5',
+            'webSource': 'Desktop',
+            'orderBy': 'TotalShare desc',
+        }),
+        # 9. Get social media breakdown
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverviewDesktop/TrafficSourcesSocial/PieChart', get_base_headers('5ce8802f-8ec1-4e7a-9919-4c6235aa835f'), {
+            'country': '999',
+            'includeSubDomains': 'true',
+            'webSource': 'Desktop',
+            'timeGranularity': 'Monthly',
+            'from': from_date,
+            'to': to_date,
+            'isWindow': 'false',
+            'keys': domain,
+        }),
+        # 10. Get total visits metric
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverview/EngagementVisits/SingleMetric', get_base_headers('800efbf7-d152-434d-9269-4d4dc8255d9b'), {
+            'country': '999',
+            'from': from_date,
+            'to': to_date,
+            'includeSubDomains': 'true',
+            'isWindow': 'false',
+            'keys': domain,
+            'timeGranularity': 'Monthly',
+            'webSource': 'Total',
+            'ShouldGetVerifiedData': 'false',
+        }),
+        # 11. Get web ranks
+        ('https://pro.similarweb.com/widgetApi/WebsiteOverview/WebRanks/SingleMetric', get_base_headers('3283c830-6658-466e-a927-3d68897c67ed'), {
+            'country': '999',
+            'includeSubDomains': 'true',
+            'webSource': 'Total',
+            'timeGranularity': 'Monthly',
+            'from': from_date,
+            'to': to_date,
+            'isWindow': 'false',
+            'keys': domain,
+        }),
+    ]
+    client = http_clients.async_client()
+    responses = await asyncio.gather(*(
+        client.get(url, params=params, headers=with_cookies(headers, cookies)) for url, headers, params in widget_requests
+    ))
+    (
+        header_data,
+        geo_data,
+        similar_data,
+        device_data,
+        engagement_data,
+        sources_data,
+        referrals_data,
+        destinations_data,
+        social_data,
+        visits_data,
+        ranks_data,
+    ) = [response.json() for response in responses]
+    
+    # 1. Header data (basic info)
     if domain in header_data:
         site_data = header_data[domain]
         unified_data["metadata"] = {
@@ -208,26 +337,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
         }
         unified_data["traffic"]["monthlyVisits"] = site_data.get("monthlyVisits", 0)
     
-    # 2. Get geography data
-    headers = get_base_headers('776568a0-4e1c-4bd3-969e-f36c384340a9')
-    params = {
-        'country': '999',
-        'mainDomainOnly': 'true',
-        'includeCrossData': 'true',
-        'keys': domain,
-        'pageSize': '5',
-        'from': from_date,
-        'to': to_date,
-        'isWindow': 'false',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteGeography/Geography/Table',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    geo_data = response.json()
-    
+    # 2. Geography data
     if "Data" in geo_data and isinstance(geo_data["Data"], list):
         unified_data["geography"]["topCountries"] = []
         for country_data in geo_data["Data"]:
@@ -245,20 +355,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
             })
         unified_data["geography"]["totalCountries"] = geo_data.get("TotalCount", 0)
     
-    # 3. Get similar sites (competitors)
-    headers = get_base_headers('3dfedaf0-875f-48ea-a2d0-37b7c7209573')
-    params = {
-        'key': domain,
-        'limit': '5',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/api/WebsiteOverview/getsimilarsites',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    similar_data = response.json()
-    
+    # 3. Similar sites (competitors)
     if isinstance(similar_data, list):
         unified_data["competitors"] = [
             {
@@ -269,27 +366,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
             for site in similar_data
         ]
     
-    # 4. Get desktop vs mobile visits
-    headers = get_base_headers('72df4a2e-8e51-4c5f-b1df-4f7701628fb0')
-    params = {
-        'country': '999',
-        'from': from_date,
-        'to': to_date,
-        'includeSubDomains': 'true',
-        'isWindow': 'false',
-        'keys': domain,
-        'timeGranularity': 'Monthly',
-        'webSource': 'Total',
-        'ShouldGetVerifiedData': 'false',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverview/EngagementDesktopVsMobileVisits/PieChart',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    device_data = response.json()
-    
+    # 4. Desktop vs mobile visits
     if "Data" in device_data and domain in device_data["Data"]:
         device_info = device_data["Data"][domain]
         desktop = device_info.get("Desktop", 0)
@@ -302,29 +379,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
             "mobilePercentage": round((mobile / total * 100) if total > 0 else 0, 2)
         }
     
-    # 5. Get engagement overview
-    headers = get_base_headers('e38c147b-3e50-48b6-858b-5236a2a9593b')
-    params = {
-        'country': '999',
-        'iso': '[object Object]',
-        'to': to_date,
-        'from': from_date,
-        'isWindow': 'false',
-        'webSource': 'Total',
-        'ignoreFilterConsistency': 'false',
-        'includeSubDomains': 'true',
-        'timeGranularity': 'Monthly',
-        'keys': domain,
-        'ShouldGetVerifiedData': 'false',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverview/EngagementOverview/Table',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    engagement_data = response.json()
-    
+    # 5. Engagement overview
     if "Data" in engagement_data and isinstance(engagement_data["Data"], list) and len(engagement_data["Data"]) > 0:
         eng = engagement_data["Data"][0]
         unified_data["engagement"]["avgVisitDuration"] = eng.get("AvgVisitDuration", 0)
@@ -333,25 +388,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
         unified_data["engagement"]["totalPageViews"] = eng.get("TotalPagesViews", 0)
         unified_data["traffic"]["totalVisits"] = eng.get("AvgMonthVisits", 0)
     
-    # 6. Get traffic sources breakdown
-    headers = get_base_headers('f365ccd9-025d-437d-8fef-d7f2dbde5468')
-    params = {
-        'country': '999',
-        'from': from_date,
-        'to': to_date,
-        'includeSubDomains': 'true',
-        'isWindow': 'false',
-        'timeGranularity': 'Monthly',
-        'keys': domain,
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/MarketingMixTotal/TrafficSourcesOverview/PieChart',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    sources_data = response.json()
-    
+    # 6. Traffic sources breakdown
     if "Data" in sources_data and "Total" in sources_data["Data"] and domain in sources_data["Data"]["Total"]:
         total_sources = sources_data["Data"]["Total"][domain]
         unified_data["trafficSources"]["total"] = {
@@ -388,28 +425,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
                 "email": mobile_sources.get("Email", 0)
             }
     
-    # 7. Get top referrals (incoming)
-    headers = get_base_headers('19936c38-93d1-4b5b-bdbf-ca17d6737cba')
-    params = {
-        'country': '999',
-        'from': from_date,
-        'includeSubDomains': 'true',
-        'isWindow': 'false',
-        'keys': domain,
-        'timeGranularity': 'Monthly',
-        'to': to_date,
-        'pageSize': '5',
-        'webSource': 'Desktop',
-        'orderBy': 'TotalShare desc',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverviewDesktop/TopReferrals/Table',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    referrals_data = response.json()
-    
+    # 7. Top referrals (incoming)
     if "Data" in referrals_data and isinstance(referrals_data["Data"], list):
         unified_data["referrals"]["incoming"] = [
             {
@@ -421,29 +437,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
             for ref in referrals_data["Data"]
         ]
     
-    # 8. Get traffic destination referrals (outgoing)
-    headers = get_base_headers('36d3f4ab-1dda-4cd5-9721-4ea6bbc3027f')
-    params = {
-        'appMode': 'single',
-        'country': '999',
-        'from': from_date,
-        'includeSubDomains': 'true',
-        'isWindow': 'false',
-        'keys': domain,
-        'timeGranularity': 'Monthly',
-        'to': to_date,
-        'pageSize': '5',
-        'webSource': 'Desktop',
-        'orderBy': 'TotalShare desc',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverviewDesktop/TrafficDestinationReferrals/Table',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    destinations_data = response.json()
-    
+    # 8. Traffic destination referrals (outgoing)
     if "Data" in destinations_data and isinstance(destinations_data["Data"], list):
         unified_data["referrals"]["outgoing"] = [
             {
@@ -455,26 +449,7 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
             for dest in destinations_data["Data"]
         ]
     
-    # 9. Get social media breakdown
-    headers = get_base_headers('5ce8802f-8ec1-4e7a-9919-4c6235aa835f')
-    params = {
-        'country': '999',
-        'includeSubDomains': 'true',
-        'webSource': 'Desktop',
-        'timeGranularity': 'Monthly',
-        'from': from_date,
-        'to': to_date,
-        'isWindow': 'false',
-        'keys': domain,
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverviewDesktop/TrafficSourcesSocial/PieChart',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    social_data = response.json()
-    
+    # 9. Social media breakdown
     if "Data" in social_data and domain in social_data["Data"]:
         social_info = social_data["Data"][domain]
         unified_data["trafficSources"]["socialBreakdown"] = {}
@@ -488,53 +463,14 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
                     "visits": round(total_social * share, 2) if total_social > 0 else 0
                 }
     
-    # 10. Get total visits metric
-    headers = get_base_headers('800efbf7-d152-434d-9269-4d4dc8255d9b')
-    params = {
-        'country': '999',
-        'from': from_date,
-        'to': to_date,
-        'includeSubDomains': 'true',
-        'isWindow': 'false',
-        'keys': domain,
-        'timeGranularity': 'Monthly',
-        'webSource': 'Total',
-        'ShouldGetVerifiedData': 'false',
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverview/EngagementVisits/SingleMetric',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    visits_data = response.json()
-    
+    # 10. Total visits metric
     if "Data" in visits_data and domain in visits_data["Data"]:
         visits_info = visits_data["Data"][domain]
         unified_data["traffic"]["totalVisits"] = visits_info.get("TotalVisits", 0)
         unified_data["traffic"]["change"] = visits_info.get("Change", 0)
         unified_data["traffic"]["trend"] = visits_info.get("Trend", [])
     
-    # 11. Get web ranks
-    headers = get_base_headers('3283c830-6658-466e-a927-3d68897c67ed')
-    params = {
-        'country': '999',
-        'includeSubDomains': 'true',
-        'webSource': 'Total',
-        'timeGranularity': 'Monthly',
-        'from': from_date,
-        'to': to_date,
-        'isWindow': 'false',
-        'keys': domain,
-    }
-    response = requests.get(
-        'https://pro.similarweb.com/widgetApi/WebsiteOverview/WebRanks/SingleMetric',
-        params=params,
-        cookies=cookies,
-        headers=headers,
-    )
-    ranks_data = response.json()
-    
+    # 11. Web ranks
     if "Data" in ranks_data and domain in ranks_data["Data"]:
         ranks_info = ranks_data["Data"][domain]
         
@@ -562,7 +498,14 @@ def get_website_data(domain: str, from_date: Optional[str] = None, to_date: Opti
     return unified_data
 
 
+def website_info_cache_key(domain: str, from_date: Optional[str] = None, to_date: Optional[str] = None) -> str:
+    """Default dates resolve to the previous month, so the key rolls over with it"""
+    default_from, default_to = get_previous_month_dates()
+    return f"similarweb:website_info:{domain.strip().lower()}:{from_date or default_from}:{to_date or default_to}"
+
+
 @router.get("/website-info")
+@response_cache.cached("similarweb:website_info", key=website_info_cache_key, ttl=604800)  # 7 days - monthly data is final
 async def get_website_info(
     domain: str = Query(..., description="Domain to analyze (e.g., 'arcads.ai')"),
     from_date: Optional[str] = Query(None, description="Start date in format 'YYYY|MM|DD' (defaults to first day of previous month)"),
@@ -593,7 +536,7 @@ async def get_website_info(
         logger.info(f"Fetching SimilarWeb data for domain: {domain}")
         
         # Get website data
-        result = get_website_data(domain, from_date, to_date)
+        result = await get_website_data(domain, from_date, to_date)
         
         if not result or not result.get("domain"):
             logger.info(f"No data found for domain: {domain}")
@@ -657,7 +600,7 @@ async def get_website_info(
             return {}
         
         logger.info(f"Successfully fetched data for {domain}")
-        return JSONResponse(content=result)
+        return result
     
     except HTTPException:
         raise
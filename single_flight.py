@@ -0,0 +1,131 @@
+"""
+Single Flight
+
+Coalesces identical in-flight requests so the upstream work runs once.
+
+Ten clients asking for the same ProductHunt day before the cache is filled used
+to start ten identical scrapes. Routes now build a key from their normalized
+parameters (``make_key``) and then either:
+
+- ``claim_task(key, task_id)`` for background tasks. The first caller owns the
+  key. While that task is queued or running, later callers get its task id
+  back. Claims live in the shared task store and liveness comes from the
+  scheduler's shared job state, so every API worker attaches to the same task.
+- ``run(key, factory)`` for direct async handlers. Concurrent callers in the
+  same process await one shared future.
+
+Across workers, a claim is check-then-set rather than atomic. Two workers that
+race on the very first request may both start the task; after that, everyone
+attaches to it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from job_scheduler import scheduler
+from task_store import TaskCollection
+
+logger = logging.getLogger(__name__)
+
+# A claim whose job hasn't reached the scheduler yet counts as in flight for this long
+CLAIM_GRACE_SECONDS = 30
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value.strip().lower())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def params_digest(**params) -> str:
+    """Stable digest of the normalized parameters (case/whitespace-insensitive, None dropped).
+
+    Response cache keys use it too, so a coalesced request and its cached answer
+    agree on which parameters are "the same".
+    """
+    normalized = {name: _normalize(value) for name, value in params.items() if value is not None}
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SingleFlight:
+    """Shares one task id / future between identical concurrent requests"""
+
+    def __init__(self):
+        self.claims = TaskCollection("single_flight")
+        self._lock = threading.Lock()
+        self._futures: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+        self.stats_counters = {"tasks_started": 0, "tasks_coalesced": 0, "calls_started": 0, "calls_coalesced": 0}
+
+    @staticmethod
+    def make_key(scope: str, **params) -> str:
+        """``scope`` plus a digest of the normalized parameters (see ``params_digest``)"""
+        return f"{scope}:{params_digest(**params)}"
+
+    def claim_task(self, key: str, task_id: str) -> Tuple[str, bool]:
+        """Return ``(owner_task_id, coalesced)``; ``task_id`` becomes the owner unless a live task holds ``key``"""
+        with self._lock:
+            claim = self.claims.get(key)
+            if claim and self._is_active(claim):
+                self.stats_counters["tasks_coalesced"] += 1
+                logger.info(f"🔗 Attaching request to in-flight task {claim['task_id']} ({key})")
+                return claim["task_id"], True
+            self.claims[key] = {"task_id": task_id, "claimed_at": time.time()}
+            self.stats_counters["tasks_started"] += 1
+            return task_id, False
+
+    def release_task(self, key: str, task_id: str):
+        """Drop a claim whose task never got queued (e.g. the scheduler answered 429)"""
+        with self._lock:
+            claim = self.claims.get(key)
+            if claim and claim.get("task_id") == task_id:
+                self.claims.delete(key)
+
+    @staticmethod
+    def _is_active(claim: Dict[str, Any]) -> bool:
+        state = scheduler.jobs.get_field(claim["task_id"], "state")
+        if state is None:
+            # Claimed by a worker that hasn't handed the job to the scheduler yet
+            return time.time() - claim.get("claimed_at", 0) < CLAIM_GRACE_SECONDS
+        return state in ("queued", "running")
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``factory()`` once per key; concurrent callers share the result (or the exception)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            futures = self._futures.setdefault(loop, {})
+        future = futures.get(key)
+        if future is None:
+            self.stats_counters["calls_started"] += 1
+            future = asyncio.ensure_future(factory())
+            futures[key] = future
+            future.add_done_callback(lambda done: self._finished(futures, key, done))
+        else:
+            self.stats_counters["calls_coalesced"] += 1
+            logger.info(f"🔗 Sharing in-flight call for {key}")
+        # A caller that disconnects must not cancel the call the others are waiting on
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _finished(futures: Dict[str, asyncio.Future], key: str, future: asyncio.Future):
+        futures.pop(key, None)
+        if not future.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            future.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight_calls = sum(len(futures) for futures in self._futures.values())
+        return {"in_flight_calls": in_flight_calls, **self.stats_counters}
+
+
+# Global instance
+single_flight = SingleFlight()
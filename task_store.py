@@ -0,0 +1,431 @@
+"""
+Task Store
+
+Shared, durable storage for background task status, progress and result chunks.
+
+Every router used to keep its own process-local ``tasks`` dict, which meant a
+``/result/{task_id}`` poll that landed on a different uvicorn worker returned 404
+and every task was lost on restart. ``TaskCollection`` keeps the familiar
+dict-style access (``task_id in tasks``, ``tasks[task_id]``) but persists each
+task in a shared backend:
+
+- ``redis``  - one hash per task plus a list of result chunks (multi-node)
+- ``sqlite`` - one row per task field plus one row per result item (single node,
+  any number of workers)
+
+Backend selection is controlled with ``TASK_STORE_BACKEND`` (``redis`` or
+``sqlite``). When unset, Redis is used if a Redis host is configured and
+reachable, otherwise SQLite.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+import redis
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tasks (and their result chunks) expire after this many seconds of inactivity
+DEFAULT_TASK_TTL = int(os.getenv('TASK_STORE_TTL', 604800))  # 7 days
+DEFAULT_SQLITE_PATH = os.getenv('TASK_STORE_SQLITE_PATH', 'task_store.db')
+
+
+class RedisTaskBackend:
+    """Redis backend: ``tasks:{namespace}:{task_id}`` hash + ``:results`` list"""
+
+    def __init__(self, client: redis.Redis, ttl: int = DEFAULT_TASK_TTL):
+        self.client = client
+        self.ttl = ttl
+        self.name = "redis"
+
+    def _task_key(self, namespace: str, task_id: str) -> str:
+        return f"tasks:{namespace}:{task_id}"
+
+    def _results_key(self, namespace: str, task_id: str) -> str:
+        return f"tasks:{namespace}:{task_id}:results"
+
+    def _index_key(self, namespace: str) -> str:
+        return f"tasks:{namespace}:index"
+
+    def write_fields(self, namespace: str, task_id: str, fields: Dict[str, str], replace: bool = False):
+        task_key = self._task_key(namespace, task_id)
+        pipe = self.client.pipeline()
+        if replace:
+            pipe.delete(task_key, self._results_key(namespace, task_id))
+        if fields:
+            pipe.hset(task_key, mapping=fields)
+        pipe.expire(task_key, self.ttl)
+        pipe.sadd(self._index_key(namespace), task_id)
+        pipe.execute()
+
+    def read_fields(self, namespace: str, task_id: str) -> Optional[Dict[str, str]]:
+        fields = self.client.hgetall(self._task_key(namespace, task_id))
+        return fields or None
+
+    def read_field(self, namespace: str, task_id: str, field: str) -> Optional[str]:
+        return self.client.hget(self._task_key(namespace, task_id), field)
+
+    def exists(self, namespace: str, task_id: str) -> bool:
+        return bool(self.client.exists(self._task_key(namespace, task_id)))
+
+    def delete(self, namespace: str, task_id: str) -> bool:
+        pipe = self.client.pipeline()
+        pipe.delete(self._task_key(namespace, task_id), self._results_key(namespace, task_id))
+        pipe.srem(self._index_key(namespace), task_id)
+        deleted, _ = pipe.execute()
+        return deleted > 0
+
+    def list_ids(self, namespace: str) -> List[str]:
+        task_ids = sorted(self.client.smembers(self._index_key(namespace)))
+        if not task_ids:
+            return []
+
+        # Drop index entries whose task hash has already expired
+        pipe = self.client.pipeline()
+        for task_id in task_ids:
+            pipe.exists(self._task_key(namespace, task_id))
+        alive = pipe.execute()
+
+        expired = [task_id for task_id, is_alive in zip(task_ids, alive) if not is_alive]
+        if expired:
+            self.client.srem(self._index_key(namespace), *expired)
+        return [task_id for task_id, is_alive in zip(task_ids, alive) if is_alive]
+
+    def append_results(self, namespace: str, task_id: str, items: List[str]):
+        if not items:
+            return
+        results_key = self._results_key(namespace, task_id)
+        pipe = self.client.pipeline()
+        pipe.rpush(results_key, *items)
+        pipe.expire(results_key, self.ttl)
+        pipe.expire(self._task_key(namespace, task_id), self.ttl)
+        pipe.execute()
+
+    def read_results(self, namespace: str, task_id: str, start: int, end: Optional[int]) -> List[str]:
+        # LRANGE is inclusive on both ends
+        stop = -1 if end is None else end - 1
+        if end is not None and end <= start:
+            return []
+        return self.client.lrange(self._results_key(namespace, task_id), start, stop)
+
+    def count_results(self, namespace: str, task_id: str) -> int:
+        return self.client.llen(self._results_key(namespace, task_id))
+
+
+class SQLiteTaskBackend:
+    """SQLite backend shared by every worker process on the same host"""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, ttl: int = DEFAULT_TASK_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.name = "sqlite"
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    namespace TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, task_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_fields (
+                    namespace TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (namespace, task_id, field)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_results (
+                    namespace TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (namespace, task_id, seq)
+                )
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _touch(self, conn: sqlite3.Connection, namespace: str, task_id: str):
+        conn.execute(
+            "INSERT INTO tasks (namespace, task_id, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(namespace, task_id) DO UPDATE SET expires_at = excluded.expires_at",
+            (namespace, task_id, time.time() + self.ttl)
+        )
+
+    def _purge_expired(self, conn: sqlite3.Connection):
+        """Remove expired tasks at most once a minute"""
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        expired = conn.execute("SELECT namespace, task_id FROM tasks WHERE expires_at < ?", (now,)).fetchall()
+        for namespace, task_id in expired:
+            self._delete_rows(conn, namespace, task_id)
+        if expired:
+            logger.info(f"🧹 Purged {len(expired)} expired tasks from SQLite task store")
+
+    def _delete_rows(self, conn: sqlite3.Connection, namespace: str, task_id: str) -> int:
+        deleted = conn.execute("DELETE FROM tasks WHERE namespace = ? AND task_id = ?", (namespace, task_id)).rowcount
+        conn.execute("DELETE FROM task_fields WHERE namespace = ? AND task_id = ?", (namespace, task_id))
+        conn.execute("DELETE FROM task_results WHERE namespace = ? AND task_id = ?", (namespace, task_id))
+        return deleted
+
+    def write_fields(self, namespace: str, task_id: str, fields: Dict[str, str], replace: bool = False):
+        conn = self._conn()
+        with conn:
+            if replace:
+                self._purge_expired(conn)
+                self._delete_rows(conn, namespace, task_id)
+            self._touch(conn, namespace, task_id)
+            conn.executemany(
+                "INSERT INTO task_fields (namespace, task_id, field, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(namespace, task_id, field) DO UPDATE SET value = excluded.value",
+                [(namespace, task_id, field, value) for field, value in fields.items()]
+            )
+
+    def read_fields(self, namespace: str, task_id: str) -> Optional[Dict[str, str]]:
+        if not self.exists(namespace, task_id):
+            return None
+        rows = self._conn().execute(
+            "SELECT field, value FROM task_fields WHERE namespace = ? AND task_id = ?",
+            (namespace, task_id)
+        ).fetchall()
+        return {field: value for field, value in rows}
+
+    def read_field(self, namespace: str, task_id: str, field: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT value FROM task_fields WHERE namespace = ? AND task_id = ? AND field = ?",
+            (namespace, task_id, field)
+        ).fetchone()
+        return row[0] if row else None
+
+    def exists(self, namespace: str, task_id: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM tasks WHERE namespace = ? AND task_id = ? AND expires_at >= ?",
+            (namespace, task_id, time.time())
+        ).fetchone()
+        return row is not None
+
+    def delete(self, namespace: str, task_id: str) -> bool:
+        conn = self._conn()
+        with conn:
+            return self._delete_rows(conn, namespace, task_id) > 0
+
+    def list_ids(self, namespace: str) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT task_id FROM tasks WHERE namespace = ? AND expires_at >= ? ORDER BY task_id",
+            (namespace, time.time())
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def append_results(self, namespace: str, task_id: str, items: List[str]):
+        if not items:
+            return
+        conn = self._conn()
+        with conn:
+            offset = conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM task_results WHERE namespace = ? AND task_id = ?",
+                (namespace, task_id)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO task_results (namespace, task_id, seq, value) VALUES (?, ?, ?, ?)",
+                [(namespace, task_id, offset + i, item) for i, item in enumerate(items)]
+            )
+            self._touch(conn, namespace, task_id)
+
+    def read_results(self, namespace: str, task_id: str, start: int, end: Optional[int]) -> List[str]:
+        if end is None:
+            rows = self._conn().execute(
+                "SELECT value FROM task_results WHERE namespace = ? AND task_id = ? AND seq >= ? ORDER BY seq",
+                (namespace, task_id, start)
+            ).fetchall()
+        else:
+            rows = self._conn().execute(
+                "SELECT value FROM task_results WHERE namespace = ? AND task_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (namespace, task_id, start, end)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count_results(self, namespace: str, task_id: str) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM task_results WHERE namespace = ? AND task_id = ?",
+            (namespace, task_id)
+        ).fetchone()[0]
+
+
+def create_redis_client() -> Optional[redis.Redis]:
+    """Connect using the same environment variables as redis_cache"""
+    redis_host = os.getenv('REDIS_HOST_I') or os.getenv('REDIS_HOST_P')
+    if not redis_host:
+        return None
+
+    try:
+        client = redis.Redis(
+            host=redis_host,
+            port=int(os.getenv('REDIS_PORT', 6379)),
+            password=os.getenv('REDIS_PASSWORD', None),
+            db=int(os.getenv('TASK_STORE_REDIS_DB', os.getenv('REDIS_DB', 1))),
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        logger.error(f"❌ Task store could not connect to Redis: {str(e)}")
+        return None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_task_store():
+    """Return the process-wide task store backend, creating it on first use"""
+    global _store
+    if _store is not None:
+        return _store
+
+    with _store_lock:
+        if _store is not None:
+            return _store
+
+        backend = os.getenv('TASK_STORE_BACKEND', '').lower()
+        if backend in ('', 'redis'):
+            client = create_redis_client()
+            if client is not None:
+                _store = RedisTaskBackend(client)
+                logger.info("✅ Task store using Redis backend")
+                return _store
+            if backend == 'redis':
+                logger.warning("⚠️ TASK_STORE_BACKEND=redis but Redis is unavailable - falling back to SQLite")
+
+        _store = SQLiteTaskBackend(DEFAULT_SQLITE_PATH)
+        logger.info(f"✅ Task store using SQLite backend at {DEFAULT_SQLITE_PATH}")
+        return _store
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(jsonable_encoder(value), default=str)
+
+
+def _decode(value: Optional[str]) -> Any:
+    return json.loads(value) if value is not None else None
+
+
+class TaskCollection:
+    """Dict-like view over one namespace of the shared task store.
+
+    Reads return a snapshot (a ``model`` instance, or a plain dict when no model
+    is given). Mutating the snapshot does not persist - use ``update()``.
+    """
+
+    def __init__(self, namespace: str, model: Optional[Type[BaseModel]] = None):
+        self.namespace = namespace
+        self.model = model
+
+    @property
+    def backend(self):
+        return get_task_store()
+
+    def _build(self, fields: Dict[str, str]) -> Any:
+        data = {field: _decode(value) for field, value in fields.items()}
+        return self.model(**data) if self.model else data
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.backend.exists(self.namespace, task_id)
+
+    def __getitem__(self, task_id: str) -> Any:
+        fields = self.backend.read_fields(self.namespace, task_id)
+        if fields is None:
+            raise KeyError(task_id)
+        return self._build(fields)
+
+    def __setitem__(self, task_id: str, value: Any):
+        data = jsonable_encoder(value)
+        fields = {field: json.dumps(field_value, default=str) for field, field_value in data.items()}
+        self.backend.write_fields(self.namespace, task_id, fields, replace=True)
+
+    def __delitem__(self, task_id: str):
+        if not self.backend.delete(self.namespace, task_id):
+            raise KeyError(task_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, task_id: str, default: Any = None) -> Any:
+        try:
+            return self[task_id]
+        except KeyError:
+            return default
+
+    def get_field(self, task_id: str, field: str, default: Any = None) -> Any:
+        """Read a single field without loading the whole task"""
+        value = self.backend.read_field(self.namespace, task_id, field)
+        return _decode(value) if value is not None else default
+
+    def keys(self) -> List[str]:
+        return self.backend.list_ids(self.namespace)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        items = []
+        for task_id in self.keys():
+            task = self.get(task_id)
+            if task is not None:
+                items.append((task_id, task))
+        return items
+
+    def values(self) -> List[Any]:
+        return [task for _, task in self.items()]
+
+    def update(self, task_id: str, **fields) -> bool:
+        """Persist the given fields; returns False if the task does not exist"""
+        if not self.backend.exists(self.namespace, task_id):
+            return False
+        if self.model:
+            fields = {key: value for key, value in fields.items() if key in self.model.model_fields}
+        self.backend.write_fields(self.namespace, task_id, {key: _encode(value) for key, value in fields.items()})
+        return True
+
+    def delete(self, task_id: str) -> bool:
+        return self.backend.delete(self.namespace, task_id)
+
+    def append_results(self, task_id: str, items: List[Any]):
+        """Append a chunk of result items to the task's result list"""
+        self.backend.append_results(self.namespace, task_id, [_encode(item) for item in items])
+
+    def get_results(self, task_id: str, start: int = 0, end: Optional[int] = None) -> List[Any]:
+        """Read result items ``[start:end]`` without loading the full list"""
+        return [_decode(item) for item in self.backend.read_results(self.namespace, task_id, start, end)]
+
+    def count_results(self, task_id: str) -> int:
+        return self.backend.count_results(self.namespace, task_id)
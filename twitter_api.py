@@ -5,9 +5,9 @@ FastAPI router for Twitter data scraping functionality.
 Includes profile information, followers, following, posts, and search capabilities.
 """
 
-from fastapi import APIRouter, Query, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import JSONResponse
-import requests
+import httpx
 import json
 from bs4 import BeautifulSoup
 import logging
@@ -17,12 +17,16 @@ import asyncio
 from datetime import datetime
 from typing import Dict, Any, List
 from pydantic import BaseModel, Field
-from concurrent.futures import ThreadPoolExecutor
 from curl_cffi import requests as curl_requests
 from urllib.parse import urlparse, parse_qs
 import os
 from dotenv import load_dotenv
 
+from http_clients import http_clients, with_cookies
+from redis_cache import response_cache
+from job_scheduler import scheduler
+from task_store import TaskCollection
+
 load_dotenv()
 
 
@@ -36,8 +40,11 @@ logger = logging.getLogger(__name__)
 # Create router instead of app
 router = APIRouter()
 
-# In-memory storage for background tasks
-tasks: Dict[str, Dict[str, Any]] = {}
+
+async def x_get(url: str, params=None, cookies=None, headers=None) -> httpx.Response:
+    """GET an x.com endpoint on the shared keep-alive client"""
+    return await http_clients.async_client().get(url, params=params, headers=with_cookies(headers, cookies))
+
 
 # Pydantic models for task management
 class ListMembersStatus(BaseModel):
@@ -51,7 +58,9 @@ class ListMembersStatus(BaseModel):
     pages_processed: int = 0
     current_page: int = 0
     last_updated: str
-    results: List[Dict[str, Any]] = []  # Store the extracted members
+
+# Shared storage for background tasks; extracted members are stored as result chunks
+tasks = TaskCollection("twitter", ListMembersStatus)
 
 # @router.get("/")
 # async def root():
@@ -1220,6 +1229,11 @@ async def health_check():
     }
 
 @router.get("/profile_info")
+@response_cache.cached(
+    "twitter:profile_info",
+    key=lambda username: f"twitter:profile_info:{username.strip().lstrip('@').lower()}",
+    ttl=3600  # 1 hour
+)
 async def profile_info(username: str = Query(..., description="account username")):
     cookies = {
         'guest_id_marketing': 'v1%3A174181642626063507',
@@ -1290,7 +1304,7 @@ async def profile_info(username: str = Query(..., description="account username"
         'fieldToggles': '{"withAuxiliaryUserLabels":true}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/x3RLKWW1Tl7JgU7YtGxuzw/UserByScreenName',
         params=params,
         cookies=cookies,
@@ -1440,7 +1454,7 @@ async def get_followers(username: str = Query(..., description="account username
         'fieldToggles': '{"withAuxiliaryUserLabels":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/32pL5BWe9WKeSK1MoPvFQQ/UserByScreenName',
         params=params,
         cookies=cookies,
@@ -1524,7 +1538,7 @@ async def get_followers(username: str = Query(..., description="account username
         'features': '{"rweb_video_screen_enabled":false,"payments_enabled":false,"profile_label_improvements_pcf_label_in_post_enabled":true,"rweb_tipjar_consumption_enabled":true,"verified_phone_label_enabled":false,"creator_subscriptions_tweet_preview_api_enabled":true,"responsive_web_graphql_timeline_navigation_enabled":true,"responsive_web_graphql_skip_user_profile_image_extensions_enabled":false,"premium_content_api_read_enabled":false,"communities_web_enable_tweet_community_results_fetch":true,"c9s_tweet_anatomy_moderator_badge_enabled":true,"responsive_web_grok_analyze_button_fetch_trends_enabled":false,"responsive_web_grok_analyze_post_followups_enabled":true,"responsive_web_jetfuel_frame":true,"responsive_web_grok_share_attachment_enabled":true,"articles_preview_enabled":true,"responsive_web_edit_tweet_api_enabled":true,"graphql_is_translatable_rweb_tweet_is_translatable_enabled":true,"view_counts_everywhere_api_enabled":true,"longform_notetweets_consumption_enabled":true,"responsive_web_twitter_article_tweet_consumption_enabled":true,"tweet_awards_web_tipping_enabled":false,"responsive_web_grok_show_grok_translated_post":false,"responsive_web_grok_analysis_button_from_backend":true,"creator_subscriptions_quote_tweet_preview_enabled":false,"freedom_of_speech_not_reach_fetch_enabled":true,"standardized_nudges_misinfo":true,"tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled":true,"longform_notetweets_rich_text_read_enabled":true,"longform_notetweets_inline_media_enabled":true,"responsive_web_grok_image_annotation_enabled":true,"responsive_web_grok_community_note_auto_translation_is_enabled":false,"responsive_web_enhance_cards_enabled":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/gjc9BPYkYF-cDv5FdL-29A/Followers',
         params=params,
         cookies=cookies,
@@ -1652,7 +1666,7 @@ async def get_followers(username: str = Query(..., description="account username
         'features': '{"rweb_video_screen_enabled":false,"payments_enabled":false,"profile_label_improvements_pcf_label_in_post_enabled":true,"rweb_tipjar_consumption_enabled":true,"verified_phone_label_enabled":false,"creator_subscriptions_tweet_preview_api_enabled":true,"responsive_web_graphql_timeline_navigation_enabled":true,"responsive_web_graphql_skip_user_profile_image_extensions_enabled":false,"premium_content_api_read_enabled":false,"communities_web_enable_tweet_community_results_fetch":true,"c9s_tweet_anatomy_moderator_badge_enabled":true,"responsive_web_grok_analyze_button_fetch_trends_enabled":false,"responsive_web_grok_analyze_post_followups_enabled":true,"responsive_web_jetfuel_frame":true,"responsive_web_grok_share_attachment_enabled":true,"articles_preview_enabled":true,"responsive_web_edit_tweet_api_enabled":true,"graphql_is_translatable_rweb_tweet_is_translatable_enabled":true,"view_counts_everywhere_api_enabled":true,"longform_notetweets_consumption_enabled":true,"responsive_web_twitter_article_tweet_consumption_enabled":true,"tweet_awards_web_tipping_enabled":false,"responsive_web_grok_show_grok_translated_post":false,"responsive_web_grok_analysis_button_from_backend":true,"creator_subscriptions_quote_tweet_preview_enabled":false,"freedom_of_speech_not_reach_fetch_enabled":true,"standardized_nudges_misinfo":true,"tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled":true,"longform_notetweets_rich_text_read_enabled":true,"longform_notetweets_inline_media_enabled":true,"responsive_web_grok_image_annotation_enabled":true,"responsive_web_grok_community_note_auto_translation_is_enabled":false,"responsive_web_enhance_cards_enabled":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/U_YXAm7JJsfvjFUJwObTdw/BlueVerifiedFollowers',
         params=params,
         cookies=cookies,
@@ -1788,7 +1802,7 @@ async def get_followers(username: str = Query(..., description="account username
         'features': '{"rweb_video_screen_enabled":false,"payments_enabled":false,"profile_label_improvements_pcf_label_in_post_enabled":true,"rweb_tipjar_consumption_enabled":true,"verified_phone_label_enabled":false,"creator_subscriptions_tweet_preview_api_enabled":true,"responsive_web_graphql_timeline_navigation_enabled":true,"responsive_web_graphql_skip_user_profile_image_extensions_enabled":false,"premium_content_api_read_enabled":false,"communities_web_enable_tweet_community_results_fetch":true,"c9s_tweet_anatomy_moderator_badge_enabled":true,"responsive_web_grok_analyze_button_fetch_trends_enabled":false,"responsive_web_grok_analyze_post_followups_enabled":true,"responsive_web_jetfuel_frame":true,"responsive_web_grok_share_attachment_enabled":true,"articles_preview_enabled":true,"responsive_web_edit_tweet_api_enabled":true,"graphql_is_translatable_rweb_tweet_is_translatable_enabled":true,"view_counts_everywhere_api_enabled":true,"longform_notetweets_consumption_enabled":true,"responsive_web_twitter_article_tweet_consumption_enabled":true,"tweet_awards_web_tipping_enabled":false,"responsive_web_grok_show_grok_translated_post":false,"responsive_web_grok_analysis_button_from_backend":true,"creator_subscriptions_quote_tweet_preview_enabled":false,"freedom_of_speech_not_reach_fetch_enabled":true,"standardized_nudges_misinfo":true,"tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled":true,"longform_notetweets_rich_text_read_enabled":true,"longform_notetweets_inline_media_enabled":true,"responsive_web_grok_image_annotation_enabled":true,"responsive_web_grok_community_note_auto_translation_is_enabled":false,"responsive_web_enhance_cards_enabled":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/U_YXAm7JJsfvjFUJwObTdw/BlueVerifiedFollowers',
         params=params,
         cookies=cookies,
@@ -1924,7 +1938,7 @@ async def get_followers(username: str = Query(..., description="account username
         'features': '{"rweb_video_screen_enabled":false,"payments_enabled":false,"profile_label_improvements_pcf_label_in_post_enabled":true,"rweb_tipjar_consumption_enabled":true,"verified_phone_label_enabled":false,"creator_subscriptions_tweet_preview_api_enabled":true,"responsive_web_graphql_timeline_navigation_enabled":true,"responsive_web_graphql_skip_user_profile_image_extensions_enabled":false,"premium_content_api_read_enabled":false,"communities_web_enable_tweet_community_results_fetch":true,"c9s_tweet_anatomy_moderator_badge_enabled":true,"responsive_web_grok_analyze_button_fetch_trends_enabled":false,"responsive_web_grok_analyze_post_followups_enabled":true,"responsive_web_jetfuel_frame":true,"responsive_web_grok_share_attachment_enabled":true,"articles_preview_enabled":true,"responsive_web_edit_tweet_api_enabled":true,"graphql_is_translatable_rweb_tweet_is_translatable_enabled":true,"view_counts_everywhere_api_enabled":true,"longform_notetweets_consumption_enabled":true,"responsive_web_twitter_article_tweet_consumption_enabled":true,"tweet_awards_web_tipping_enabled":false,"responsive_web_grok_show_grok_translated_post":false,"responsive_web_grok_analysis_button_from_backend":true,"creator_subscriptions_quote_tweet_preview_enabled":false,"freedom_of_speech_not_reach_fetch_enabled":true,"standardized_nudges_misinfo":true,"tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled":true,"longform_notetweets_rich_text_read_enabled":true,"longform_notetweets_inline_media_enabled":true,"responsive_web_grok_image_annotation_enabled":true,"responsive_web_grok_community_note_auto_translation_is_enabled":false,"responsive_web_enhance_cards_enabled":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/U_YXAm7JJsfvjFUJwObTdw/BlueVerifiedFollowers',
         params=params,
         cookies=cookies,
@@ -2068,7 +2082,7 @@ async def get_following(username: str = Query(..., description="account username
         'fieldToggles': '{"withAuxiliaryUserLabels":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/32pL5BWe9WKeSK1MoPvFQQ/UserByScreenName',
         params=params,
         cookies=cookies,
@@ -2132,7 +2146,7 @@ async def get_following(username: str = Query(..., description="account username
         'features': '{"profile_label_improvements_pcf_label_in_post_enabled":true,"rweb_tipjar_consumption_enabled":true,"responsive_web_graphql_exclude_directive_enabled":true,"verified_phone_label_enabled":false,"creator_subscriptions_tweet_preview_api_enabled":true,"responsive_web_graphql_timeline_navigation_enabled":true,"responsive_web_graphql_skip_user_profile_image_extensions_enabled":false,"premium_content_api_read_enabled":false,"communities_web_enable_tweet_community_results_fetch":true,"c9s_tweet_anatomy_moderator_badge_enabled":true,"responsive_web_grok_analyze_button_fetch_trends_enabled":false,"responsive_web_grok_analyze_post_followups_enabled":true,"responsive_web_jetfuel_frame":false,"responsive_web_grok_share_attachment_enabled":true,"articles_preview_enabled":true,"responsive_web_edit_tweet_api_enabled":true,"graphql_is_translatable_rweb_tweet_is_translatable_enabled":true,"view_counts_everywhere_api_enabled":true,"longform_notetweets_consumption_enabled":true,"responsive_web_twitter_article_tweet_consumption_enabled":true,"tweet_awards_web_tipping_enabled":false,"responsive_web_grok_analysis_button_from_backend":true,"creator_subscriptions_quote_tweet_preview_enabled":false,"freedom_of_speech_not_reach_fetch_enabled":true,"standardized_nudges_misinfo":true,"tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled":true,"rweb_video_timestamps_enabled":true,"longform_notetweets_rich_text_read_enabled":true,"longform_notetweets_inline_media_enabled":true,"responsive_web_grok_image_annotation_enabled":false,"responsive_web_enhance_cards_enabled":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/o5eNLkJb03ayTQa97Cpp7w/Following',
         params=params,
         cookies=cookies,
@@ -2263,7 +2277,7 @@ async def get_profile_posts(
         'fieldToggles': '{"withAuxiliaryUserLabels":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/32pL5BWe9WKeSK1MoPvFQQ/UserByScreenName',
         params=params,
         cookies=cookies,
@@ -2295,7 +2309,7 @@ async def get_profile_posts(
         'fieldToggles': '{"withArticlePlainText":false}',
     }
 
-    response = requests.get(
+    response = await x_get(
         'https://x.com/i/api/graphql/Y9WM4Id6UcGFE8Z-hbnixw/UserTweets',
         params=params,
         cookies=cookies,
@@ -2598,7 +2612,7 @@ async def search_tweets(
         'features': json.dumps(features),
     }
 
-    response = requests.get(url, cookies=cookies, headers=headers, params=params)
+    response = await x_get(url, cookies=cookies, headers=headers, params=params)
     try:
         data = response.json()
     except:
@@ -3490,7 +3504,7 @@ async def search_people(
     }
 
     # Make the request
-    response = requests.get(base_url, cookies=cookies, headers=headers, params=params)
+    response = await x_get(base_url, cookies=cookies, headers=headers, params=params)
 
     print("this is the response", response.text)
     try:
@@ -3583,7 +3597,6 @@ def extract_list_id(list_identifier: str) -> str:
 
 @router.get("/list_members")
 async def get_list_members(
-    background_tasks: BackgroundTasks,
     list_identifier: str = Query(..., description="Twitter list ID or URL (e.g., '123456789' or 'https://x.com/i/lists/123456789/members')")
 ):
     """
@@ -3627,8 +3640,12 @@ async def get_list_members(
             last_updated=datetime.now().isoformat()
         )
         
-        # Add background task (fixed count of 500)
-        background_tasks.add_task(extract_list_members_task, task_id, list_id)
+        # Hand the task to the bounded twitter queue (fixed count of 500, 429 when full)
+        try:
+            queue_info = scheduler.submit("twitter", task_id, extract_list_members_sync, task_id, list_id)
+        except HTTPException:
+            tasks.delete(task_id)
+            raise
         
         # Return immediately
         return {
@@ -3637,6 +3654,7 @@ async def get_list_members(
             "message": "List members extraction task queued successfully",
             "list_id": list_id,
             "count_per_page": 500,
+            "queue_position": queue_info["queue_position"],
             "status_url": f"/twitter/status/{task_id}",
             "results_url": f"/twitter/results/{task_id}"
         }
@@ -3654,9 +3672,10 @@ def extract_list_members_sync(task_id: str, list_id: str):
     """Synchronous function to extract list members (runs in thread pool)"""
     try:
         # Update task status to running
-        tasks[task_id].status = "running"
-        tasks[task_id].message = "Starting list members extraction..."
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     status="running",
+                     message="Starting list members extraction...",
+                     last_updated=datetime.now().isoformat())
         
         logger.info(f"Starting list members extraction for task {task_id}, list {list_id}")
         
@@ -3706,7 +3725,7 @@ def extract_list_members_sync(task_id: str, list_id: str):
         }
 
         # Make initial request
-        response = requests.get(
+        response = http_clients.session().get(
             'https://x.com/i/api/graphql/DBsxqYmf80LvtzMsmWYTKA/ListMembers',
             params=params,
             cookies=cookies,
@@ -3714,31 +3733,32 @@ def extract_list_members_sync(task_id: str, list_id: str):
         )
 
         if response.status_code != 200:
-            tasks[task_id].status = "failed"
-            tasks[task_id].message = f"Failed to fetch list members. Twitter API returned status {response.status_code}"
-            tasks[task_id].last_updated = datetime.now().isoformat()
+            tasks.update(task_id,
+                         status="failed",
+                         message=f"Failed to fetch list members. Twitter API returned status {response.status_code}",
+                         last_updated=datetime.now().isoformat())
             return
 
         # Extract initial members
         response_data = response.json()
         all_members = extract_user_info(response_data)
         
-        # Update task with first page results
-        tasks[task_id].total_members = len(all_members)
-        tasks[task_id].pages_processed = 1
-        tasks[task_id].current_page = 1
-        tasks[task_id].progress = 10
-        tasks[task_id].message = f"Fetched {len(all_members)} members from first page"
-        tasks[task_id].last_updated = datetime.now().isoformat()
-        
-        # Store results in task
-        tasks[task_id].results = all_members
+        # Store first page results, then update task progress
+        tasks.append_results(task_id, all_members)
+        tasks.update(task_id,
+                     total_members=len(all_members),
+                     pages_processed=1,
+                     current_page=1,
+                     progress=10,
+                     message=f"Fetched {len(all_members)} members from first page",
+                     last_updated=datetime.now().isoformat())
         
         # If no members found on first page, mark as completed
         if len(all_members) == 0:
-            tasks[task_id].status = "completed"
-            tasks[task_id].message = "No members found in the list. The list might be empty, private, or not accessible."
-            tasks[task_id].last_updated = datetime.now().isoformat()
+            tasks.update(task_id,
+                         status="completed",
+                         message="No members found in the list. The list might be empty, private, or not accessible.",
+                         last_updated=datetime.now().isoformat())
             return
         
         # Handle pagination - exactly like the original script
@@ -3759,7 +3779,7 @@ def extract_list_members_sync(task_id: str, list_id: str):
             params['variables'] = json.dumps({"listId": list_id, "count": 500, "cursor": cursor})
             
             # Make next request
-            response = requests.get(
+            response = http_clients.session().get(
                 'https://x.com/i/api/graphql/DBsxqYmf80LvtzMsmWYTKA/ListMembers',
                 params=params,
                 cookies=cookies,
@@ -3775,14 +3795,15 @@ def extract_list_members_sync(task_id: str, list_id: str):
             all_members.extend(page_members)
             request_count += 1
             
-            # Update task progress
-            tasks[task_id].total_members = len(all_members)
-            tasks[task_id].pages_processed = request_count + 1
-            tasks[task_id].current_page = request_count + 1
-            tasks[task_id].progress = min(90, 10 + (request_count * 5))  # Progress up to 90%
-            tasks[task_id].message = f"Fetched {len(page_members)} members from page {request_count + 1}. Total: {len(all_members)}"
-            tasks[task_id].results = all_members
-            tasks[task_id].last_updated = datetime.now().isoformat()
+            # Append this page's members and update task progress
+            tasks.append_results(task_id, page_members)
+            tasks.update(task_id,
+                         total_members=len(all_members),
+                         pages_processed=request_count + 1,
+                         current_page=request_count + 1,
+                         progress=min(90, 10 + (request_count * 5)),  # Progress up to 90%
+                         message=f"Fetched {len(page_members)} members from page {request_count + 1}. Total: {len(all_members)}",
+                         last_updated=datetime.now().isoformat())
             
             # Small delay to avoid rate limiting
             time.sleep(0.5)
@@ -3791,24 +3812,20 @@ def extract_list_members_sync(task_id: str, list_id: str):
                 break
         
         # Mark task as completed
-        tasks[task_id].status = "completed"
-        tasks[task_id].progress = 100
-        tasks[task_id].message = f"Successfully extracted {len(all_members)} members from list {list_id} across {request_count + 1} pages"
-        tasks[task_id].last_updated = datetime.now().isoformat()
+        tasks.update(task_id,
+                     status="completed",
+                     progress=100,
+                     message=f"Successfully extracted {len(all_members)} members from list {list_id} across {request_count + 1} pages",
+                     last_updated=datetime.now().isoformat())
         
         logger.info(f"✅ Task {task_id} completed: {len(all_members)} members extracted")
         
     except Exception as e:
         logger.error(f"Error in background task {task_id}: {str(e)}")
-        tasks[task_id].status = "failed"
-        tasks[task_id].message = f"Task failed: {str(e)}"
-        tasks[task_id].last_updated = datetime.now().isoformat()
-
-async def extract_list_members_task(task_id: str, list_id: str):
-    """Async wrapper for the background task"""
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as executor:
-        await loop.run_in_executor(executor, extract_list_members_sync, task_id, list_id)
+        tasks.update(task_id,
+                     status="failed",
+                     message=f"Task failed: {str(e)}",
+                     last_updated=datetime.now().isoformat())
 
 @router.get("/results/{task_id}")
 async def get_twitter_task_results(
@@ -3843,13 +3860,12 @@ async def get_twitter_task_results(
             "pages_processed": getattr(task, "pages_processed", None),
             "current_page": getattr(task, "current_page", None),
             "last_updated": getattr(task, "last_updated", None),
+            "queue_position": scheduler.get_queue_position(task_id),
         }
 
     # Task is completed - return paginated data
-    all_results = getattr(task, "results", []) or []
-
     # Calculate pagination
-    total_items = len(all_results)
+    total_items = tasks.count_results(task_id)
     total_pages = (total_items + per_page - 1) // per_page if total_items else 1
 
     if page > total_pages and total_items != 0:
@@ -3862,7 +3878,7 @@ async def get_twitter_task_results(
     end_idx = start_idx + per_page
 
     # Get page items
-    page_results = all_results[start_idx:end_idx]
+    page_results = tasks.get_results(task_id, start_idx, end_idx)
 
     # Determine result key based on task type
     result_key = "members" if hasattr(task, "list_id") else "items"
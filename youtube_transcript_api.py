@@ -1,4 +1,3 @@
-import requests
 import json
 import re
 import logging
@@ -8,6 +7,9 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+from http_clients import http_clients
+from redis_cache import response_cache
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,6 +45,11 @@ class YouTubeTranscriptError(BaseModel):
     timestamp: str
 
 @router.post("/transcript", response_model=YouTubeTranscriptResponse)
+@response_cache.cached(
+    "youtube:transcript",
+    key=lambda request: f"youtube:transcript:{request.url.split('&', 1)[0].strip()}",
+    ttl=604800  # 7 days - published transcripts rarely change
+)
 async def get_youtube_transcript(request: YouTubeTranscriptRequest):
     """
     Extract transcript from a YouTube video URL.
@@ -66,7 +73,7 @@ async def get_youtube_transcript(request: YouTubeTranscriptRequest):
         video_id = url.split('v=')[1]
         
         # Get the page content to extract transcript parameters
-        response_text = requests.get(url).text
+        response_text = (await http_clients.async_client().get(url)).text
         match = re.search(r'"getTranscriptEndpoint":\{"params":"(.*?)"', response_text)
         
         if not match:
@@ -201,7 +208,7 @@ async def get_youtube_transcript(request: YouTubeTranscriptRequest):
         }
 
         # Make the transcript API request
-        transcript_response = requests.post(
+        transcript_response = await http_clients.async_client().post(
             'https://www.youtube.com/youtubei/v1/get_transcript',
             params=params,
             headers=headers,
@@ -4,7 +4,7 @@ Zillow Real Estate Search Router
 FastAPI router for searching Zillow real estate listings.
 """
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 import requests
@@ -19,6 +19,11 @@ import asyncio
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
+from http_clients import http_clients
+from job_scheduler import scheduler
+from single_flight import single_flight
+from task_store import TaskCollection
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -91,24 +96,24 @@ class ZillowTaskStatus(BaseModel):
     location: str = ""
     search_parameters: Dict[str, Any] = {}
 
-# In-memory task storage (in production, use Redis or database)
-tasks: Dict[str, ZillowTaskStatus] = {}
-task_results: Dict[str, Dict[str, Any]] = {}
+# Shared task storage (Redis or SQLite, see task_store). Result metadata lives in
+# task_results; the listings themselves are stored as result chunks on it.
+tasks = TaskCollection("zillow", ZillowTaskStatus)
+task_results = TaskCollection("zillow_results")
 
 def update_task_status(task_id: str, **kwargs):
     """Update task status with detailed progress information"""
     if task_id in tasks:
         # Update timestamp
         kwargs['elapsed_time_seconds'] = 0
-        if tasks[task_id].started_at:
-            start_time = datetime.fromisoformat(tasks[task_id].started_at)
+        started_at = kwargs.get('started_at') or tasks.get_field(task_id, 'started_at')
+        if started_at:
+            start_time = datetime.fromisoformat(started_at)
             elapsed = (datetime.now() - start_time).total_seconds()
             kwargs['elapsed_time_seconds'] = round(elapsed, 2)
         
-        # Update the task with new information
-        for key, value in kwargs.items():
-            if hasattr(tasks[task_id], key):
-                setattr(tasks[task_id], key, value)
+        # Persist the new information (unknown fields are ignored)
+        tasks.update(task_id, **kwargs)
         
         logger.debug(f"📊 Updated task {task_id}: {kwargs}")
     else:
@@ -266,7 +271,7 @@ def search_zillow_rentals(
                 'isDebugRequest': False,
             }
             
-            response = requests.put(
+            response = http_clients.session().put(
                 'https://www.zillow.com/async-create-search-page-state',
                 headers=ZILLOW_HEADERS,
                 json=json_data,
@@ -416,7 +421,7 @@ def search_zillow_listings(
                 'isDebugRequest': False,
             }
             
-            response = requests.put(
+            response = http_clients.session().put(
                 'https://www.zillow.com/async-create-search-page-state',
                 headers=ZILLOW_HEADERS,
                 json=json_data,
@@ -518,7 +523,7 @@ def run_sales_scraping_sync(task_id: str, location: str, min_price: int, max_pri
                 'isDebugRequest': False,
             }
             
-            response = requests.put(
+            response = http_clients.session().put(
                 'https://www.zillow.com/async-create-search-page-state',
                 headers=ZILLOW_HEADERS,
                 json=json_data,
@@ -562,9 +567,9 @@ def run_sales_scraping_sync(task_id: str, location: str, min_price: int, max_pri
                 "min_monthly_payment": min_monthly_payment,
                 "max_monthly_payment": max_monthly_payment,
                 "sort_by": sort_by
-            },
-            "results": full_data
+            }
         }
+        task_results.append_results(task_id, full_data)
         
         update_task_status(
             task_id,
@@ -638,7 +643,7 @@ def run_rentals_scraping_sync(task_id: str, location: str, min_price: int, max_p
                 'isDebugRequest': False,
             }
             
-            response = requests.put(
+            response = http_clients.session().put(
                 'https://www.zillow.com/async-create-search-page-state',
                 headers=ZILLOW_HEADERS,
                 json=json_data,
@@ -706,9 +711,9 @@ def run_rentals_scraping_sync(task_id: str, location: str, min_price: int, max_p
                 "min_monthly_payment": min_monthly_payment,
                 "max_monthly_payment": max_monthly_payment,
                 "sort_by": sort_by
-            },
-            "results": full_data
+            }
         }
+        task_results.append_results(task_id, full_data)
         
         update_task_status(
             task_id,
@@ -876,7 +881,7 @@ def run_sold_properties_scraping_sync(task_id: str, location: str, min_price: in
                 'isDebugRequest': False,
             }
             
-            response = requests.put(
+            response = http_clients.session().put(
                 'https://www.zillow.com/async-create-search-page-state',
                 headers=ZILLOW_HEADERS,
                 json=json_data,
@@ -920,9 +925,9 @@ def run_sold_properties_scraping_sync(task_id: str, location: str, min_price: in
                 "min_monthly_payment": min_monthly_payment,
                 "max_monthly_payment": max_monthly_payment,
                 "sort_by": sort_by
-            },
-            "results": full_data
+            }
         }
+        task_results.append_results(task_id, full_data)
         
         update_task_status(
             task_id,
@@ -984,7 +989,6 @@ async def scrape_sold_properties_task(task_id: str, location: str, min_price: in
 
 @router.get("/for-sale")
 async def search_sales_async(
-    background_tasks: BackgroundTasks,
     location: str = Query(..., description="Location to search (e.g., 'Austin TX', 'New York NY')"),
     min_price: int = Query(0, description="Minimum price filter"),
     max_price: int = Query(1000000, description="Maximum price filter"),
@@ -1033,8 +1037,24 @@ async def search_sales_async(
         raise HTTPException(status_code=400, detail=f"Invalid sort_by. Must be one of: {', '.join(valid_sorts)}")
     
     try:
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())
+        # Identical searches already queued or running share that task instead of scraping again
+        flight_key = single_flight.make_key(
+            "zillow", search_type="sales", location=location, min_price=min_price, max_price=max_price,
+            min_monthly_payment=min_monthly_payment, max_monthly_payment=max_monthly_payment,
+            max_pages=max_pages, sort_by=sort_by
+        )
+        task_id, coalesced = single_flight.claim_task(flight_key, str(uuid.uuid4()))
+        if coalesced:
+            return {
+                "task_id": task_id,
+                "status": tasks.get_field(task_id, "status", "pending"),
+                "message": "Attached to an identical sales search already in progress",
+                "location": location,
+                "search_type": "sales",
+                "queue_position": scheduler.get_queue_position(task_id),
+                "results_url": f"/zillow/results/{task_id}",
+                "coalesced": True
+            }
         logger.info(f"🆔 Generated task ID: {task_id}")
         
         # Create task status
@@ -1057,12 +1077,17 @@ async def search_sales_async(
             current_operation="Task queued"
         )
         
-        # Add background task
-        background_tasks.add_task(
-            scrape_sales_task,
-            task_id, location, min_price, max_price,
-            min_monthly_payment, max_monthly_payment, max_pages, sort_by
-        )
+        # Hand the task to the bounded zillow queue (429 when full)
+        try:
+            queue_info = scheduler.submit(
+                "zillow", task_id, scrape_sales_task,
+                task_id, location, min_price, max_price,
+                min_monthly_payment, max_monthly_payment, max_pages, sort_by
+            )
+        except HTTPException:
+            tasks.delete(task_id)
+            single_flight.release_task(flight_key, task_id)
+            raise
         
         logger.info(f"✅ Async sales task {task_id} queued successfully for location: '{location}'")
         
@@ -1072,16 +1097,18 @@ async def search_sales_async(
             "message": "Sales search task queued successfully",
             "location": location,
             "search_type": "sales",
+            "queue_position": queue_info["queue_position"],
             "results_url": f"/zillow/results/{task_id}"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in search_sales_async: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/for-rent")
 async def search_rentals_async(
-    background_tasks: BackgroundTasks,
     location: str = Query(..., description="Location to search (e.g., 'Austin TX')"),
     min_price: int = Query(0, description="Minimum rent price filter"),
     max_price: int = Query(5000, description="Maximum rent price filter"),
@@ -1154,12 +1181,16 @@ async def search_rentals_async(
             current_operation="Task queued"
         )
         
-        # Add background task
-        background_tasks.add_task(
-            scrape_rentals_task,
-            task_id, location, min_price, max_price,
-            min_monthly_payment, max_monthly_payment, max_pages, sort_by
-        )
+        # Hand the task to the bounded zillow queue (429 when full)
+        try:
+            queue_info = scheduler.submit(
+                "zillow", task_id, scrape_rentals_task,
+                task_id, location, min_price, max_price,
+                min_monthly_payment, max_monthly_payment, max_pages, sort_by
+            )
+        except HTTPException:
+            tasks.delete(task_id)
+            raise
         
         logger.info(f"✅ Async rentals task {task_id} queued successfully for location: '{location}'")
         
@@ -1169,16 +1200,18 @@ async def search_rentals_async(
             "message": "Rentals search task queued successfully",
             "location": location,
             "search_type": "rentals",
+            "queue_position": queue_info["queue_position"],
             "results_url": f"/zillow/results/{task_id}"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in search_rentals_async: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/sold")
 async def search_sold_properties_async(
-    background_tasks: BackgroundTasks,
     location: str = Query(..., description="Location to search (e.g., 'Austin TX', 'New York NY')"),
     min_price: int = Query(0, description="Minimum price filter"),
     max_price: int = Query(1000000, description="Maximum price filter"),
@@ -1251,12 +1284,16 @@ async def search_sold_properties_async(
             current_operation="Task queued"
         )
         
-        # Add background task
-        background_tasks.add_task(
-            scrape_sold_properties_task,
-            task_id, location, min_price, max_price,
-            min_monthly_payment, max_monthly_payment, max_pages, sort_by
-        )
+        # Hand the task to the bounded zillow queue (429 when full)
+        try:
+            queue_info = scheduler.submit(
+                "zillow", task_id, scrape_sold_properties_task,
+                task_id, location, min_price, max_price,
+                min_monthly_payment, max_monthly_payment, max_pages, sort_by
+            )
+        except HTTPException:
+            tasks.delete(task_id)
+            raise
         
         logger.info(f"✅ Async sold properties task {task_id} queued successfully for location: '{location}'")
         
@@ -1266,9 +1303,12 @@ async def search_sold_properties_async(
             "message": "Sold properties search task queued successfully",
             "location": location,
             "search_type": "sold",
+            "queue_position": queue_info["queue_position"],
             "results_url": f"/zillow/results/{task_id}"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in search_sold_properties_async: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -1315,6 +1355,7 @@ async def get_task_results(
             "search_type": task.search_type,
             "location": task.location,
             "search_parameters": task.search_parameters,
+            "queue_position": scheduler.get_queue_position(task_id),
             "results": []  # No results yet
         }
     
@@ -1325,17 +1366,14 @@ async def get_task_results(
             detail=f"No results found for task {task_id}"
         )
     
-    result_data = task_results[task_id]
-    all_results = result_data.get("results", [])
-    
     # Apply pagination
-    total_items = len(all_results)
+    total_items = task_results.count_results(task_id)
     total_pages = (total_items + page_size - 1) // page_size
     start_idx = (page - 1) * page_size
     end_idx = start_idx + page_size
     
     # Get page items
-    page_results = all_results[start_idx:end_idx]
+    page_results = task_results.get_results(task_id, start_idx, end_idx)
     
     # Generate download URLs
     download_urls = {
@@ -1411,7 +1449,7 @@ async def download_results(
             "pages_scraped": result_data.get("pages_scraped", 0),
             "scraped_time": task.completed_at,
             "search_parameters": task.search_parameters,
-            "results": result_data.get("results", []),
+            "results": task_results.get_results(task_id),
             "download_info": {
                 "format": "JSON",
                 "download_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -1427,7 +1465,7 @@ async def download_results(
             }
         )
     else:  # csv
-        results = result_data.get("results", [])
+        results = task_results.get_results(task_id)
         
         # Convert to CSV
         csv_content = convert_results_to_csv(results, task.search_type)